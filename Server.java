@@ -1,9 +1,20 @@
 import java.io.*;
 import java.net.*;
+import java.nio.ByteBuffer;
+import java.nio.channels.FileChannel;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.*;
+import java.time.Duration;
 import java.time.Instant;
 import java.time.format.DateTimeFormatter;
 import java.util.*;
+import java.util.concurrent.ConcurrentHashMap;
 import java.util.concurrent.ThreadFactory;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.concurrent.atomic.AtomicReferenceArray;
+import java.util.concurrent.locks.Condition;
+import java.util.concurrent.locks.ReentrantLock;
+import java.util.zip.CRC32;
 
 // server class to manage client connections and message boards 
 public class Server {
@@ -20,15 +31,21 @@ public class Server {
         Map.entry("Group5", new Board("Group5"))
     );
 
+    // every connected client, for the console's "clients" command
+    public static final Set<Client> Clients = ConcurrentHashMap.newKeySet();
+
     // main method to initialize the server and handle client connections
     public static void main(String[] args) {
         try {
             // create a server socket on an available port
             ServerSocket connectionSocket = new ServerSocket(0);
             System.out.println("Waiting for connections on port " + connectionSocket.getLocalPort());
+            startConsole();
+            // write out posts still waiting for a group commit
+            Runtime.getRuntime().addShutdownHook(new Thread(() -> Groups.values().forEach(board -> board.store.close())));
             while (true) { 
                 Socket socket = connectionSocket.accept(); // wait for a connection
-                System.out.println("New connection from " + socket.getInetAddress().getHostAddress() + ":" + socket.getPort());
+                if (Trace.INFO_ENABLED) Trace.record(Trace.INFO, socket.getInetAddress().getHostAddress() + ":" + socket.getPort(), "connect", "");
                 // start a new thread to handle the connected client 
                 Thread clientThread = clientThreadFactory.newThread(new Client(socket));
                 clientThread.setName("Client-" + socket.getInetAddress().getHostAddress() + ":" + socket.getPort());
@@ -39,41 +56,97 @@ public class Server {
             ioe.printStackTrace();
         }
     }
+
+    // reads operator commands from stdin: "trace" dumps the recent protocol trace,
+    // "clients" prints the outbound queue counters of every client, "store" the message store of every board
+    private static void startConsole() {
+        var console = new Thread(() -> {
+            var in = new BufferedReader(new InputStreamReader(System.in));
+            try {
+                String line;
+                while ((line = in.readLine()) != null) {
+                    switch (line.trim()) {
+                        case "trace" -> Trace.dump(System.out);
+                        case "clients" -> {
+                            for (var client : Clients) System.out.println(client.address + " " + client.outbox.stats());
+                        }
+                        case "store" -> {
+                            for (var board : Groups.values()) System.out.println(board.boardName + " " + board.store.stats());
+                        }
+                        default -> { }
+                    }
+                }
+            } catch (IOException e) { }
+        }, "Console");
+        console.setDaemon(true);
+        console.start();
+    }
 }
 
 // client class to handle communication with an individual client 
 class Client implements Runnable {
     private final ThreadFactory commandThreadFactory; // factory for creating threads for commands
-    private final Object lock = new Object(); // lock for thread synchronization
     public Socket socket;
+    public final String address; // host:port of the peer, used in traces
     private BufferedReader reader; // reader for incoming client messages 
-    private PrintWriter writer; // writer for sending messages to client 
+    private Writer writer; // writer for sending messages to client 
+    public final Outbox outbox = new Outbox(); // messages waiting for the writer thread
+    public volatile int pushLimit; // longest MESSAGE line sent with the post inline, 0 for ids only (see SUBSCRIBE)
     public final Set<Board> boards = new HashSet<>(); // set of boards that the client has joined 
 
     // constructor initializes client socket and I/O streams
     public Client(Socket socket) {
         this.socket = socket;
+        this.address = socket.getInetAddress().getHostAddress() + ":" + socket.getPort();
         commandThreadFactory = Thread.ofVirtual().factory();
         try {
             this.reader = new BufferedReader(new InputStreamReader(socket.getInputStream()));
-            this.writer = new PrintWriter(socket.getOutputStream(), true);
+            this.writer = new BufferedWriter(new OutputStreamWriter(socket.getOutputStream()), 64 * 1024);
         } catch (IOException e) {
             e.printStackTrace();
         }
     }
 
-    // method to send a message to client 
+    // queues a message for the client, never blocks on the socket
     public void send(String message) {
-        synchronized (this.lock) {
-            System.out.println(socket.getInetAddress().getHostAddress() + ":" + socket.getPort() + " < " + message);
-            writer.print(message + "\n");
-            writer.flush();
+        if (Trace.DEBUG_ENABLED) Trace.debug(address, "<", message);
+        if (!outbox.offer(message, false)) disconnect(); // the client fell too far behind
+    }
+
+    // queues the confirmation of the client's own JOIN or LEAVE, which the outbox policy never drops
+    public void sendConfirmation(String message) {
+        if (Trace.DEBUG_ENABLED) Trace.debug(address, "<", message);
+        if (!outbox.offer(message, true)) disconnect();
+    }
+
+    // drains the outbox, writing everything queued since the last write in one go
+    private void writeLoop() {
+        try {
+            while (true) {
+                var batch = outbox.take();
+                if (batch == null) break; // closed and empty
+                writer.write(batch);
+                writer.flush();
+            }
+        } catch (IOException | InterruptedException e) {
+            outbox.close();
         }
     }
 
+    // drops the connection, the reader sees the closed socket and cleans up
+    private void disconnect() {
+        try {
+            socket.shutdownInput();
+        } catch (IOException e) { }
+    }
+
     // main loop for handling client messages 
     @Override
     public void run() {
+        Server.Clients.add(this);
+        var writerThread = commandThreadFactory.newThread(this::writeLoop);
+        writerThread.setName("Writer-" + address);
+        writerThread.start();
         var threads = new ArrayList<Thread>();
         while (true) { 
             String msg;
@@ -84,7 +157,7 @@ class Client implements Runnable {
                 break;
             }
             if (msg == null) break;
-            System.out.println(socket.getInetAddress().getHostAddress() + ":" + socket.getPort() + " ? " + msg);
+            if (Trace.DEBUG_ENABLED) Trace.debug(address, "?", msg);
             if (msg.equals("EXIT")) break;
             Thread t = handleMsg(msg);
             if (t != null) threads.add(t);
@@ -92,7 +165,7 @@ class Client implements Runnable {
         
         // create commands to leave all boards
         for (var board : boards) {
-            Thread t = handleMsg("LEAVE|" + board.boardName);
+            Thread t = handleMsg(Codec.join("LEAVE", board.boardName));
             if (t != null) threads.add(t);
         }
 
@@ -105,7 +178,15 @@ class Client implements Runnable {
             }
         }
 
-        System.out.println("Closing connection from " + socket.getInetAddress().getHostAddress() + ":" + socket.getPort());
+        // let the writer flush what is queued, but do not wait on a client that stopped reading
+        outbox.close();
+        try {
+            writerThread.join(Duration.ofSeconds(1));
+        } catch (InterruptedException e) { }
+        Server.Clients.remove(this);
+
+        if (Trace.INFO_ENABLED) Trace.record(Trace.INFO, address, "disconnect", outbox.stats());
+        Trace.dumpOnClose();
         try {
             socket.close();
         } catch (IOException e) { }
@@ -131,49 +212,34 @@ class Command implements Runnable {
         this.text = text;
     }
 
-    // executes the command based on its type 
+    // executes the command based on its type, the line is split once and each field unescaped
     @Override
     public void run() {
-        if (text.startsWith("GROUPS")) {
-            runGroups();
-        } 
-        else if (text.startsWith("JOIN|")) {
-            var parts = text.split("\\|");
-            var group = parts[1];
-            var nameInGroup = parts[2];
-            runJoinGroup(group, nameInGroup);
-        }
-        else if (text.startsWith("POST|")) {
-            var parts = text.split("\\|");
-            var group = parts[1];
-            var subject = parts[2];
-            var content = parts[3];
-            runPost(group, subject, content);
-        }
-        else if (text.startsWith("LEAVE|")) {
-            var parts = text.split("\\|");
-            var group = parts[1];
-            runLeave(group);
-        }
-        else if (text.startsWith("VIEW|")) {
-            var parts = text.split("\\|");
-            var group = parts[1];
-            var id = parts[2];
-            runView(group, Integer.parseUnsignedInt(id));
-        }
-        else if (text.startsWith("PING")) {
-            caller.send("PING");
+        var parts = Codec.split(text);
+        try {
+            switch (parts[0]) {
+                case "GROUPS" -> runGroups();
+                case "JOIN" -> runJoinGroup(parts[1], parts[2]);
+                case "POST" -> runPost(parts[1], parts[2], parts[3]);
+                case "LEAVE" -> runLeave(parts[1]);
+                case "VIEW" -> runView(parts[1], Integer.parseUnsignedInt(parts[2]));
+                case "HISTORY" -> runHistory(parts[1], Integer.parseUnsignedInt(parts[2]), Integer.parseInt(parts[3]));
+                case "PING" -> caller.send("PING");
+                case "SUBSCRIBE" -> runSubscribe(parts[1], parts.length > 2 ? Integer.parseInt(parts[2]) : 0);
+                default -> { }
+            }
+        } catch (ArrayIndexOutOfBoundsException | NumberFormatException e) {
+            // malformed command, ignore it
         }
     }
 
     // handles the GROUPS query 
     private void runGroups() {
         var groupNames = Server.Groups.keySet();
-        String response = "GROUPS"; // construct group response
-        for (var groupName : groupNames) {
-            response += "|" + groupName; // append all group names
-        }
-        caller.send(response);
+        var fields = new ArrayList<String>(); // construct group response
+        fields.add("GROUPS");
+        fields.addAll(groupNames); // append all group names
+        caller.send(Codec.join(fields.toArray(String[]::new)));
     }
 
     // handles the JOIN query 
@@ -184,17 +250,17 @@ class Command implements Runnable {
 
         board.Join(caller, name); // join the caller client to the board
         caller.boards.add(board); // add the board to the callers memory
-        caller.send("JOIN|" + group + "|" + name); // notify caller they've joined the group
+        caller.sendConfirmation(Codec.join("JOIN", group, name)); // notify caller they've joined the group
 
         // send last two messages back
         var ids = board.GetLastTwoMessageIds();
-        if (ids.length > 0) caller.send("MESSAGE|" + group + "|" + Integer.toUnsignedString(ids[0]));
-        if (ids.length > 1) caller.send("MESSAGE|" + group + "|" + Integer.toUnsignedString(ids[1]));
+        if (ids.length > 0) caller.send(Codec.join("MESSAGE", group, Integer.toUnsignedString(ids[0])));
+        if (ids.length > 1) caller.send(Codec.join("MESSAGE", group, Integer.toUnsignedString(ids[1])));
 
         // notify client of all users in group
         for (var user : board.Users()) {
             if (!name.equals(user))
-                caller.send("JOIN|" + group + "|" + user);
+                caller.send(Codec.join("JOIN", group, user));
         }
     }
 
@@ -216,16 +282,352 @@ class Command implements Runnable {
         caller.boards.remove(board); // stop tracking the board on the client
     }
 
+    // handles the HISTORY query, ids older than before (0 for the newest) oldest first
+    private void runHistory(String group, int before, int limit) {
+        if (!Server.Groups.containsKey(group)) return;
+        var board = Server.Groups.get(group);
+        if (!caller.boards.contains(board)) return;
+        if (limit <= 0) return;
+
+        var fields = new ArrayList<String>();
+        fields.add("HISTORY");
+        fields.add(group);
+        fields.add(Integer.toUnsignedString(before));
+        for (var id : board.History(before, limit)) {
+            fields.add(Integer.toUnsignedString(id));
+        }
+        caller.send(Codec.join(fields.toArray(String[]::new)));
+    }
+
+    // handles the SUBSCRIBE query, "push" asks for new posts inline with MESSAGE up to maxLength characters per line,
+    // anything else goes back to ids only. The reply confirms the mode and limit in effect
+    private void runSubscribe(String mode, int maxLength) {
+        int limit = mode.equals("push") ? Math.max(0, Math.min(maxLength, Board.MAX_PUSH)) : 0;
+        caller.pushLimit = limit;
+        caller.send(Codec.join("SUBSCRIBE", limit > 0 ? "push" : "ids", Integer.toString(limit)));
+    }
+
     // handles the VIEW query 
     private void runView(String group, Integer id) {
         if (!Server.Groups.containsKey(group)) return;
         var board = Server.Groups.get(group);
         if (!caller.boards.contains(board)) return;
-        if (!board.Messages.containsKey(id)) return;
-        var msg = board.Messages.get(id); // get the message
+        var msg = board.Get(id); // get the message
+        if (msg == null) return;
 
         // send contents to the client
-        caller.send("VIEW|" + group + "|" + Integer.toUnsignedString(id) + "|" + msg.Sender + "|" + DateTimeFormatter.ISO_INSTANT.format(msg.PostDate) + "|" + msg.Subject + "|" + msg.Content);
+        caller.send(Codec.join("VIEW", group, Integer.toUnsignedString(id), msg.Sender, DateTimeFormatter.ISO_INSTANT.format(msg.PostDate), msg.Subject, msg.Content));
+    }
+}
+
+// outbox class is one client's bounded queue of outgoing lines, filled by any thread and
+// drained by the client's writer thread. When it is full the overflow policy decides:
+//   drop_oldest  drop the oldest queued notification (MESSAGE, JOIN or LEAVE)
+//   coalesce     cancel queued JOIN/LEAVE pairs and duplicate lines first, then drop the oldest notification
+//   disconnect   drop the client
+//   -Dboard.outbox.capacity=N (or BOARD_OUTBOX_CAPACITY), default 4096
+//   -Dboard.outbox.policy=drop_oldest|coalesce|disconnect (or BOARD_OUTBOX_POLICY), default drop_oldest
+class Outbox {
+    public enum Policy { DROP_OLDEST, COALESCE, DISCONNECT }
+
+    public static final int CAPACITY = Math.max(1, Integer.parseInt(Settings.get("board.outbox.capacity", "BOARD_OUTBOX_CAPACITY", "4096")));
+    public static final Policy POLICY = Policy.valueOf(Settings.get("board.outbox.policy", "BOARD_OUTBOX_POLICY", "drop_oldest").toUpperCase());
+
+    // a queued line, confirmations of the client's own JOIN or LEAVE are never dropped
+    private record Entry(String line, boolean confirmation) { }
+
+    private final ArrayDeque<Entry> lines = new ArrayDeque<>();
+    private final ReentrantLock lock = new ReentrantLock(); // not synchronized, so waiting virtual threads do not pin a carrier
+    private final Condition ready = lock.newCondition();
+    private boolean closed;
+
+    // counters, read under the lock
+    private long queued; // lines accepted
+    private long written; // lines handed to the socket
+    private long writes; // socket writes
+    private long dropped; // lines dropped by the policy
+    private long coalesced; // lines cancelled by coalescing
+    private int maxDepth; // most lines waiting at once
+
+    // queues a line, returns false if the client should be disconnected
+    public boolean offer(String line, boolean confirmation) {
+        lock.lock();
+        try {
+            if (closed) return true; // on its way out anyway
+            if (lines.size() >= CAPACITY) {
+                switch (POLICY) {
+                    case DISCONNECT -> {
+                        closed = true;
+                        dropped += lines.size() + 1;
+                        lines.clear();
+                        ready.signal();
+                        return false;
+                    }
+                    case COALESCE -> {
+                        if (!coalesce()) dropOldest();
+                    }
+                    case DROP_OLDEST -> dropOldest();
+                }
+            }
+            lines.addLast(new Entry(line, confirmation));
+            queued++;
+            if (lines.size() > maxDepth) maxDepth = lines.size();
+            if (lines.size() == 1) ready.signal();
+            return true;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    // waits for lines and returns all of them joined, or null once closed and empty
+    public String take() throws InterruptedException {
+        lock.lock();
+        try {
+            while (lines.isEmpty()) {
+                if (closed) return null;
+                ready.await();
+            }
+            var batch = new StringBuilder();
+            for (var entry : lines) batch.append(entry.line()).append('\n');
+            written += lines.size();
+            writes++;
+            lines.clear();
+            return batch.toString();
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    // no more lines are accepted, the writer stops once the queue is empty
+    public void close() {
+        lock.lock();
+        try {
+            closed = true;
+            ready.signal();
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    public String stats() {
+        lock.lock();
+        try {
+            return "queued=" + queued + " written=" + written + " writes=" + writes + " pending=" + lines.size()
+                + " maxDepth=" + maxDepth + " dropped=" + dropped + " coalesced=" + coalesced;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    private static boolean isNotification(String line) {
+        return line.startsWith("MESSAGE|") || isMembership(line);
+    }
+
+    private static boolean isMembership(String line) {
+        return line.startsWith("JOIN|") || line.startsWith("LEAVE|");
+    }
+
+    // caller holds the lock
+    private void dropOldest() {
+        for (var it = lines.iterator(); it.hasNext(); ) {
+            var entry = it.next();
+            if (!entry.confirmation() && isNotification(entry.line())) {
+                it.remove();
+                dropped++;
+                return;
+            }
+        }
+        // only replies queued, drop one anyway to stay bounded; a queue of nothing but confirmations
+        // is left to grow, there are at most a couple per group
+        for (var it = lines.iterator(); it.hasNext(); ) {
+            if (!it.next().confirmation()) {
+                it.remove();
+                dropped++;
+                return;
+            }
+        }
+    }
+
+    // caller holds the lock, returns whether anything was freed. Duplicate MESSAGE notifications go,
+    // and of the JOIN and LEAVE notifications for one group|name only the last is kept, in its place,
+    // so the member list ends up the same. Confirmations are always kept.
+    private boolean coalesce() {
+        var last = new HashMap<String, Entry>(); // "group|name" -> its last JOIN or LEAVE
+        for (var entry : lines) {
+            if (!entry.confirmation() && isMembership(entry.line())) {
+                last.put(entry.line().substring(entry.line().indexOf('|') + 1), entry);
+            }
+        }
+        var seen = new HashSet<String>();
+        var kept = new ArrayDeque<Entry>(lines.size());
+        for (var entry : lines) {
+            var line = entry.line();
+            if (!entry.confirmation()) {
+                if (isMembership(line)) {
+                    if (last.get(line.substring(line.indexOf('|') + 1)) != entry) continue; // superseded
+                } else if (line.startsWith("MESSAGE|") && !seen.add(line)) {
+                    continue; // duplicate notification
+                }
+            }
+            kept.addLast(entry);
+        }
+        int freed = lines.size() - kept.size();
+        if (freed == 0) return false;
+        coalesced += freed;
+        lines.clear();
+        lines.addAll(kept);
+        return true;
+    }
+}
+
+// codec class escapes fields so '|', newlines and backslashes survive the line protocol
+//   \ -> \\    | -> \p    newline -> \n
+class Codec {
+    // splits a line on '|' and unescapes every field
+    public static String[] split(String line) {
+        var parts = line.split("\\|", -1);
+        for (int i = 0; i < parts.length; i++) {
+            parts[i] = unescape(parts[i]);
+        }
+        return parts;
+    }
+
+    // escapes every field and joins them with '|'
+    public static String join(String... fields) {
+        var builder = new StringBuilder();
+        for (int i = 0; i < fields.length; i++) {
+            if (i > 0) builder.append('|');
+            escapeInto(builder, fields[i]);
+        }
+        return builder.toString();
+    }
+
+    public static String escape(String field) {
+        var builder = new StringBuilder(field.length());
+        escapeInto(builder, field);
+        return builder.toString();
+    }
+
+    private static void escapeInto(StringBuilder builder, String field) {
+        for (int i = 0; i < field.length(); i++) {
+            char c = field.charAt(i);
+            switch (c) {
+                case '\\' -> builder.append("\\\\");
+                case '|' -> builder.append("\\p");
+                case '\n' -> builder.append("\\n");
+                default -> builder.append(c);
+            }
+        }
+    }
+
+    public static String unescape(String field) {
+        if (field.indexOf('\\') < 0) return field; // nothing escaped
+        var builder = new StringBuilder(field.length());
+        for (int i = 0; i < field.length(); i++) {
+            char c = field.charAt(i);
+            if (c != '\\' || i + 1 == field.length()) {
+                builder.append(c);
+                continue;
+            }
+            char next = field.charAt(++i);
+            switch (next) {
+                case 'p' -> builder.append('|');
+                case 'n' -> builder.append('\n');
+                default -> builder.append(next);
+            }
+        }
+        return builder.toString();
+    }
+}
+
+// settings class reads startup options from a system property, falling back to an environment variable
+class Settings {
+    public static String get(String property, String env, String fallback) {
+        var value = System.getProperty(property);
+        if (value == null) value = System.getenv(env);
+        return value == null ? fallback : value;
+    }
+}
+
+// trace class keeps recent protocol events in a ring buffer. Settings are read once at startup
+// into static finals, so a disabled level costs a constant check the JIT folds away.
+//   -Dboard.trace=off|error|info|debug (or BOARD_TRACE), default info
+//   -Dboard.trace.sample=N          keep one debug record in N
+//   -Dboard.trace.ring=N            records kept in memory
+//   -Dboard.trace.echo=false        do not also print records to stdout (BOARD_TRACE_ECHO=0)
+//   -Dboard.trace.dump=PATH         append the ring to PATH when a client disconnects, - for stderr
+// The environment variables mean the same as for the Python clients, see client/trace.py.
+class Trace {
+    public static final int OFF = 0, ERROR = 1, INFO = 2, DEBUG = 3;
+    private static final String[] NAMES = { "OFF", "ERROR", "INFO", "DEBUG" };
+
+    public static final int LEVEL = parseLevel(Settings.get("board.trace", "BOARD_TRACE", "info"));
+    public static final boolean INFO_ENABLED = LEVEL >= INFO;
+    public static final boolean DEBUG_ENABLED = LEVEL >= DEBUG;
+    private static final String DUMP_ON_CLOSE = Settings.get("board.trace.dump", "BOARD_TRACE_DUMP", ""); // file, "-" for stderr, empty for off
+    private static final int SAMPLE = Math.max(1, Integer.parseInt(Settings.get("board.trace.sample", "BOARD_TRACE_SAMPLE", "1")));
+    private static final boolean ECHO = isOn(Settings.get("board.trace.echo", "BOARD_TRACE_ECHO", "true"));
+    private static final ReentrantLock dumpLock = new ReentrantLock(); // one disconnect appends to the dump file at a time
+
+    private static final AtomicReferenceArray<String> ring =
+        new AtomicReferenceArray<>(Math.max(1, Integer.parseInt(Settings.get("board.trace.ring", "BOARD_TRACE_RING", "4096"))));
+    private static final AtomicLong recorded = new AtomicLong(); // records kept so far, the next ring slot
+    private static final AtomicLong debugSeen = new AtomicLong(); // debug records offered, drives sampling
+
+    // "1" like the Python clients, or "true"
+    private static boolean isOn(String value) {
+        return value.equals("1") || value.equalsIgnoreCase("true");
+    }
+
+    private static int parseLevel(String name) {
+        for (int i = 0; i < NAMES.length; i++) {
+            if (NAMES[i].equalsIgnoreCase(name)) return i;
+        }
+        return INFO;
+    }
+
+    // records a protocol line, only call behind a DEBUG_ENABLED check
+    public static void debug(String who, String event, String text) {
+        if (SAMPLE > 1 && debugSeen.getAndIncrement() % SAMPLE != 0) return;
+        record(DEBUG, who, event, text);
+    }
+
+    public static void record(int level, String who, String event, String text) {
+        if (level > LEVEL) return;
+        var entry = Instant.now() + " " + NAMES[level] + " " + who + " " + event + " " + text;
+        ring.set((int) (recorded.getAndIncrement() % ring.length()), entry);
+        if (ECHO) System.out.println(entry);
+    }
+
+    // called when a client disconnects, dumps the ring where BOARD_TRACE_DUMP says
+    public static void dumpOnClose() {
+        if (DUMP_ON_CLOSE.isEmpty()) return;
+        if (DUMP_ON_CLOSE.equals("-")) {
+            dump(System.err);
+            return;
+        }
+        dumpLock.lock();
+        try (var out = new PrintStream(new FileOutputStream(DUMP_ON_CLOSE, true), false, StandardCharsets.UTF_8)) {
+            dump(out);
+        } catch (IOException e) {
+            System.err.println("trace dump to " + DUMP_ON_CLOSE + " failed: " + e.getMessage());
+        } finally {
+            dumpLock.unlock();
+        }
+    }
+
+    // prints the ring oldest first and returns the number of records printed
+    public static int dump(PrintStream out) {
+        long end = recorded.get();
+        long start = Math.max(0, end - ring.length());
+        var builder = new StringBuilder();
+        for (long i = start; i < end; i++) {
+            var entry = ring.get((int) (i % ring.length()));
+            if (entry != null) builder.append(entry).append('\n');
+        }
+        out.print(builder);
+        out.flush();
+        return (int) (end - start);
     }
 }
 
@@ -244,23 +646,555 @@ class Message {
     }
 }
 
+// message store class keeps one board's messages in an append-only log split into segments.
+// Segment N is N.log plus N.idx, the index holding a fixed size (id, offset, length) entry per
+// record, so startup reads the index files and only scans log records written after the last
+// index entry. Log records are [length][crc32][id][seconds][nanos][sender][subject][content],
+// strings as a length and UTF-8 bytes.
+// A flusher thread writes whatever was posted since its last round and fsyncs it once (group
+// commit); posts wait for that before they are announced unless board.store.durable=false.
+// If a write or fsync fails the store stops taking posts until the server is restarted.
+// Bodies stay in a hot set bounded by board.store.hotBytes, older ones are read back on VIEW.
+//   -Dboard.store.dir=PATH (or BOARD_STORE_DIR), default data, empty keeps messages in memory only
+//   -Dboard.store.segmentBytes=N (or BOARD_STORE_SEGMENT_BYTES), default 64MB
+//   -Dboard.store.hotBytes=N (or BOARD_STORE_HOT_BYTES), per board, default 16MB
+//   -Dboard.store.durable=true|false (or BOARD_STORE_DURABLE), default true
+class MessageStore {
+    public static final String DIR = Settings.get("board.store.dir", "BOARD_STORE_DIR", "data");
+    public static final long SEGMENT_BYTES = Long.parseLong(Settings.get("board.store.segmentBytes", "BOARD_STORE_SEGMENT_BYTES", Long.toString(64L << 20)));
+    public static final long HOT_BYTES = Long.parseLong(Settings.get("board.store.hotBytes", "BOARD_STORE_HOT_BYTES", Long.toString(16L << 20)));
+    public static final boolean DURABLE = Boolean.parseBoolean(Settings.get("board.store.durable", "BOARD_STORE_DURABLE", "true"));
+
+    private static final int HEADER = 8; // record length and crc32 of what follows
+    private static final int FIXED = 4 + 8 + 4 + 3 * 4; // id, seconds, nanos and the three string lengths
+    private static final int INDEX_ENTRY = 12; // id, offset, length
+
+    private final Path dir; // null when messages are kept in memory only
+    private final long segmentBytes;
+    private final long hotBytes;
+    private final boolean durable;
+
+    // index of every stored message, ids ascending, guarded by lock like everything the flusher shares
+    private final ReentrantLock lock = new ReentrantLock(); // not synchronized, posts wait on it from virtual threads
+    private final Condition flushNeeded = lock.newCondition();
+    private final Condition flushed = lock.newCondition();
+    private int count;
+    private int[] ids = new int[1024];
+    private long[] locations = new long[1024]; // segment << 32 | offset
+    private int[] lengths = new int[1024]; // record length including the header
+    private int nextId;
+    private int appendSegment; // segment and offset the next record goes to
+    private long appendOffset;
+    private ArrayList<PendingRecord> pending = new ArrayList<>(); // posted, not yet written
+    private int written; // the first written records of the index are in the log
+    private boolean closed;
+    private IOException failure; // the group commit that failed, the store takes no posts after it
+    private long commits; // group commits, one fsync each
+    private Thread flusher;
+
+    // bodies of recent and recently viewed messages, least recently used first
+    private final LinkedHashMap<Integer, Message> hot = new LinkedHashMap<>(1024, 0.75f, true);
+    private long hotSize;
+    private long loads; // bodies read back from the log
+
+    // flusher side, only touched by the flusher thread
+    private int outSegment = -1;
+    private FileChannel logOut;
+    private FileChannel indexOut;
+    private final Map<Integer, FileChannel> readers = new ConcurrentHashMap<>(); // segment -> channel for lazy loads
+
+    private record PendingRecord(int segment, long offset, int id, byte[] bytes) { }
+
+    // the store for a board, as configured by the board.store settings
+    public static MessageStore open(String board) {
+        try {
+            var dir = DIR.isEmpty() ? null : Path.of(DIR, board);
+            return new MessageStore(dir, SEGMENT_BYTES, HOT_BYTES, DURABLE);
+        } catch (IOException e) {
+            throw new UncheckedIOException("cannot open the message store of " + board, e);
+        }
+    }
+
+    public MessageStore(Path dir, long segmentBytes, long hotBytes, boolean durable) throws IOException {
+        this.dir = dir;
+        this.segmentBytes = segmentBytes;
+        this.hotBytes = hotBytes;
+        this.durable = durable;
+        int lastId = 0;
+        if (dir != null) {
+            recover();
+            if (count > 0) lastId = ids[count - 1] + 1;
+            flusher = Thread.ofPlatform().name("Store-" + dir.getFileName()).daemon().start(this::flushLoop);
+        }
+        // start high so ids of a store started empty do not repeat those of an older server
+        nextId = Integer.compareUnsigned(lastId, (int) Instant.now().getEpochSecond()) > 0 ? lastId : (int) Instant.now().getEpochSecond();
+    }
+
+    // stores a message and returns its id, once it is durable unless the store was opened otherwise.
+    // Throws UncheckedIOException when the log could not be written, the message is then not stored
+    public int append(Message message) {
+        var sender = message.Sender.getBytes(StandardCharsets.UTF_8);
+        var subject = message.Subject.getBytes(StandardCharsets.UTF_8);
+        var content = message.Content.getBytes(StandardCharsets.UTF_8);
+        int id;
+        int sequence;
+        lock.lock();
+        try {
+            if (failure != null) throw new UncheckedIOException("message store " + dir + " failed", failure);
+            id = nextId++;
+            if (dir == null) {
+                add(id, 0, 0);
+            } else {
+                var bytes = encode(id, message.PostDate, sender, subject, content);
+                if (appendOffset > 0 && appendOffset + bytes.length > segmentBytes) {
+                    appendSegment++; // roll over, a record never spans segments
+                    appendOffset = 0;
+                }
+                add(id, (long) appendSegment << 32 | appendOffset, bytes.length);
+                pending.add(new PendingRecord(appendSegment, appendOffset, id, bytes));
+                appendOffset += bytes.length;
+                if (pending.size() == 1) flushNeeded.signal();
+            }
+            sequence = count;
+        } finally {
+            lock.unlock();
+        }
+        cache(id, message);
+        if (durable && dir != null && !awaitWritten(sequence)) {
+            uncache(id);
+            throw new UncheckedIOException("message " + Integer.toUnsignedString(id) + " was not written", failure());
+        }
+        return id;
+    }
+
+    // the message with this id, read back from the log when it is not hot, null if there is none
+    public Message get(int id) {
+        synchronized (hot) {
+            var message = hot.get(id);
+            if (message != null) return message;
+        }
+        if (dir == null) return null;
+        long location;
+        int length;
+        lock.lock();
+        try {
+            int index = find(id);
+            if (index < 0) return null;
+            while (written <= index && !closed && failure == null) flushed.await(); // evicted before the flusher got to it
+            if (written <= index) return null; // its group commit failed
+            location = locations[index];
+            length = lengths[index];
+        } catch (InterruptedException e) {
+            return null;
+        } finally {
+            lock.unlock();
+        }
+        try {
+            var message = read(location, length);
+            cache(id, message);
+            return message;
+        } catch (IOException | UncheckedIOException e) {
+            e.printStackTrace();
+            return null;
+        }
+    }
+
+    // the newest ids, oldest first
+    public int[] last(int n) {
+        lock.lock();
+        try {
+            return Arrays.copyOfRange(ids, Math.max(0, count - n), count);
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    // up to limit ids older than before (0 for the newest), oldest first
+    public int[] before(int before, int limit) {
+        lock.lock();
+        try {
+            int end = count;
+            if (before != 0) {
+                int index = find(before);
+                end = index >= 0 ? index : -index - 1;
+            }
+            return Arrays.copyOfRange(ids, Math.max(0, end - limit), end);
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    // the id the next append gets
+    public int nextId() {
+        lock.lock();
+        try {
+            return nextId;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    public int size() {
+        lock.lock();
+        try {
+            return count;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    // writes what is pending and stops the flusher
+    public void close() {
+        lock.lock();
+        try {
+            closed = true;
+            flushNeeded.signal();
+        } finally {
+            lock.unlock();
+        }
+        if (flusher != null) {
+            try {
+                flusher.join();
+            } catch (InterruptedException e) { }
+        }
+        try {
+            for (var reader : readers.values()) reader.close();
+        } catch (IOException e) { }
+    }
+
+    public String stats() {
+        long hotCount;
+        long hotBytesUsed;
+        synchronized (hot) {
+            hotCount = hot.size();
+            hotBytesUsed = hotSize;
+        }
+        lock.lock();
+        try {
+            return "messages=" + count + " segments=" + (dir == null ? 0 : appendSegment + 1) + " commits=" + commits
+                + " pending=" + pending.size() + " hot=" + hotCount + " hotBytes=" + hotBytesUsed + " loads=" + loads
+                + " failed=" + (failure != null);
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    // caller holds lock
+    private void add(int id, long location, int length) {
+        if (count == ids.length) {
+            int capacity = count * 2;
+            ids = Arrays.copyOf(ids, capacity);
+            locations = Arrays.copyOf(locations, capacity);
+            lengths = Arrays.copyOf(lengths, capacity);
+        }
+        ids[count] = id;
+        locations[count] = location;
+        lengths[count] = length;
+        count++;
+    }
+
+    // caller holds lock, index of id or -(insertion point) - 1 like Arrays.binarySearch
+    private int find(int id) {
+        int low = 0;
+        int high = count - 1;
+        while (low <= high) {
+            int mid = (low + high) >>> 1;
+            int order = Integer.compareUnsigned(ids[mid], id);
+            if (order < 0) low = mid + 1;
+            else if (order > 0) high = mid - 1;
+            else return mid;
+        }
+        return -(low + 1);
+    }
+
+    // false if the first sequence records will never be written because a group commit failed
+    private boolean awaitWritten(int sequence) {
+        lock.lock();
+        try {
+            while (written < sequence && !closed && failure == null) flushed.await();
+            return written >= sequence || failure == null;
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            return true;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    private IOException failure() {
+        lock.lock();
+        try {
+            return failure;
+        } finally {
+            lock.unlock();
+        }
+    }
+
+    private void cache(int id, Message message) {
+        synchronized (hot) {
+            if (hot.put(id, message) == null) hotSize += footprint(message);
+            if (dir == null) return; // nothing to load evicted bodies from
+            var it = hot.entrySet().iterator();
+            while (hotSize > hotBytes && it.hasNext()) {
+                var eldest = it.next().getValue();
+                if (eldest == message) break; // keep at least what was just added
+                hotSize -= footprint(eldest);
+                it.remove();
+            }
+        }
+    }
+
+    // forgets a body that never made it to the log, so VIEW does not serve it
+    private void uncache(int id) {
+        synchronized (hot) {
+            var message = hot.remove(id);
+            if (message != null) hotSize -= footprint(message);
+        }
+    }
+
+    private static long footprint(Message message) {
+        return 64 + 2L * (message.Sender.length() + message.Subject.length() + message.Content.length());
+    }
+
+    private static byte[] encode(int id, Instant postDate, byte[] sender, byte[] subject, byte[] content) {
+        int length = FIXED + sender.length + subject.length + content.length;
+        var buffer = ByteBuffer.allocate(HEADER + length);
+        buffer.putInt(length).putInt(0); // crc filled in below
+        buffer.putInt(id).putLong(postDate.getEpochSecond()).putInt(postDate.getNano());
+        buffer.putInt(sender.length).put(sender);
+        buffer.putInt(subject.length).put(subject);
+        buffer.putInt(content.length).put(content);
+        var crc = new CRC32();
+        crc.update(buffer.array(), HEADER, length);
+        buffer.putInt(4, (int) crc.getValue());
+        return buffer.array();
+    }
+
+    // checks a record read from the log, null if it is torn or corrupt
+    private static ByteBuffer verify(ByteBuffer record) {
+        int length = record.getInt(0);
+        if (length < FIXED || length != record.limit() - HEADER) return null;
+        var crc = new CRC32();
+        crc.update(record.array(), HEADER, length);
+        if ((int) crc.getValue() != record.getInt(4)) return null;
+        return record.position(HEADER);
+    }
+
+    private static String string(ByteBuffer record) {
+        var bytes = new byte[record.getInt()];
+        record.get(bytes);
+        return new String(bytes, StandardCharsets.UTF_8);
+    }
+
+    private Message read(long location, int length) throws IOException {
+        int segment = (int) (location >>> 32);
+        var channel = readers.get(segment);
+        if (channel == null) {
+            channel = readers.computeIfAbsent(segment, s -> {
+                try {
+                    return FileChannel.open(logPath(s), StandardOpenOption.READ);
+                } catch (IOException e) {
+                    throw new UncheckedIOException(e);
+                }
+            });
+        }
+        var record = ByteBuffer.allocate(length);
+        long position = location & 0xffffffffL;
+        while (record.hasRemaining()) {
+            if (channel.read(record, position + record.position()) < 0) throw new EOFException();
+        }
+        record.flip();
+        if (verify(record) == null) throw new IOException("corrupt record at " + segment + ":" + position);
+        record.getInt(); // id
+        var postDate = Instant.ofEpochSecond(record.getLong(), record.getInt());
+        var sender = string(record);
+        var subject = string(record);
+        var content = string(record);
+        lock.lock();
+        try {
+            loads++;
+        } finally {
+            lock.unlock();
+        }
+        return new Message(sender, postDate, subject, content);
+    }
+
+    private Path logPath(int segment) {
+        return dir.resolve(String.format("%08d.log", segment));
+    }
+
+    private Path indexPath(int segment) {
+        return dir.resolve(String.format("%08d.idx", segment));
+    }
+
+    // rebuilds the in-memory index from the index files, scanning only log records they miss
+    private void recover() throws IOException {
+        Files.createDirectories(dir);
+        var segments = new ArrayList<Integer>();
+        try (var files = Files.newDirectoryStream(dir, "*.log")) {
+            for (var file : files) {
+                var name = file.getFileName().toString();
+                segments.add(Integer.parseInt(name.substring(0, name.length() - 4)));
+            }
+        }
+        Collections.sort(segments);
+        for (int segment : segments) {
+            try (var log = FileChannel.open(logPath(segment), StandardOpenOption.READ, StandardOpenOption.WRITE);
+                 var index = FileChannel.open(indexPath(segment), StandardOpenOption.READ, StandardOpenOption.WRITE, StandardOpenOption.CREATE)) {
+                long logSize = log.size();
+                var entries = ByteBuffer.wrap(Files.readAllBytes(indexPath(segment)));
+                long end = 0; // end of the last record the index covers
+                int valid = 0;
+                while (entries.remaining() >= INDEX_ENTRY) {
+                    int id = entries.getInt();
+                    long offset = entries.getInt() & 0xffffffffL;
+                    int length = entries.getInt();
+                    if (offset != end || offset + length > logSize) break; // written ahead of a log write that never landed
+                    add(id, (long) segment << 32 | offset, length);
+                    end = offset + length;
+                    valid++;
+                }
+                index.truncate((long) valid * INDEX_ENTRY);
+                if (end < logSize) end = scan(segment, log, index, end);
+                log.truncate(end); // drop a torn record at the tail
+                appendSegment = segment;
+                appendOffset = end;
+            }
+        }
+        written = count;
+    }
+
+    // indexes log records past the index, returns where the last whole record ends
+    private long scan(int segment, FileChannel log, FileChannel index, long offset) throws IOException {
+        long logSize = log.size();
+        var header = ByteBuffer.allocate(HEADER);
+        var entries = ByteBuffer.allocate(INDEX_ENTRY * 1024);
+        index.position(index.size());
+        while (offset + HEADER <= logSize) {
+            header.clear();
+            log.read(header, offset);
+            int length = header.getInt(0);
+            if (length < FIXED || offset + HEADER + length > logSize) break;
+            var record = ByteBuffer.allocate(HEADER + length);
+            while (record.hasRemaining() && log.read(record, offset + record.position()) > 0) { }
+            record.flip();
+            if (verify(record) == null) break;
+            int id = record.getInt();
+            add(id, (long) segment << 32 | offset, HEADER + length);
+            if (!entries.hasRemaining()) {
+                entries.flip();
+                index.write(entries);
+                entries.clear();
+            }
+            entries.putInt(id).putInt((int) offset).putInt(HEADER + length);
+            offset += HEADER + length;
+        }
+        entries.flip();
+        index.write(entries);
+        index.force(false);
+        return offset;
+    }
+
+    private void flushLoop() {
+        while (true) {
+            ArrayList<PendingRecord> batch;
+            lock.lock();
+            try {
+                while (pending.isEmpty() && !closed) flushNeeded.awaitUninterruptibly();
+                if (pending.isEmpty()) break;
+                batch = pending;
+                pending = new ArrayList<>();
+            } finally {
+                lock.unlock();
+            }
+            IOException error = null;
+            try {
+                write(batch);
+            } catch (IOException e) {
+                error = e;
+                Trace.record(Trace.ERROR, "store " + dir.getFileName(), "write failed", e.toString());
+            }
+            lock.lock();
+            try {
+                if (error != null) {
+                    // where the log ends is unknown now, fail this batch and every later post rather than
+                    // announce messages that are not on disk, recover() drops torn records on restart
+                    failure = error;
+                    count = written; // HISTORY and VIEW no longer see the lost posts
+                    pending.clear();
+                    flushed.signalAll();
+                    break;
+                }
+                written += batch.size();
+                commits++;
+                flushed.signalAll();
+            } finally {
+                lock.unlock();
+            }
+        }
+        try {
+            if (logOut != null) logOut.close();
+            if (indexOut != null) indexOut.close();
+        } catch (IOException e) { }
+    }
+
+    // one group commit: every record and index entry of the batch, then one fsync per file
+    private void write(List<PendingRecord> batch) throws IOException {
+        int i = 0;
+        while (i < batch.size()) {
+            int segment = batch.get(i).segment();
+            if (segment != outSegment) {
+                if (logOut != null) {
+                    logOut.close();
+                    indexOut.close();
+                }
+                logOut = FileChannel.open(logPath(segment), StandardOpenOption.WRITE, StandardOpenOption.CREATE);
+                indexOut = FileChannel.open(indexPath(segment), StandardOpenOption.WRITE, StandardOpenOption.CREATE, StandardOpenOption.APPEND);
+                outSegment = segment;
+            }
+            int start = i;
+            while (i < batch.size() && batch.get(i).segment() == segment) i++;
+            var records = new ByteBuffer[i - start];
+            var entries = ByteBuffer.allocate((i - start) * INDEX_ENTRY);
+            for (int j = start; j < i; j++) {
+                var record = batch.get(j);
+                records[j - start] = ByteBuffer.wrap(record.bytes());
+                entries.putInt(record.id()).putInt((int) record.offset()).putInt(record.bytes().length);
+            }
+            logOut.position(batch.get(start).offset());
+            while (records[records.length - 1].hasRemaining()) logOut.write(records);
+            entries.flip();
+            while (entries.hasRemaining()) indexOut.write(entries);
+            logOut.force(false);
+            indexOut.force(false);
+        }
+    }
+}
+
 // board class represents a message board where clients can post messages 
 class Board {
+    public static final int MAX_HISTORY = 500; // most ids returned by one HISTORY query
+    public static final int MAX_PUSH = 1 << 20; // largest push limit a client may ask for
     public final String boardName;
-    private final Random rnd; // random number generator for message IDs
-    public final Map<Integer, Message> Messages = new HashMap<>();
+    public final MessageStore store; // messages and their ids, kept across restarts
+    // notifications are sent under this lock so every client sees them in the same order, sends
+    // only queue on the client's outbox so holding it costs nothing
     private final Map<Client, String> clients = new HashMap<>();
+    private final Map<Integer, Message> stored = new HashMap<>(); // durable posts waiting for an earlier id to be announced
+    private int nextAnnounce; // id of the next post to announce
 
     public Board(String name) {
-        rnd = new Random();
         boardName = name;
+        store = MessageStore.open(name);
+        nextAnnounce = store.nextId();
     }
 
     // adds a client to the board 
     public void Join(Client client, String name) {
+        var line = Codec.join("JOIN", boardName, name);
         synchronized (clients) {
             for (var other : clients.keySet()) {
-                other.send("JOIN|" + boardName + "|" + name); // notify all existing board clients of a join
+                other.send(line); // notify all existing board clients of a join
             }
             clients.put(client, name); // track new client
         }
@@ -268,11 +1202,12 @@ class Board {
 
     // removes a client from the board 
     public void Leave(Client client) {
-        if (!clients.containsKey(client)) return;
         synchronized (clients) {
-            var name = clients.get(client);
+            if (!clients.containsKey(client)) return;
+            var line = Codec.join("LEAVE", boardName, clients.get(client));
             for (var other : clients.keySet()) {
-                other.send("LEAVE|" + boardName + "|" + name); // notify all board client of a leave
+                if (other == client) other.sendConfirmation(line); // the leaver is notified too
+                else other.send(line); // notify all board client of a leave
             }
             clients.remove(client); // stop tracking client on board
         }
@@ -280,32 +1215,66 @@ class Board {
 
     // posts a message to the board 
     public void Post(Client client, String subject, String content) {
-        if (!clients.containsKey(client)) return;
-        var id = rnd.nextInt(); // generate new message id
-        var message = new Message(clients.get(client), Instant.now(), subject, content); // create new message structure
-        Messages.put(id, message);
+        String sender;
+        synchronized (clients) {
+            sender = clients.get(client);
+        }
+        if (sender == null) return;
+        var message = new Message(sender, Instant.now(), subject, content); // create new message structure
+        int id;
+        try {
+            id = store.append(message); // durable before anyone hears of it
+        } catch (UncheckedIOException e) {
+            return; // not stored, the store recorded why, so nobody hears of it
+        }
 
-        // notify others of a new message
+        // posts become durable out of order, announce them by id so MESSAGE ids only go up
         synchronized (clients) {
-            for (var other : clients.entrySet()) {
-                other.getKey().send("MESSAGE|" + boardName + "|" + Integer.toUnsignedString(id));
+            stored.put(id, message);
+            while ((message = stored.remove(nextAnnounce)) != null) {
+                announce(nextAnnounce++, message);
+            }
+        }
+    }
+
+    // caller holds the clients lock, notifies everyone of a new message
+    private void announce(int id, Message message) {
+        var line = Codec.join("MESSAGE", boardName, Integer.toUnsignedString(id));
+        String pushed = null; // MESSAGE with the VIEW fields appended, built once for every subscriber
+        for (var other : clients.keySet()) {
+            int limit = other.pushLimit;
+            if (limit > 0) {
+                if (pushed == null) {
+                    pushed = Codec.join("MESSAGE", boardName, Integer.toUnsignedString(id), message.Sender,
+                        DateTimeFormatter.ISO_INSTANT.format(message.PostDate), message.Subject, message.Content);
+                }
+                if (pushed.length() <= limit) {
+                    other.send(pushed);
+                    continue;
+                }
             }
+            other.send(line); // ids only, or too big to push, the client sends VIEW
         }
     }
 
     public Collection<String> Users() {
-        return clients.values(); // get list of usernames
-    }
-
-    // gets the last two message IDs from the board 
-    public Integer[] GetLastTwoMessageIds() {
-        var messages = new ArrayList<>(Messages.entrySet());
-        Collections.sort(messages, (left, right) -> right.getValue().PostDate.compareTo(left.getValue().PostDate)); // sort reversed by post date
-        return messages
-            .stream()
-            .limit(2) // get most recent two
-            .sorted((left, right) -> left.getValue().PostDate.compareTo(right.getValue().PostDate)) // sort ascending post date
-            .map(e -> e.getKey()) // get the message ids
-            .toArray(Integer[]::new); // send into an array
+        synchronized (clients) {
+            return new ArrayList<>(clients.values()); // get list of usernames
+        }
+    }
+
+    // gets a message, loading its body from disk if it is no longer in memory, null if there is none
+    public Message Get(int id) {
+        return store.get(id);
+    }
+
+    // gets the last two message IDs from the board, oldest first
+    public int[] GetLastTwoMessageIds() {
+        return store.last(2);
+    }
+
+    // gets up to limit message IDs older than before (0 for the newest), oldest first
+    public int[] History(int before, int limit) {
+        return store.before(before, Math.min(limit, MAX_HISTORY));
     }
 }
@@ -0,0 +1,61 @@
+import java.nio.file.*;
+import java.time.Instant;
+import java.util.*;
+import java.util.concurrent.atomic.AtomicInteger;
+
+// measures the board message store: posts/sec with group commit, restart time with every message
+// stored, and lazy loads of bodies that are no longer hot. The store lives in a temporary directory
+// unless one is given, and is deleted afterwards.
+//   javac -d out Server.java bench/StoreBench.java && java -cp out StoreBench [messages] [posters] [dir]
+public class StoreBench {
+    public static void main(String[] args) throws Exception {
+        int messages = args.length > 0 ? Integer.parseInt(args[0]) : 1_000_000;
+        int posters = args.length > 1 ? Integer.parseInt(args[1]) : 256;
+        var dir = args.length > 2 ? Path.of(args[2]) : Files.createTempDirectory("storebench");
+        try {
+            // posters wait for their group commit like Board.Post does, so this is the durable rate
+            var writing = new MessageStore(dir, MessageStore.SEGMENT_BYTES, MessageStore.HOT_BYTES, true);
+            var next = new AtomicInteger();
+            var threads = new ArrayList<Thread>();
+            long start = System.nanoTime();
+            for (int p = 0; p < posters; p++) {
+                threads.add(Thread.ofVirtual().start(() -> {
+                    int i;
+                    while ((i = next.getAndIncrement()) < messages) {
+                        writing.append(new Message("user" + (i % 100), Instant.now(), "subject " + i, "body of message " + i + " " + "x".repeat(i % 200)));
+                    }
+                }));
+            }
+            for (var thread : threads) thread.join();
+            long elapsed = System.nanoTime() - start;
+            System.out.printf("append   %d messages, %d posters: %.0f posts/sec%n", messages, posters, messages * 1e9 / elapsed);
+            System.out.println("         " + writing.stats());
+            writing.close();
+
+            // restart: only the index files are read
+            start = System.nanoTime();
+            var store = new MessageStore(dir, MessageStore.SEGMENT_BYTES, MessageStore.HOT_BYTES, true);
+            elapsed = System.nanoTime() - start;
+            System.out.printf("restart  %d messages recovered in %.1f ms%n", store.size(), elapsed / 1e6);
+
+            // VIEWs of random old messages, all cold after the restart
+            var ids = store.before(0, messages);
+            var random = new Random(1);
+            int views = Math.min(100_000, ids.length);
+            start = System.nanoTime();
+            for (int i = 0; i < views; i++) {
+                if (store.get(ids[random.nextInt(ids.length)]) == null) throw new IllegalStateException("message lost");
+            }
+            elapsed = System.nanoTime() - start;
+            System.out.printf("view     %d random bodies: %.0f views/sec%n", views, views * 1e9 / elapsed);
+            System.out.println("         " + store.stats());
+            store.close();
+        } finally {
+            if (args.length <= 2) {
+                try (var files = Files.walk(dir)) {
+                    files.sorted(Comparator.reverseOrder()).forEach(path -> path.toFile().delete());
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,76 @@
+import java.io.*;
+import java.util.*;
+
+// measures what tracing costs on the Client.send path at each trace level.
+// Trace settings are fixed per JVM, so every configuration runs in a child JVM.
+//   javac -d out Server.java bench/TraceBench.java && java -cp out TraceBench [messages]
+public class TraceBench {
+    private static final String[][] CONFIGS = {
+        { "legacy println", "-Dboard.trace=off", "legacy" },
+        { "off", "-Dboard.trace=off" },
+        { "info", "-Dboard.trace=info" },
+        { "debug, ring only", "-Dboard.trace=debug", "-Dboard.trace.echo=false" },
+        { "debug, sample 1/16", "-Dboard.trace=debug", "-Dboard.trace.echo=false", "-Dboard.trace.sample=16" },
+        { "debug, echo", "-Dboard.trace=debug" },
+    };
+
+    public static void main(String[] args) throws Exception {
+        if (args.length > 0 && args[0].equals("child")) {
+            runChild(Integer.parseInt(args[1]), args.length > 2 && args[2].equals("legacy"));
+            return;
+        }
+        var messages = args.length > 0 ? args[0] : "1000000";
+        var java = ProcessHandle.current().info().command().orElse("java");
+        var classPath = System.getProperty("java.class.path");
+        for (var config : CONFIGS) {
+            var command = new ArrayList<String>();
+            command.add(java);
+            command.add("-cp");
+            command.add(classPath);
+            for (var option : config) {
+                if (option.startsWith("-D")) command.add(option);
+            }
+            command.add("TraceBench");
+            command.add("child");
+            command.add(messages);
+            if (config[config.length - 1].equals("legacy")) command.add("legacy");
+            var child = new ProcessBuilder(command)
+                .redirectOutput(ProcessBuilder.Redirect.DISCARD) // console output is discarded, real terminals are slower
+                .redirectError(ProcessBuilder.Redirect.PIPE)
+                .start();
+            var result = new String(child.getErrorStream().readAllBytes()).trim();
+            child.waitFor();
+            System.out.printf("%-22s %s%n", config[0], result);
+        }
+    }
+
+    // one configuration: format and write fan-out lines the way Client.send does
+    private static void runChild(int count, boolean legacy) {
+        var writer = new PrintWriter(OutputStream.nullOutputStream(), true);
+        var lock = new Object();
+        var address = "127.0.0.1:50000";
+        for (int round = 0; round < 2; round++) { // first round warms up the JIT
+            long start = System.nanoTime();
+            for (int i = 0; i < count; i++) {
+                var message = Codec.join("MESSAGE", "Public", Integer.toUnsignedString(i));
+                if (legacy) {
+                    synchronized (lock) {
+                        System.out.println(address + " < " + message);
+                        writer.print(message + "\n");
+                        writer.flush();
+                    }
+                    continue;
+                }
+                if (Trace.DEBUG_ENABLED) Trace.debug(address, "<", message);
+                synchronized (lock) {
+                    writer.print(message + "\n");
+                    writer.flush();
+                }
+            }
+            long elapsed = System.nanoTime() - start;
+            if (round == 1) {
+                System.err.printf("%8.1f ns/msg %14.0f msgs/sec%n", (double) elapsed / count, count * 1e9 / elapsed);
+            }
+        }
+    }
+}
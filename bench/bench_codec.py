@@ -0,0 +1,73 @@
+"""Parse and encode throughput of the protocol codec against the old startswith chain.
+
+Usage: python bench/bench_codec.py [--lines N]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from client.codec import decode, encode
+from client.protocol import parseNotification
+
+def buildLines(count: int) -> list[str]:
+    lines = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            lines.append(f"JOIN|Public|user{i}")
+        elif kind == 1:
+            lines.append(f"MESSAGE|Group{i % 5 + 1}|{i * 7919}")
+        elif kind == 2:
+            lines.append(f"LEAVE|Public|user{i}")
+        else:
+            lines.append(f"VIEW|Public|{i}|user{i}|2024-11-02T18:04:11.123Z|subject {i}|some content for message {i}")
+    return lines
+
+# the previous onResponseReceived path: a startswith chain, then each parser splits the line again
+def legacyParse(response: str):
+    if response.startswith("GROUPS|"):
+        return response.split("|")[1:]
+    elif response.startswith("JOIN|"):
+        parts = response.split("|")
+        return [parts[1], parts[2]]
+    elif response.startswith("LEAVE|"):
+        parts = response.split("|")
+        return [parts[1], parts[2]]
+    elif response.startswith("MESSAGE|"):
+        parts = response.split("|")
+        return [parts[1], int(parts[2])]
+    elif response.startswith("VIEW|"):
+        parts = response.split("|")
+        return [parts[1], int(parts[2]), parts[3], datetime.fromisoformat(parts[4]), parts[5], parts[6]]
+
+def measure(name: str, fn, items: list):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<36} {elapsed * 1000:9.1f} ms {len(items) / elapsed:14,.0f} lines/sec")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000, help="lines parsed and encoded per run")
+    args = parser.parse_args()
+
+    lines = buildLines(args.lines)
+    escaped = [line.replace("subject", "sub\\pject").replace("content", "con\\ntent") for line in lines]
+    posts = [("Public", f"subject {i}", f"some content for message {i}") for i in range(args.lines)]
+    awkward = [("Public", f"a|b {i}", f"line one\nline two \\ {i}") for i in range(args.lines)]
+
+    print(f"{args.lines:,} lines")
+    measure("parse: startswith chain (old)", legacyParse, lines)
+    measure("parse: parseNotification", parseNotification, lines)
+    measure("parse: decode to typed messages", decode, lines)
+    measure("parse: decode with escapes", decode, escaped)
+    measure("encode: f-string POST (old)", lambda p: f"POST|{p[0]}|{p[1]}|{p[2]}", posts)
+    measure("encode: codec POST", lambda p: encode("POST", *p), posts)
+    measure("encode: codec POST needing escapes", lambda p: encode("POST", *p), awkward)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Replays a burst of server notifications through the listener framing and reports lines/sec.
+
+Usage: python bench/bench_framing.py [--lines N] [--chunk BYTES] [--buffer BYTES]
+"""
+import argparse
+import os
+import sys
+import time
+from socket import socketpair
+from threading import Thread
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from client.framing import DEFAULT_BUFFER_SIZE, LineFramer
+
+# builds a stream that looks like a busy board: joins, message ids and view bodies
+def buildStream(count: int) -> bytes:
+    lines = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            lines.append(f"JOIN|Public|user{i}")
+        elif kind == 1 or kind == 2:
+            lines.append(f"MESSAGE|Group{i % 5 + 1}|{i * 7919}")
+        else:
+            lines.append(f"VIEW|Public|{i}|user{i}|2024-11-02T18:04:11.123Z|Grüße {i}|naïve café content ✓ {i}")
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+# the previous listener loop: decode each chunk and split a growing str buffer
+def legacyFeed(data: bytes, chunk: int) -> int:
+    count = 0
+    buffer = ""
+    for i in range(0, len(data), chunk):
+        buffer += data[i:i + chunk].decode('utf-8', 'replace') # may split a multibyte character
+        while '\n' in buffer:
+            message, buffer = buffer.split('\n', 1)
+            count += 1
+    return count
+
+def framerFeed(data: bytes, chunk: int, bufferSize: int) -> int:
+    count = 0
+    framer = LineFramer(bufferSize)
+    view = memoryview(data)
+    for i in range(0, len(data), chunk):
+        count += len(framer.feed(view[i:i + chunk]))
+    return count
+
+# pushes the stream through a real socket pair so recv_into is exercised
+def framerSocket(data: bytes, bufferSize: int) -> int:
+    left, right = socketpair()
+    writer = Thread(target=lambda: (left.sendall(data), left.close()), daemon=True)
+    writer.start()
+    count = 0
+    framer = LineFramer(bufferSize)
+    for lines in framer.batches(right):
+        count += len(lines)
+    right.close()
+    writer.join()
+    return count
+
+def measure(name: str, fn, expected: int):
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    status = "ok" if count == expected else f"MISMATCH ({count} lines)"
+    print(f"{name:<28} {elapsed * 1000:9.1f} ms {expected / elapsed:14,.0f} lines/sec  {status}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000, help="number of notifications to replay")
+    parser.add_argument("--chunk", type=int, default=1024, help="bytes delivered per read for the in-memory runs")
+    parser.add_argument("--buffer", type=int, default=DEFAULT_BUFFER_SIZE, help="LineFramer buffer size")
+    args = parser.parse_args()
+
+    data = buildStream(args.lines)
+    print(f"{args.lines:,} notifications, {len(data):,} bytes")
+    measure(f"legacy str split ({args.chunk}B)", lambda: legacyFeed(data, args.chunk), args.lines)
+    measure(f"LineFramer.feed ({args.chunk}B)", lambda: framerFeed(data, args.chunk, args.buffer), args.lines)
+    measure(f"LineFramer.feed ({args.buffer}B)", lambda: framerFeed(data, args.buffer, args.buffer), args.lines)
+    measure("LineFramer.recvFrom socket", lambda: framerSocket(data, args.buffer), args.lines)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measures how fast the client search index grows and answers queries over many cached messages.
+
+Usage: python bench/bench_search.py [--messages 100000] [--vocabulary 30000] [--groups 6]
+
+Subjects and contents are drawn from a Zipf-like vocabulary so a few words are common and most are
+rare, like real posts. Each query is run repeatedly and its mean and worst time are reported.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from client.search import SearchIndex
+
+QUERIES = [
+    "w5",              # a common word
+    "w2917",           # a rare word
+    "w5 w40",          # two common words
+    "w12 w2917",       # common and rare
+    "w29*",            # prefix over a few hundred words
+    "w1234*",          # narrow prefix
+    "from:user7",      # one sender
+    "from:user7 w5",
+    "2024-02",         # a month of posts
+    "missing",         # no match
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=30_000, help="distinct words in posts")
+    parser.add_argument("--groups", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each query")
+    parser.add_argument("--json", help="write the results to this file as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    words = [f"w{i}" for i in range(args.vocabulary)]
+    weights = list(itertools.accumulate(1 / (i + 1) for i in range(args.vocabulary)))
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(args.messages):
+        subject = " ".join(rng.choices(words, cum_weights=weights, k=4))
+        content = " ".join(rng.choices(words, cum_weights=weights, k=30))
+        posts.append((f"Group{i % args.groups}", i, f"user{rng.randrange(300)}", start + timedelta(minutes=i),
+                      subject, content))
+
+    index = SearchIndex()
+    began = time.perf_counter()
+    for post in posts:
+        index.add(*post)
+    elapsed = time.perf_counter() - began
+    results = {
+        "messages": args.messages,
+        "indexPerSec": round(args.messages / elapsed),
+        "queries": {},
+    }
+    groups = [f"Group{i}" for i in range(args.groups)]
+    for query in QUERIES:
+        times = []
+        for _ in range(args.repeat):
+            began = time.perf_counter()
+            hits = index.search(query, groups)
+            times.append(time.perf_counter() - began)
+        results["queries"][query] = {
+            "hits": len(hits),
+            "meanMs": round(sum(times) / len(times) * 1000, 3),
+            "maxMs": round(max(times) * 1000, 3),
+        }
+    results["index"] = index.stats()
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Hosts many client sessions in one process on one thread and measures notification throughput.
+
+Usage: python bench/bench_sessions.py [--port PORT] [--sessions 1000] [--groups 6] [--duration 10] [--rate 200]
+
+Without --port a Python stand-in server is started in a separate process, so only the session
+pool runs in this one. CPU time of this process is reported next to wall time; a pool that keeps
+up on one core stays below 100%.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from client.sessions import SessionPool
+
+def startStandIn() -> tuple[subprocess.Popen, int]:
+    proc = subprocess.Popen([sys.executable, "-m", "client.standin", "--port", "0"], stdout=subprocess.PIPE, text=True,
+                            cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    line = proc.stdout.readline() # Waiting for connections on port N
+    return proc, int(line.rsplit(" ", 1)[1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port printed by the server, a stand-in is started if omitted")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=6, help="groups the sessions are spread over")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of measured load")
+    parser.add_argument("--rate", type=float, default=200, help="posts/sec across all sessions")
+    parser.add_argument("--json", help="write the results to this file as JSON")
+    args = parser.parse_args()
+
+    proc = None
+    if args.port is None:
+        proc, args.port = startStandIn()
+    try:
+        pool = SessionPool()
+        groups = ["Public", "Group1", "Group2", "Group3", "Group4", "Group5"][:args.groups]
+        received = 0
+        def onNotification(session, note):
+            nonlocal received
+            if note.kind == "MESSAGE":
+                received += 1
+        sessions = []
+        for i in range(args.sessions):
+            session = pool.open(args.host, args.port, f"bot{i}", onNotification)
+            session.join(groups[i % len(groups)])
+            sessions.append(session)
+            if i % 100 == 99:
+                pool.poll(0) # let the first joins through while connecting the rest
+        deadline = time.perf_counter() + 30
+        while sum(len(s.groups) for s in sessions) < len(sessions) and time.perf_counter() < deadline:
+            pool.poll(0.1)
+        joined = sum(1 for s in sessions if s.groups)
+
+        received = 0
+        posts = 0
+        counter = itertools.count()
+        gap = 1 / args.rate if args.rate > 0 else 0
+        cpuStart = time.process_time()
+        began = time.perf_counter()
+        nextPost = began
+        stop = began + args.duration
+        while (now := time.perf_counter()) < stop:
+            while gap and nextPost <= now:
+                session = random.choice(sessions)
+                session.post(next(iter(session.groups), groups[0]), f"bench:{next(counter)}", "hello from the pool")
+                posts += 1
+                nextPost += gap
+            pool.poll(max(0.0, min(nextPost, stop) - time.perf_counter()))
+        elapsed = time.perf_counter() - began
+        cpu = time.process_time() - cpuStart
+        stats = pool.stats(perSession=True)
+        perSession = sorted(s["linesIn"] for s in stats.pop("perSession"))
+        for session in sessions:
+            session.exit()
+        for _ in range(10):
+            pool.poll(0.05)
+        pool.closeAll()
+    finally:
+        if proc is not None:
+            proc.terminate()
+
+    results = {
+        "sessions": args.sessions,
+        "joined": joined,
+        "posts": posts,
+        "messagesDelivered": received,
+        "messagesPerSec": round(received / elapsed, 1),
+        "cpuPercent": round(cpu / elapsed * 100, 1),
+        "linesPerSessionMin": perSession[0],
+        "linesPerSessionMedian": perSession[len(perSession) // 2],
+        "linesPerSessionMax": perSession[-1],
+        "pool": stats,
+    }
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Measures POST to MESSAGE fan-out latency for healthy clients while slow clients stop reading.
+
+Usage: python bench/bench_slow_consumers.py [--port PORT] [--healthy 20] [--slow 5] [--duration 20] [--rate 100]
+
+Healthy clients read everything as it arrives. Slow clients join the same group with a tiny receive
+buffer, keep asking for a large message with VIEW and read at most --slow-read bytes/sec (0 never reads),
+so their share of every fan-out backs up on the server. The server's outbound queues should keep the
+healthy clients' latency flat for the whole run; the table prints p50/p99 per second of the run.
+Without --port a Python stand-in server is started in a separate process.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from client.metrics import Histogram
+from client.protocol import createJoinQuery, createViewQuery
+from client.sessions import SessionPool
+
+GROUP = "Group5"
+
+def startStandIn() -> tuple[subprocess.Popen, int]:
+    proc = subprocess.Popen([sys.executable, "-m", "client.standin", "--port", "0"], stdout=subprocess.PIPE, text=True,
+                            cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    line = proc.stdout.readline() # Waiting for connections on port N
+    return proc, int(line.rsplit(" ", 1)[1])
+
+# a client that joins and asks for big replies but hardly reads them
+class SlowClient:
+    def __init__(self, host: str, port: int, name: str) -> None:
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096) # before connect, so the window stays small
+        self.sock.connect((host, port))
+        self.sock.setblocking(False)
+        self.sock.send(f"{createJoinQuery(GROUP, name)}\n".encode('utf-8'))
+        self.bytesIn = 0
+        self.views = 0
+        self.closed = False
+
+    def spam(self, id: int, count: int) -> None:
+        line = f"{createViewQuery(GROUP, id)}\n".encode('utf-8') * count
+        try:
+            self.sock.send(line)
+            self.views += count
+        except BlockingIOError:
+            pass # the server stopped reading us too
+        except OSError:
+            self.closed = True
+
+    def read(self, budget: int) -> None:
+        while budget > 0 and not self.closed:
+            try:
+                data = self.sock.recv(min(budget, 4096))
+            except BlockingIOError:
+                return
+            except OSError:
+                data = b""
+            if not data:
+                self.closed = True # the server gave up on us
+                return
+            self.bytesIn += len(data)
+            budget -= len(data)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port printed by the server, a stand-in is started if omitted")
+    parser.add_argument("--healthy", type=int, default=20, help="clients that read everything")
+    parser.add_argument("--slow", type=int, default=5, help="clients that stop reading")
+    parser.add_argument("--slow-read", type=int, default=0, help="bytes/sec each slow client reads, 0 never reads")
+    parser.add_argument("--body", type=int, default=32 * 1024, help="size of the message slow clients VIEW")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of measured load")
+    parser.add_argument("--rate", type=float, default=100, help="posts/sec")
+    parser.add_argument("--json", help="write the results to this file as JSON")
+    args = parser.parse_args()
+
+    proc = None
+    if args.port is None:
+        proc, args.port = startStandIn()
+    try:
+        pool = SessionPool()
+        postTimes: list[float] = [] # post number -> time sent
+        baseId = None # id of the large warm-up post, later ids follow it in post order
+        seconds: list[Histogram] = [Histogram() for _ in range(int(args.duration) + 1)]
+        overall = Histogram()
+        delivered = 0
+        began = 0.0
+        def onNotification(session, note):
+            nonlocal baseId, delivered
+            if note.kind != "MESSAGE" or note.group != GROUP:
+                return
+            if baseId is None:
+                baseId = note.id
+                return
+            index = note.id - baseId - 1
+            if 0 <= index < len(postTimes):
+                now = time.perf_counter()
+                latency = now - postTimes[index]
+                overall.record(latency)
+                seconds[min(int(postTimes[index] - began), len(seconds) - 1)].record(latency)
+                delivered += 1
+
+        poster = pool.open(args.host, args.port, "poster")
+        poster.join(GROUP)
+        healthy = [pool.open(args.host, args.port, f"healthy{i}", onNotification) for i in range(args.healthy)]
+        for session in healthy:
+            session.join(GROUP)
+        deadline = time.perf_counter() + 10
+        while not all(s.groups for s in healthy + [poster]) and time.perf_counter() < deadline:
+            pool.poll(0.1)
+        poster.post(GROUP, "large", "x" * args.body)
+        while baseId is None and time.perf_counter() < deadline:
+            pool.poll(0.1)
+        if baseId is None:
+            sys.exit("no MESSAGE for the warm-up post")
+
+        slow = [SlowClient(args.host, args.port, f"slow{i}") for i in range(args.slow)]
+        gap = 1 / args.rate
+        began = time.perf_counter()
+        nextPost = began
+        lastTick = began
+        stop = began + args.duration
+        while (now := time.perf_counter()) < stop:
+            while nextPost <= now:
+                postTimes.append(time.perf_counter())
+                poster.post(GROUP, f"bench:{len(postTimes)}", "hello")
+                nextPost += gap
+            if now - lastTick >= 0.01:
+                for client in slow:
+                    if not client.closed:
+                        client.spam(baseId, 4)
+                        client.read(int(args.slow_read * (now - lastTick)))
+                lastTick = now
+            pool.poll(max(0.0, min(nextPost, lastTick + 0.01) - time.perf_counter()))
+        drain = time.perf_counter() + 2
+        while time.perf_counter() < drain:
+            pool.poll(0.05)
+        disconnected = sum(1 for c in slow if c.closed)
+        for client in slow:
+            client.sock.close()
+        for session in healthy + [poster]:
+            session.exit()
+        for _ in range(10):
+            pool.poll(0.05)
+        pool.closeAll()
+    finally:
+        if proc is not None:
+            proc.terminate()
+
+    expected = len(postTimes) * len(healthy)
+    perSecond = [{"second": i, **h.summary()} for i, h in enumerate(seconds) if h.count]
+    print(f"{'second':>6} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for row in perSecond:
+        print(f"{row['second']:>6} {row['count']:>7} {row['p50']:>9.2f} {row['p99']:>9.2f} {row['max']:>9.2f}")
+    results = {
+        "healthy": args.healthy,
+        "slow": args.slow,
+        "slowRead": args.slow_read,
+        "posts": len(postTimes),
+        "delivered": delivered,
+        "lost": expected - delivered,
+        "slowDisconnected": disconnected,
+        "slowViewsSent": sum(c.views for c in slow),
+        "latency": overall.summary(),
+        "perSecond": perSecond,
+    }
+    print(json.dumps({k: v for k, v in results.items() if k != "perSecond"}, indent=2))
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Time from launching the CLI or GUI client to its first connection reaching the server.
+
+Usage: python bench/bench_startup.py [--runs 10] [--typing 0] [--before REV] [--client cli|gui|both]
+
+Each run spawns a fresh interpreter and times it until this script accepts its connection. The CLI
+is fed the host and port on stdin; the GUI is driven through a mainloop patched to fill in the
+connection form and click Connect, so it needs a display. --typing waits that long before answering,
+like a user typing the address. --before REV checks out an older revision in a temporary git worktree
+and measures it the same way for comparison.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# runs gui.py as __main__ with mainloop replaced by a scripted connect, prints when the window was ready
+GUI_HARNESS = """
+import os, runpy, sys, time, tkinter
+path, host, port, typing = sys.argv[1], sys.argv[2], sys.argv[3], float(sys.argv[4])
+def mainloop(self, n=0):
+    self.update() # draw the connection form
+    print(f"window {time.time()}", flush=True)
+    time.sleep(typing)
+    for child in self.winfo_children():
+        if hasattr(child, "_handleConnect"):
+            child._userNameVar.set("bench")
+            child._hostVar.set(host)
+            child._portVar.set(port)
+            child._handleConnect()
+    os._exit(0)
+tkinter.Misc.mainloop = mainloop
+sys.path.insert(0, os.path.dirname(path))
+sys.argv = [path]
+runpy.run_path(path, run_name="__main__")
+"""
+
+def measureOnce(kind: str, root: str, listener: socket.socket, typing: float) -> dict[str, float]:
+    port = listener.getsockname()[1]
+    if kind == "cli":
+        command = [sys.executable, os.path.join(root, "cli.py")]
+    else:
+        command = [sys.executable, "-c", GUI_HARNESS, os.path.join(root, "gui.py"), "127.0.0.1", str(port), str(typing)]
+    start = time.time()
+    child = subprocess.Popen(command, cwd=root, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, text=True)
+    try:
+        if kind == "cli":
+            time.sleep(typing)
+            child.stdin.write(f"127.0.0.1\n{port}\n")
+            child.stdin.flush()
+        listener.settimeout(30)
+        try:
+            conn, _ = listener.accept()
+        except socket.timeout:
+            child.kill()
+            raise RuntimeError(f"{kind} never connected: {child.communicate()[1].strip()}")
+        connected = time.time()
+        conn.close()
+        result = {"connectMs": (connected - start - typing) * 1000}
+        if kind == "gui":
+            line = child.stdout.readline()
+            if line.startswith("window "):
+                result["windowMs"] = (float(line.split()[1]) - start) * 1000
+        return result
+    finally:
+        child.kill()
+        child.communicate()
+
+def measure(kind: str, root: str, runs: int, typing: float) -> dict[str, float]:
+    with socket.create_server(("127.0.0.1", 0)) as listener:
+        measureOnce(kind, root, listener, typing) # warm up, writes the .pyc files
+        samples = [measureOnce(kind, root, listener, typing) for _ in range(runs)]
+    result = {}
+    for key in samples[0]:
+        values = [sample[key] for sample in samples]
+        result[key] = round(statistics.median(values), 1)
+        result[key.replace("Ms", "MinMs")] = round(min(values), 1)
+    return result
+
+def measureAll(root: str, kinds: list[str], runs: int, typing: float) -> dict[str, dict]:
+    results = {}
+    for kind in kinds:
+        try:
+            results[kind] = measure(kind, root, runs, typing)
+        except RuntimeError as e:
+            results[kind] = {"error": str(e).splitlines()[-1] if str(e) else "failed"}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="launches of each client")
+    parser.add_argument("--typing", type=float, default=0.0, metavar="SECONDS",
+                        help="delay before the address is entered, not counted in the connect time")
+    parser.add_argument("--client", choices=["cli", "gui", "both"], default="both")
+    parser.add_argument("--before", metavar="REV", help="also measure this git revision, e.g. HEAD~1")
+    parser.add_argument("--json", help="write the results to this file as JSON")
+    args = parser.parse_args()
+
+    kinds = ["cli", "gui"] if args.client == "both" else [args.client]
+    results = {}
+    if args.before:
+        worktree = tempfile.mkdtemp(prefix="bench_startup")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, args.before], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            results["before"] = measureAll(worktree, kinds, args.runs, args.typing)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, check=True)
+    results["after"] = measureAll(ROOT, kinds, args.runs, args.typing)
+
+    print(f"median (min) ms over {args.runs} runs, typing delay {args.typing}s excluded")
+    print(f"{'':<8}{'client':<6}{'connect':>18}{'window':>18}")
+    for version, byKind in results.items():
+        for kind, result in byKind.items():
+            if "error" in result:
+                print(f"{version:<8}{kind:<6}  {result['error']}")
+                continue
+            connect = f"{result['connectMs']:.1f} ({result['connectMinMs']:.1f})"
+            window = f"{result['windowMs']:.1f} ({result['windowMinMs']:.1f})" if "windowMs" in result else "-"
+            print(f"{version:<8}{kind:<6}{connect:>18}{window:>18}")
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+if __name__ == "__main__":
+    main()
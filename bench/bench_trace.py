@@ -0,0 +1,47 @@
+"""Overhead of protocol tracing on the client receive path at each trace level.
+
+Usage: python bench/bench_trace.py [--lines N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from client import trace
+from client.aio import AsyncClient
+from bench_codec import buildLines
+
+def measure(name: str, client: AsyncClient, lines: list[str]):
+    start = time.perf_counter()
+    for line in lines:
+        client._dispatch(line)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed * 1000:9.1f} ms {elapsed / len(lines) * 1e9:9.0f} ns/line")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000, help="lines dispatched per run")
+    args = parser.parse_args()
+
+    lines = buildLines(args.lines)
+    with open(os.devnull, "w") as devnull:
+        # console output goes to /dev/null, so these numbers understate what a real terminal costs
+        def echo(text: str):
+            print(text, file=devnull)
+        configs = [
+            ("legacy print echo", trace.Tracer(trace.OFF), lambda line: print(f"! {line}", file=devnull)),
+            ("off", trace.Tracer(trace.OFF), None),
+            ("info", trace.Tracer(trace.INFO), None),
+            ("debug, ring only", trace.Tracer(trace.DEBUG), None),
+            ("debug, sample 1/16", trace.Tracer(trace.DEBUG, sample=16), None),
+            ("debug, echo", trace.Tracer(trace.DEBUG, echo=echo), None),
+        ]
+        print(f"{args.lines:,} lines")
+        for name, tracer, handler in configs:
+            client = AsyncClient(tracer=tracer)
+            client.addHandler(handler or (lambda line: None))
+            measure(name, client, lines)
+
+if __name__ == "__main__":
+    main()
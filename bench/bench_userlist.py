@@ -0,0 +1,97 @@
+"""Measures JOIN/LEAVE throughput of the group user list, old listbox scan against the indexed list.
+
+Usage: python bench/bench_userlist.py [--users N]
+
+Without a display the listbox is emulated by a Python list, which is a lower bound
+for the old implementation since a real Listbox.get(0, END) also crosses into Tcl.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from client.userlist import UserIndex
+
+ROWS = 10 # rows the virtualized view materializes
+
+# stands in for a tkinter Listbox when no display is available
+class FakeListbox:
+    def __init__(self) -> None:
+        self._items: list[str] = []
+    def get(self, first, last=None):
+        return tuple(self._items)
+    def insert(self, index, *items):
+        self._items.extend(items)
+    def delete(self, first, last=None):
+        if last is None:
+            del self._items[first]
+        else:
+            self._items.clear()
+
+def makeListbox():
+    try:
+        from tkinter import Listbox, Tk, TclError
+        try:
+            root = Tk()
+        except TclError:
+            return FakeListbox, "emulated listbox"
+        root.withdraw()
+        return (lambda: Listbox(root)), "tk listbox"
+    except ImportError:
+        return FakeListbox, "emulated listbox"
+
+# the previous UsersFrame.add/remove, scanning every row on each event
+def legacy(box, names: list[str]):
+    for name in names:
+        items = box.get(0, 'end')
+        if name in items:
+            continue
+        box.insert('end', name)
+    for name in names:
+        items = box.get(0, 'end')
+        if name not in items:
+            continue
+        box.delete(items.index(name))
+
+# the indexed list, rendering only the visible rows once per batch of events
+def indexed(box, names: list[str], batch: int):
+    users = UserIndex()
+    def render():
+        box.delete(0, 'end')
+        rows = users.rows(0, ROWS)
+        if rows:
+            box.insert('end', *rows)
+    for i, name in enumerate(names, 1):
+        users.add(name)
+        if i % batch == 0:
+            render()
+    for i, name in enumerate(names, 1):
+        users.remove(name)
+        if i % batch == 0:
+            render()
+    render()
+
+def measure(name: str, fn, events: int):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed * 1000:10.1f} ms {events / elapsed:14,.0f} events/sec")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs='+', default=[1_000, 10_000], help="group sizes to replay")
+    parser.add_argument("--batch", type=int, default=500, help="events applied per ui frame")
+    args = parser.parse_args()
+
+    newBox, kind = makeListbox()
+    print(f"using {kind}")
+    for count in args.users:
+        names = [f"user{i}" for i in range(count)]
+        events = count * 2 # one JOIN and one LEAVE per user
+        print(f"{count:,} users")
+        measure("  listbox scan (old)", lambda: legacy(newBox(), names), events)
+        measure("  UserIndex + virtual view", lambda: indexed(newBox(), names, args.batch), events)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Load generator: N simulated clients across M groups posting and viewing against a local server.
+
+Usage: java Server  (note the port it prints), then
+       python bench/loadgen.py --port PORT [--clients 50] [--groups 3] [--duration 10] [--json out.json]
+   or: python bench/loadgen.py --standin ...  to run against the in-process Python stand-in server
+
+Reports POST->MESSAGE fan-out latency, VIEW round trip percentiles and sustained messages/sec.
+Fan-out latency is matched by a token in the post subject; one observer per group VIEWs every
+new id to learn which post it belongs to, those VIEWs are part of the measured mix.
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from client.aio import AsyncClient
+from client.codec import decode
+from client.protocol import createJoinQuery, createPostQuery
+from client.standin import StandInServer
+
+TOKEN_PREFIX = "bench:" # subjects of benchmark posts look like bench:<post number>
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """p50/p95/p99/max in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+    return {"count": len(ordered), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99),
+            "max": round(ordered[-1] * 1000, 3)}
+
+def currentCommit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+# shared measurements of one run
+class Recorder:
+    def __init__(self) -> None:
+        self.postSent: dict[int, float] = {} # post number -> send time
+        self.postOf: dict[tuple[str, int], int] = {} # (group, message id) -> post number
+        self.arrivals: dict[tuple[str, int], list[float]] = {} # (group, message id) -> MESSAGE receive times
+        self.viewRtts: list[float] = []
+        self.viewTimeouts = 0
+        self.posts = 0
+        self.messages = 0 # MESSAGE notifications delivered to any client
+        self.measuring = False
+
+    def fanoutLatencies(self) -> list[float]:
+        latencies = []
+        for key, times in self.arrivals.items():
+            post = self.postOf.get(key)
+            if post is None:
+                continue
+            sent = self.postSent[post]
+            latencies.extend(t - sent for t in times)
+        return latencies
+
+# one simulated user
+class SimClient:
+    def __init__(self, index: int, group: str, recorder: Recorder, observer: bool) -> None:
+        self.name = f"bench{index}"
+        self.group = group
+        self.recorder = recorder
+        self.observer = observer # resolves message ids of this group to post numbers
+        self.client = AsyncClient()
+        self.known: list[int] = [] # message ids announced in our group
+        self._toResolve: asyncio.Queue = asyncio.Queue()
+
+    def _onLine(self, line: str):
+        now = time.perf_counter()
+        note = decode(line)
+        if note is None or note.kind != "MESSAGE":
+            return
+        group, msgId = note.group, note.id
+        self.known.append(msgId)
+        if self.recorder.measuring:
+            self.recorder.messages += 1
+            self.recorder.arrivals.setdefault((group, msgId), []).append(now)
+            if self.observer:
+                self._toResolve.put_nowait(msgId)
+
+    async def start(self, host: str, port: int):
+        if not await self.client.connect(host, port):
+            raise ConnectionError(f"{self.name} could not connect to {host}:{port}")
+        self.client.addHandler(self._onLine)
+        await self.client.send(createJoinQuery(self.group, self.name))
+
+    async def resolve(self):
+        # observer loop: VIEW each new id to learn which post produced it
+        while True:
+            msgId = await self._toResolve.get()
+            reply = await self._view(msgId)
+            if reply is not None and reply.subject.startswith(TOKEN_PREFIX):
+                self.recorder.postOf[(self.group, msgId)] = int(reply.subject[len(TOKEN_PREFIX):])
+
+    async def _view(self, msgId: int):
+        start = time.perf_counter()
+        try:
+            reply = await self.client.view(self.group, msgId, timeout=5)
+        except asyncio.TimeoutError:
+            self.recorder.viewTimeouts += 1
+            return None
+        if self.recorder.measuring:
+            self.recorder.viewRtts.append(time.perf_counter() - start)
+        return reply
+
+    async def drive(self, stop: float, interval: float, viewRatio: float, counter):
+        while time.perf_counter() < stop:
+            await asyncio.sleep(random.expovariate(1 / interval) if interval > 0 else 0)
+            if self.known and random.random() < viewRatio:
+                await self._view(random.choice(self.known))
+            else:
+                post = next(counter)
+                self.recorder.postSent[post] = time.perf_counter()
+                self.recorder.posts += 1
+                await self.client.send(createPostQuery(self.group, f"{TOKEN_PREFIX}{post}", f"load from {self.name}"))
+
+async def run(args) -> dict:
+    recorder = Recorder()
+    standin = None
+    if args.standin:
+        # shares this event loop, so its work is included in the measured latencies
+        standin = StandInServer()
+        args.port = await standin.start(args.host, 0)
+    probe = AsyncClient()
+    if not await probe.connect(args.host, args.port):
+        raise SystemExit(f"could not connect to {args.host}:{args.port}")
+    groups = sorted(await probe.groups())[:args.groups]
+    await probe.exit()
+
+    clients = [SimClient(i, groups[i % len(groups)], recorder, observer=i < len(groups)) for i in range(args.clients)]
+    for start in range(0, len(clients), 100): # connect in waves to avoid overflowing the accept backlog
+        await asyncio.gather(*(c.start(args.host, args.port) for c in clients[start:start + 100]))
+    await asyncio.sleep(args.warmup)
+
+    resolvers = [asyncio.create_task(c.resolve()) for c in clients if c.observer]
+    counter = iter(range(1 << 62))
+    recorder.measuring = True
+    began = time.perf_counter()
+    stop = began + args.duration
+    interval = args.clients / args.rate if args.rate > 0 else 0 # per client mean gap between operations
+    await asyncio.gather(*(c.drive(stop, interval, args.view_ratio, counter) for c in clients))
+    elapsed = time.perf_counter() - began
+    await asyncio.sleep(args.drain) # let the last notifications arrive
+    recorder.measuring = False
+    for task in resolvers:
+        task.cancel()
+    await asyncio.gather(*(c.client.exit() for c in clients), return_exceptions=True)
+    if standin is not None:
+        await standin.stop()
+
+    return {
+        "commit": currentCommit(),
+        "config": {"server": "standin" if standin is not None else f"{args.host}:{args.port}",
+                   "clients": args.clients, "groups": groups, "duration": args.duration,
+                   "rate": args.rate, "viewRatio": args.view_ratio},
+        "posts": recorder.posts,
+        "postsPerSec": round(recorder.posts / elapsed, 1),
+        "messagesDelivered": recorder.messages,
+        "messagesPerSec": round(recorder.messages / elapsed, 1),
+        "fanoutLatencyMs": percentiles(recorder.fanoutLatencies()),
+        "viewRttMs": percentiles(recorder.viewRtts),
+        "viewTimeouts": recorder.viewTimeouts,
+    }
+
+def isLoopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="server host, must be a loopback address")
+    parser.add_argument("--port", type=int, help="port printed by the server")
+    parser.add_argument("--standin", action="store_true", help="start the Python stand-in server in this process instead")
+    parser.add_argument("--clients", type=int, default=50, help="simulated clients")
+    parser.add_argument("--groups", type=int, default=3, help="groups the clients are spread over")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of measured load")
+    parser.add_argument("--rate", type=float, default=200, help="operations/sec across all clients, 0 for as fast as possible")
+    parser.add_argument("--view-ratio", type=float, default=0.5, help="fraction of operations that are VIEWs")
+    parser.add_argument("--warmup", type=float, default=1, help="seconds to wait after everyone joined")
+    parser.add_argument("--drain", type=float, default=1, help="seconds to wait for late notifications")
+    parser.add_argument("--json", help="write the results to this file as JSON")
+    args = parser.parse_args()
+    if args.port is None and not args.standin:
+        parser.error("either --port or --standin is required")
+    if not isLoopback(args.host):
+        parser.error("the load generator only targets loopback servers")
+
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
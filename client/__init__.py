@@ -0,0 +1 @@
+# shared client-side building blocks, with the command line and GUI clients in cli.py and gui.py
@@ -0,0 +1,309 @@
+import asyncio
+from collections import deque
+from socket import IPPROTO_TCP, TCP_NODELAY
+from threading import get_ident
+from typing import AsyncIterator, Callable
+from client import trace
+from client.codec import Notification, ViewMsg, decode
+from client.framing import DEFAULT_BUFFER_SIZE, LineFramer
+from client.metrics import LatencyTracker, pingLoop
+from client.outbound import FAIL, OutboundFull, OutboundQueue
+from client.protocol import (createExitQuery, createGroupsQuery, createHistoryQuery, createJoinQuery,
+                             createLeaveQuery, createPostQuery, createViewQuery)
+from client.record import Recorder
+
+# how long request helpers wait for the matching reply by default
+DEFAULT_TIMEOUT = 10.0
+# lines kept for a handler or iterator attaching late, older ones are dropped
+BACKLOG_LINES = 1024
+
+# a single connection to the board server driven by an asyncio event loop
+class AsyncClient:
+    def __init__(self, bufferSize: int = DEFAULT_BUFFER_SIZE, outbound: OutboundQueue | None = None,
+                 noDelay: bool = True, latency: LatencyTracker | None = None,
+                 tracer: trace.Tracer | None = None) -> None:
+        self.bufferSize = bufferSize # bytes read from the stream at a time
+        self.outbound = outbound if outbound is not None else OutboundQueue() # commands waiting for the writer task
+        self.noDelay = noDelay # TCP_NODELAY, False lets the kernel coalesce small writes too
+        self.latency = latency # round trip times per command, None to skip measuring
+        self.tracer = tracer if tracer is not None else trace.tracer
+        self.recorder: Recorder | None = None # writes every received line to a recording, closed with the connection
+        self.connected = False
+        self._loopThread: int | None = None # thread running the event loop, set by connect
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._readTask: asyncio.Task | None = None
+        self._writeTask: asyncio.Task | None = None
+        self._pingTask: asyncio.Task | None = None
+        self._ready: asyncio.Event | None = None # set when lines arrive in an empty outbound queue
+        self._space: asyncio.Event | None = None # set whenever the writer takes lines
+        self._handlers: list[Callable[[str], None]] = [] # raw line callbacks
+        self._subscribers: list[asyncio.Queue] = [] # queues feeding notifications() iterators
+        self._waiters: list[tuple[Callable[[Notification], bool], asyncio.Future]] = [] # pending request replies
+        self._backlog: deque[str] | None = deque(maxlen=BACKLOG_LINES) # lines held until the first handler or iterator attaches
+        self.closed: asyncio.Event | None = None # set once the read loop has stopped
+
+    async def connect(self, host: str, port: int) -> bool:
+        """Opens the connection and starts reading, returns whether it succeeded"""
+        try:
+            self._reader, self._writer = await asyncio.open_connection(host, port)
+        except OSError as e:
+            self.connected = False
+            if self.tracer.level >= trace.ERROR:
+                self.tracer.record(trace.ERROR, "connect", f"{host}:{port} failed: {e}")
+            return False
+        if self.tracer.level >= trace.INFO:
+            self.tracer.record(trace.INFO, "connect", f"{host}:{port}")
+        sock = self._writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(IPPROTO_TCP, TCP_NODELAY, int(self.noDelay))
+        self.connected = True
+        self._loopThread = get_ident()
+        self.closed = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        # the queue is filled from other threads too, so wake the loop thread-safely
+        self.outbound.onReady = lambda: loop.call_soon_threadsafe(self._ready.set)
+        self.outbound.onSpace = self._space.set # only the writer task takes lines
+        self._readTask = asyncio.create_task(self._readLoop())
+        self._writeTask = asyncio.create_task(self._writeLoop())
+        return True
+
+    async def close(self) -> None:
+        """Closes the connection and waits for the read loop to stop"""
+        self.connected = False
+        self._closeOutbound()
+        if self._writeTask is not None:
+            self._writeTask.cancel()
+        if self._pingTask is not None:
+            self._pingTask.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        if self._readTask is not None:
+            await asyncio.gather(self._readTask, return_exceptions=True)
+
+    def addHandler(self, handle: Callable[[str], None]) -> None:
+        """Registers a callback invoked on the event loop for every raw line received"""
+        self._handlers.append(handle)
+        for line in self._takeBacklog():
+            handle(line)
+
+    def removeHandler(self, handle: Callable[[str], None]) -> None:
+        if handle in self._handlers:
+            self._handlers.remove(handle)
+
+    async def notifications(self) -> AsyncIterator[Notification]:
+        """Yields decoded notifications until the connection closes"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for line in self._takeBacklog():
+            note = decode(line)
+            if note is not None:
+                queue.put_nowait(note)
+        self._subscribers.append(queue)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                yield item
+        finally:
+            self._subscribers.remove(queue)
+
+    async def send(self, msg: str) -> None:
+        """Queues a command line for the writer, waiting for room if the queue is full"""
+        if not self.connected:
+            raise RuntimeError("Socket not connected")
+        while not self.outbound.tryPut(msg):
+            if self.outbound.policy == FAIL:
+                self.outbound.rejected += 1
+                raise OutboundFull(f"{len(self.outbound)} commands already waiting to be sent")
+            self._space.clear()
+            await self._space.wait()
+            if not self.connected:
+                raise RuntimeError("Socket not connected")
+        if self.latency is not None:
+            self.latency.onSend(msg)
+        if self.tracer.level >= trace.DEBUG:
+            self.tracer.record(trace.DEBUG, ">", msg)
+
+    def sendNowait(self, msg: str) -> None:
+        """Queues a command line from any thread, never blocks the event loop"""
+        if not self.connected:
+            raise RuntimeError("Socket not connected")
+        if get_ident() == self._loopThread:
+            # e.g. a handler replying to a notification, waiting here would stop the writer that makes room
+            if not self.outbound.tryPut(msg):
+                self.outbound.rejected += 1
+                raise OutboundFull(f"{len(self.outbound)} commands already waiting to be sent")
+        else:
+            self.outbound.put(msg)
+        if self.latency is not None:
+            self.latency.onSend(msg)
+        if self.tracer.level >= trace.DEBUG:
+            self.tracer.record(trace.DEBUG, ">", msg)
+
+    async def flush(self) -> None:
+        """Waits until every queued command has been handed to the socket"""
+        while self._space is not None and len(self.outbound) and self.connected:
+            self._space.clear()
+            await self._space.wait()
+
+    def startPing(self, interval: float) -> None:
+        """Sends a PING every interval seconds so the latency tracker sees the network round trip"""
+        if self.latency is None:
+            self.latency = LatencyTracker()
+        if self._pingTask is None or self._pingTask.done():
+            self._pingTask = asyncio.get_running_loop().create_task(pingLoop(self, interval))
+
+    async def groups(self, timeout: float = DEFAULT_TIMEOUT) -> list[str]:
+        """Requests the list of groups on the server"""
+        reply = self._expect(lambda msg: msg.kind == "GROUPS")
+        await self._request(createGroupsQuery(), reply)
+        return (await self._await(reply, timeout)).groups
+
+    async def join(self, group: str, name: str, timeout: float = DEFAULT_TIMEOUT) -> None:
+        """Joins a group and waits for the server to confirm it"""
+        reply = self._expect(lambda msg: msg.kind == "JOIN" and msg.group == group and msg.name == name)
+        await self._request(createJoinQuery(group, name), reply)
+        await self._await(reply, timeout)
+
+    async def leave(self, group: str) -> None:
+        await self.send(createLeaveQuery(group))
+
+    async def post(self, group: str, subject: str, content: str) -> None:
+        await self.send(createPostQuery(group, subject, content))
+
+    async def view(self, group: str, id: int, timeout: float = DEFAULT_TIMEOUT) -> ViewMsg:
+        """Requests the contents of a message and returns the decoded VIEW reply"""
+        reply = self._expect(lambda msg: msg.kind == "VIEW" and msg.group == group and msg.id == id)
+        await self._request(createViewQuery(group, id), reply)
+        return await self._await(reply, timeout)
+
+    async def history(self, group: str, before: int = 0, limit: int = 50,
+                      timeout: float = DEFAULT_TIMEOUT) -> list[int]:
+        """Requests up to limit message ids older than before (0 for the newest), oldest first"""
+        reply = self._expect(lambda msg: msg.kind == "HISTORY" and msg.group == group and msg.before == before)
+        await self._request(createHistoryQuery(group, before, limit), reply)
+        return (await self._await(reply, timeout)).ids
+
+    async def exit(self, timeout: float = 1.0) -> None:
+        """Tells the server we are leaving and closes the connection, waiting up to timeout for queued commands"""
+        if self.connected:
+            try:
+                await self.send(createExitQuery())
+                await asyncio.wait_for(self.flush(), timeout)
+            except (RuntimeError, asyncio.TimeoutError):
+                pass # the connection is going anyway
+        await self.close()
+
+    def _expect(self, match: Callable[[Notification], bool]) -> asyncio.Future:
+        # registers interest in the next notification matching the predicate
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((match, future))
+        return future
+
+    async def _request(self, query: str, reply: asyncio.Future):
+        try:
+            await self.send(query)
+        except BaseException:
+            self._forget(reply)
+            raise
+
+    async def _await(self, reply: asyncio.Future, timeout: float):
+        try:
+            return await asyncio.wait_for(reply, timeout)
+        finally:
+            self._forget(reply)
+
+    def _takeBacklog(self) -> deque[str]:
+        # hand over lines received before anyone was listening, only once
+        backlog = self._backlog or deque()
+        self._backlog = None
+        return backlog
+
+    def _closeOutbound(self):
+        # drops queued commands and wakes senders blocked on a full queue and flush()
+        self.outbound.close()
+        if self._space is not None:
+            self._space.set()
+
+    def _forget(self, reply: asyncio.Future):
+        self._waiters = [w for w in self._waiters if w[1] is not reply]
+
+    async def _writeLoop(self):
+        # drains the outbound queue, one socket write per batch of commands
+        queue = self.outbound
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while len(queue):
+                    if queue.flushDelay and queue.pendingBytes < queue.flushBytes:
+                        await asyncio.sleep(queue.flushDelay) # give more commands a chance to join the batch
+                    self._writer.write(queue.take())
+                    await self._writer.drain()
+        except OSError:
+            self.connected = False
+            self._closeOutbound()
+
+    async def _readLoop(self):
+        framer = LineFramer(self.bufferSize)
+        try:
+            while True:
+                data = await self._reader.read(self.bufferSize)
+                if not data:
+                    break # socket closed by server
+                for line in framer.feed(data):
+                    self._dispatch(line)
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connected = False
+            self._closeOutbound()
+            if self._writeTask is not None:
+                self._writeTask.cancel()
+            if self._pingTask is not None:
+                self._pingTask.cancel()
+            for queue in self._subscribers:
+                queue.put_nowait(None) # end every notifications() iterator
+            for _, future in self._waiters:
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection closed"))
+            self._waiters.clear()
+            if self._writer is not None:
+                self._writer.close()
+            if self.tracer.level >= trace.INFO:
+                self.tracer.record(trace.INFO, "disconnect")
+            self.tracer.onClose()
+            if self.recorder is not None:
+                self.recorder.close()
+            self.closed.set()
+
+    def _dispatch(self, line: str):
+        if self.tracer.level >= trace.DEBUG:
+            self.tracer.record(trace.DEBUG, "!", line)
+        if self.recorder is not None:
+            self.recorder.record(line)
+        if self.latency is not None:
+            self.latency.onReceive(line)
+        for handle in self._handlers:
+            handle(line)
+        if not self._subscribers and not self._waiters:
+            if self._backlog is not None:
+                self._backlog.append(line) # nobody is listening yet
+            return
+        note = decode(line)
+        if note is not None:
+            for queue in self._subscribers:
+                queue.put_nowait(note)
+            for match, future in self._waiters:
+                if not future.done() and match(note):
+                    future.set_result(note)
+                    return # a reply taken by a request helper is not replayed later
+        if self._backlog is not None:
+            self._backlog.append(line)
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from typing import TextIO
+from client.aio import AsyncClient
+from client.codec import splitLine
+from client.metrics import replyKey
+
+# commands the server understands, anything else fails without being sent
+KNOWN_COMMANDS = frozenset(("GROUPS", "JOIN", "POST", "LEAVE", "VIEW", "HISTORY", "SUBSCRIBE", "PING", "EXIT"))
+
+# one command that is waiting for its reply
+class _Pending:
+    __slots__ = ("number", "command", "sentAt")
+    def __init__(self, number: int, command: str, sentAt: float) -> None:
+        self.number = number
+        self.command = command
+        self.sentAt = sentAt
+
+# sends a stream of commands pipelined over one connection and writes one JSON object per
+# command, plus one per unsolicited notification when events is set
+class BatchRunner:
+    def __init__(self, client: AsyncClient, out: TextIO, window: int = 64, timeout: float = 10.0,
+                 events: bool = False) -> None:
+        self.client = client
+        self.out = out
+        self.window = window # most commands awaiting a reply at once
+        self.timeout = timeout # seconds before an unanswered command counts as failed
+        self.events = events
+        self._slots = asyncio.Semaphore(window)
+        self._pending: dict[tuple[str, ...], deque[_Pending]] = {} # reply key -> commands, oldest first
+        self._names: dict[str, str] = {} # group -> name we joined with, so LEAVE echoes can be matched
+        self.sent = 0
+        self.ok = 0
+        self.failed = 0
+
+    async def run(self, commands) -> dict[str, float]:
+        """Sends every command from an async iterable of lines and waits for outstanding replies"""
+        self.client.addHandler(self._onLine)
+        sweeper = asyncio.create_task(self._sweep())
+        start = time.perf_counter()
+        number = 0
+        try:
+            async for command in commands:
+                number += 1
+                if not command or command.startswith("#"):
+                    continue # blank lines and comments
+                if not self.client.connected:
+                    self._write(number, command, "closed")
+                    continue
+                await self._send(number, command)
+            while self._pending and self.client.connected:
+                await asyncio.sleep(0.01)
+            await self.client.flush()
+        finally:
+            sweeper.cancel()
+            self.client.removeHandler(self._onLine)
+            self._fail("closed") # whatever the connection took with it
+        elapsed = time.perf_counter() - start
+        return {
+            "commands": self.sent,
+            "ok": self.ok,
+            "failed": self.failed,
+            "seconds": round(elapsed, 3),
+            "commandsPerSec": round(self.sent / elapsed, 1) if elapsed else 0.0,
+        }
+
+    async def _send(self, number: int, command: str):
+        parts = command.split("|")
+        if parts[0] not in KNOWN_COMMANDS:
+            self.failed += 1
+            self._write(number, command, "error", error="unknown command")
+            return
+        key = replyKey(command)
+        if parts[0] == "JOIN" and key is not None:
+            self._names[parts[1]] = parts[2]
+        elif parts[0] == "LEAVE" and len(parts) > 1 and parts[1] in self._names:
+            key = ("LEAVE", parts[1], self._names.pop(parts[1])) # the leaver is sent the LEAVE too
+        if key is not None:
+            await self._slots.acquire()
+            self._pending.setdefault(key, deque()).append(_Pending(number, command, time.perf_counter()))
+        try:
+            await self.client.send(command)
+        except RuntimeError as e:
+            if key is not None:
+                self._drop(key)
+            self.failed += 1
+            self._write(number, command, "error", error=str(e))
+            return
+        self.sent += 1
+        if key is None:
+            self.ok += 1
+            self._write(number, command, "sent") # no reply to wait for
+        if parts[0] == "EXIT":
+            await self.client.flush()
+
+    def _onLine(self, line: str):
+        key = replyKey(line) if not line.startswith("LEAVE|") else tuple(line.split("|", 3)[:3])
+        waiting = self._pending.get(key) if key is not None else None
+        if not waiting:
+            if self.events:
+                self.out.write(json.dumps({"event": splitLine(line)}) + "\n")
+            return
+        pending = self._drop(key)
+        self.ok += 1
+        self._write(pending.number, pending.command, "ok", reply=splitLine(line),
+                    ms=round((time.perf_counter() - pending.sentAt) * 1000, 3))
+
+    def _drop(self, key: tuple[str, ...]) -> _Pending:
+        waiting = self._pending[key]
+        pending = waiting.popleft()
+        if not waiting:
+            del self._pending[key]
+        self._slots.release()
+        return pending
+
+    async def _sweep(self):
+        # fails commands whose reply did not arrive in time, e.g. a VIEW of a missing message
+        while True:
+            await asyncio.sleep(min(1.0, self.timeout / 4))
+            deadline = time.perf_counter() - self.timeout
+            for key in [k for k, waiting in self._pending.items() if waiting[0].sentAt < deadline]:
+                while key in self._pending and self._pending[key][0].sentAt < deadline:
+                    pending = self._drop(key)
+                    self.failed += 1
+                    self._write(pending.number, pending.command, "timeout")
+
+    def _fail(self, status: str):
+        for key in list(self._pending):
+            while key in self._pending:
+                pending = self._drop(key)
+                self.failed += 1
+                self._write(pending.number, pending.command, status)
+
+    def _write(self, number: int, command: str, status: str, **extra):
+        record = {"line": number, "command": command, "status": status}
+        record.update(extra)
+        self.out.write(json.dumps(record) + "\n")
+
+async def readCommands(stream: TextIO):
+    """Yields lines from a file or pipe without blocking the event loop"""
+    while True:
+        # one line per read so a command typed into a pipe is sent as soon as it is complete
+        line = await asyncio.to_thread(stream.readline)
+        if not line:
+            return
+        yield line.rstrip("\r\n")
+
+async def runBatch(host: str, port: int, stream: TextIO, out: TextIO, window: int = 64,
+                   timeout: float = 10.0, events: bool = False) -> dict[str, float] | None:
+    """Connects, runs every command from stream and returns the summary, None if the connection failed"""
+    client = AsyncClient()
+    if not await client.connect(host, port):
+        return None
+    runner = BatchRunner(client, out, window, timeout, events)
+    try:
+        summary = await runner.run(readCommands(stream))
+    finally:
+        await client.close()
+    out.flush()
+    return summary
+
+def formatSummary(summary: dict[str, float]) -> str:
+    return (f"{summary['commands']} commands in {summary['seconds']}s ({summary['commandsPerSec']}/sec), "
+            f"{summary['ok']} ok, {summary['failed']} failed")
@@ -0,0 +1,135 @@
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime
+
+# contents of a VIEW reply: sender, post date, subject, content
+MessageBody = tuple[str, datetime, str, str]
+
+def bodySize(body: MessageBody) -> int:
+    """Approximate memory held by a cached body"""
+    return 64 + len(body[0]) + len(body[2]) + len(body[3]) # 64 covers the tuple and date
+
+# persistent tier keeping message bodies in a sqlite file across restarts
+class SqliteStore:
+    def __init__(self, path: str, namespace: str = "", batchSize: int = 64) -> None:
+        self.namespace = namespace # separates bodies from different servers sharing a file
+        self.batchSize = batchSize # writes buffered before a commit
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS messages (
+            namespace TEXT, grp TEXT, id INTEGER, sender TEXT, postDate TEXT, subject TEXT, content TEXT,
+            PRIMARY KEY (namespace, grp, id))""")
+        self._pending: dict[tuple[str, int], MessageBody] = {} # writes not committed yet
+
+    def get(self, group: str, id: int) -> MessageBody | None:
+        body = self._pending.get((group, id))
+        if body is not None:
+            return body
+        row = self._db.execute(
+            "SELECT sender, postDate, subject, content FROM messages WHERE namespace=? AND grp=? AND id=?",
+            (self.namespace, group, id)).fetchone()
+        if row is None:
+            return None
+        return (row[0], datetime.fromisoformat(row[1]), row[2], row[3])
+
+    def bodies(self):
+        """Yields (group, id, body) for every stored body of this namespace, e.g. to build a search index"""
+        self.flush()
+        rows = self._db.execute(
+            "SELECT grp, id, sender, postDate, subject, content FROM messages WHERE namespace=?", (self.namespace,))
+        for row in rows:
+            yield row[0], row[1], (row[2], datetime.fromisoformat(row[3]), row[4], row[5])
+
+    def put(self, group: str, id: int, body: MessageBody) -> None:
+        self._pending[(group, id)] = body
+        if len(self._pending) >= self.batchSize:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commits buffered writes in one transaction"""
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(self.namespace, group, id, b[0], b[1].isoformat(), b[2], b[3])
+                 for (group, id), b in self._pending.items()])
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+# bounded in-memory LRU of message bodies, optionally backed by a persistent store
+class MessageCache:
+    def __init__(self, maxEntries: int = 10_000, maxBytes: int = 0, store: SqliteStore | None = None) -> None:
+        self.maxEntries = maxEntries # 0 for no limit on entries
+        self.maxBytes = maxBytes # 0 for no limit on bytes
+        self.store = store
+        self._entries: OrderedDict[tuple[str, int], MessageBody] = OrderedDict() # least recently used first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.storeHits = 0 # misses in memory answered by the store
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple[str, int]) -> bool:
+        return key in self._entries
+
+    def contains(self, group: str, id: int) -> bool:
+        """Whether a body is available without a VIEW, does not count as a hit or refresh it"""
+        if (group, id) in self._entries:
+            return True
+        return self.store is not None and self.store.get(group, id) is not None
+
+    def get(self, group: str, id: int) -> MessageBody | None:
+        """Looks a body up in memory then in the store, None if it has to be fetched"""
+        key = (group, id)
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+        if self.store is not None:
+            body = self.store.get(group, id)
+            if body is not None:
+                self.storeHits += 1
+                self._insert(key, body)
+                return body
+        self.misses += 1
+        return None
+
+    def put(self, group: str, id: int, body: MessageBody) -> None:
+        """Caches a body received from a VIEW reply"""
+        self._insert((group, id), body)
+        if self.store is not None:
+            self.store.put(group, id, body)
+
+    def _insert(self, key: tuple[str, int], body: MessageBody):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= bodySize(old)
+        self._entries[key] = body
+        self.bytes += bodySize(body)
+        while self._entries and ((self.maxEntries and len(self._entries) > self.maxEntries)
+                                 or (self.maxBytes and self.bytes > self.maxBytes)):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= bodySize(evicted)
+            self.evictions += 1
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "storeHits": self.storeHits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,206 @@
+import argparse
+import importlib
+import sys
+from threading import Lock, Thread
+from client import trace
+from client.codec import PushedMsg, ViewMsg, decode, splitLine
+from client.protocol import createExitQuery, createJoinQuery, createSubscribeQuery
+from client.search import SearchIndex
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Command line client for the message board server")
+    parser.add_argument("--ping", type=float, default=0.0, metavar="SECONDS",
+                        help="send a PING every SECONDS to measure the round trip time")
+    parser.add_argument("--stats", action="store_true", help="print command latency percentiles on exit")
+    parser.add_argument("--trace", choices=list(trace.LEVELS), help="protocol trace level, overrides BOARD_TRACE")
+    parser.add_argument("--push", type=int, default=0, metavar="LENGTH",
+                        help="ask for new posts up to LENGTH characters with their body inline instead of just the id")
+    parser.add_argument("--reconnect", action="store_true", help="reconnect with backoff when the connection drops")
+    parser.add_argument("--record", metavar="PATH", help="append every received line to a recording")
+    parser.add_argument("--replay", metavar="PATH", help="print a recording instead of connecting to a server")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay pace, 1 as recorded, 0 as fast as possible")
+    batch = parser.add_argument_group("batch mode", "run commands from a file or pipe without prompting, one JSON result per line")
+    batch.add_argument("--batch", metavar="FILE", help="file of commands, - for stdin")
+    batch.add_argument("--host", default="localhost")
+    batch.add_argument("--port", type=int)
+    batch.add_argument("--window", type=int, default=64, help="commands awaiting a reply at once")
+    batch.add_argument("--timeout", type=float, default=10.0, help="seconds before an unanswered command fails")
+    batch.add_argument("--output", metavar="FILE", help="write results here instead of stdout")
+    batch.add_argument("--events", action="store_true", help="also write notifications that answer no command")
+    return parser
+
+# set up by main(), the callbacks below use them as globals
+args: argparse.Namespace | None = None
+server = None # Server, or ReplayServer when replaying
+# bodies from VIEW replies and pushed posts, for the local search command
+search = SearchIndex()
+searchLock = Lock() # the listener thread indexes while the input loop searches
+# groups the server confirmed we joined, joined again after a reconnect
+joined: dict[str, str] = {} # group -> name we joined as
+requested: dict[str, str | None] = {} # group -> name of a JOIN awaiting its echo, None for a LEAVE
+membershipLock = Lock() # the listener thread confirms while the input loop requests
+
+# callback function to handle messages received from the server 
+def onMsgReceived(msg: str):
+    if args.ping and msg == "PING":
+        return # replies to our own pings
+    if args.reconnect and (msg.startswith("JOIN|") or msg.startswith("LEAVE|")):
+        onMembership(msg)
+    if msg.startswith("VIEW|") or (args.push and msg.startswith("MESSAGE|")):
+        note = decode(msg)
+        if isinstance(note, ViewMsg): # a VIEW reply or a pushed post
+            with searchLock:
+                search.add(note.group, note.id, note.sender, note.postDate, note.subject, note.content)
+        if isinstance(note, PushedMsg): # no VIEW needed, show the post right away
+            print(f"! MESSAGE|{note.group}|{note.id} from {note.sender} at {note.postDate.isoformat()}")
+            print(f"  {note.subject}: {note.content}")
+            return
+    print("! " + msg)
+
+# prints the bodies seen so far that match every term, e.g. "search deploy from:alice 2024-11"
+def printSearch(query: str):
+    with searchLock:
+        hits = search.search(query)
+    for hit in hits:
+        print(f"  {hit.group}|{hit.id} {hit.postDate.isoformat()} {hit.sender}: {hit.subject}")
+    print(f"{len(hits)} found in {len(search)} messages seen")
+
+# remembers a JOIN or LEAVE typed by the user until the server echoes it back
+def onCommandSent(cmd: str):
+    parts = splitLine(cmd)
+    if parts[0] == "JOIN" and len(parts) > 2:
+        with membershipLock:
+            requested[parts[1]] = parts[2]
+    elif parts[0] == "LEAVE" and len(parts) > 1:
+        with membershipLock:
+            requested[parts[1]] = None
+
+# a JOIN or LEAVE echo confirms our own request, the same lines announce other users too
+def onMembership(msg: str):
+    note = decode(msg)
+    if note is None:
+        return
+    with membershipLock:
+        if note.group not in requested:
+            return
+        wanted = requested[note.group]
+        if note.kind == "JOIN" and wanted == note.name:
+            joined[note.group] = note.name
+            del requested[note.group]
+        elif note.kind == "LEAVE" and wanted is None and joined.get(note.group) == note.name:
+            del joined[note.group]
+            del requested[note.group]
+
+# joins the confirmed groups again on a new connection, requests still awaiting an echo were lost with the old one
+def rejoin() -> int:
+    with membershipLock:
+        requested.clear()
+        groups = list(joined.items())
+    for group, name in groups:
+        server.send(createJoinQuery(group, name))
+    return len(groups)
+
+# asks for pushed post bodies, again after every reconnect since the mode is per connection
+def subscribe():
+    if args.push:
+        server.send(createSubscribeQuery("push", args.push))
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs the command line client, returns the exit code"""
+    global args, server
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    if args.trace is not None:
+        trace.tracer.level = trace.LEVELS[args.trace]
+    if args.replay:
+        # no server, play the recording through the same callback and exit
+        from client.record import ReplayServer
+        replayer = ReplayServer(args.replay, args.speed)
+        replayer.connect("", 0)
+        replayer.listen(onMsgReceived).join()
+        print(f"Replayed {replayer.result[0]} lines in {replayer.result[1]:.3f}s")
+        return 0
+    if args.batch:
+        if args.port is None:
+            parser.error("--batch needs --port")
+        import asyncio
+        from client.batch import formatSummary, runBatch
+        source = sys.stdin if args.batch == "-" else open(args.batch, encoding='utf-8')
+        output = open(args.output, "w", encoding='utf-8') if args.output else sys.stdout
+        summary = asyncio.run(runBatch(args.host, args.port, source, output, args.window, args.timeout, args.events))
+        if summary is None:
+            print(f"Could not connect to {args.host}:{args.port}", file=sys.stderr)
+            return 1
+        print(formatSummary(summary), file=sys.stderr)
+        return 1 if summary["failed"] else 0
+    # the connection side costs most of the startup, load it while the user is typing the address
+    loading = Thread(target=importlib.import_module, args=("client.server",), daemon=True)
+    loading.start()
+    host = input("Host: ")
+    port = int(input("Port: "))
+    loading.join()
+    from client.metrics import formatStats
+    from client.server import Server
+    server = Server(pingInterval=args.ping, recordPath=args.record)
+    # attempt to connect to server 
+    server.connect(host, port)
+    if not server.connected:
+        return 1
+    print("Connected!") # confirm successful connection 
+    # start listening for messages from server 
+    supervisor = None
+    if args.reconnect:
+        from client.reconnect import ReconnectSupervisor
+        def onReconnected():
+            subscribe()
+            print(f"Reconnected, rejoining {rejoin()} groups")
+        supervisor = ReconnectSupervisor(server, onMsgReceived, onDisconnected=lambda: print("Connection lost, reconnecting..."),
+                                         onReconnected=onReconnected)
+        supervisor.start()
+    else:
+        listener = server.listen(onMsgReceived)
+    subscribe()
+    print("Listening for server messages...")
+    # main loop to send commands to server 
+    while (True):
+        cmd = input()
+        if cmd == "close":
+            if supervisor is not None:
+                supervisor.stop()
+            server.disconnect()
+            break
+        if cmd == "stats": # local command, print latency percentiles so far
+            print(formatStats(server.latencyStats()))
+            continue
+        if cmd == "trace": # local command, dump the recent protocol trace
+            server.tracer.dump()
+            continue
+        if cmd.startswith("search "): # local command, search the bodies seen so far
+            printSearch(cmd[len("search "):])
+            continue
+        if supervisor is not None and cmd.strip() == createExitQuery():
+            supervisor.stop() # the server hangs up after EXIT, that is not a connection loss
+            try:
+                server.send(cmd)
+            except RuntimeError:
+                pass
+            server.disconnect()
+            break
+        if supervisor is not None:
+            onCommandSent(cmd) # before sending, the echo may arrive before send returns
+        try:
+            server.send(cmd)
+        except RuntimeError:
+            if supervisor is not None and not supervisor.gaveUp:
+                print("Not connected, command dropped")
+                continue
+            break
+    if supervisor is None:
+        listener.join() # wait for lsitener thread to finish
+    print("Disconnected") # confirm disconnection
+    if args.stats:
+        print(formatStats(server.latencyStats()))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
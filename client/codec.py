@@ -0,0 +1,179 @@
+import re
+from datetime import datetime
+from operator import attrgetter
+
+# fields are separated by '|' and lines by '\n', so both are escaped inside a field:
+#   \ -> \\    | -> \p    newline -> \n
+_unescapes = {"\\": "\\", "p": "|", "n": "\n"}
+_escapeSequence = re.compile(r"\\(.)", re.DOTALL)
+
+def escape(field: str) -> str:
+    """Escapes a field so it can be embedded in a protocol line"""
+    if "\\" in field or "|" in field or "\n" in field:
+        return field.replace("\\", "\\\\").replace("|", "\\p").replace("\n", "\\n")
+    return field
+
+def unescape(field: str) -> str:
+    """Reverses escape"""
+    if "\\" not in field:
+        return field
+    return _escapeSequence.sub(lambda m: _unescapes.get(m.group(1), m.group(1)), field)
+
+def encode(*fields) -> str:
+    """Joins a command or notification, e.g. encode("POST", group, subject, content)"""
+    try:
+        line = "|".join(fields)
+    except TypeError:
+        fields = [str(f) for f in fields] # e.g. message ids
+        line = "|".join(fields)
+    if "\\" in line or "\n" in line or line.count("|") != len(fields) - 1:
+        line = "|".join([escape(f) for f in fields]) # slow path, something needs escaping
+    return line
+
+# typed notifications received from the server
+class Notification:
+    __slots__ = ()
+    kind = ""
+    _getFields = staticmethod(lambda msg: ())
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if len(cls.__slots__) == 1:
+            getter = attrgetter(cls.__slots__[0])
+            cls._getFields = staticmethod(lambda msg: (getter(msg),))
+        elif cls.__slots__:
+            cls._getFields = staticmethod(attrgetter(*cls.__slots__)) # one C call instead of a getattr per field
+    def fields(self) -> list:
+        return list(self._getFields(self))
+    def encode(self) -> str:
+        return encode(self.kind, *self.fields())
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.fields() == other.fields()
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(repr(f) for f in self.fields())})"
+
+class GroupsMsg(Notification):
+    # GROUPS|g1|g2|g3|...
+    __slots__ = ("groups",)
+    kind = "GROUPS"
+    def __init__(self, *groups: str) -> None:
+        self.groups = list(groups)
+    def fields(self) -> list:
+        return list(self.groups)
+
+class JoinMsg(Notification):
+    # JOIN|group|name
+    __slots__ = ("group", "name")
+    kind = "JOIN"
+    def __init__(self, group: str, name: str) -> None:
+        self.group = group
+        self.name = name
+
+class LeaveMsg(Notification):
+    # LEAVE|group|name
+    __slots__ = ("group", "name")
+    kind = "LEAVE"
+    def __init__(self, group: str, name: str) -> None:
+        self.group = group
+        self.name = name
+
+class MessageMsg(Notification):
+    # MESSAGE|group|id
+    __slots__ = ("group", "id")
+    kind = "MESSAGE"
+    def __init__(self, group: str, id: int) -> None:
+        self.group = group
+        self.id = id
+
+class ViewMsg(Notification):
+    # VIEW|group|id|sender|postDate|subject|contents
+    __slots__ = ("group", "id", "sender", "postDate", "subject", "content")
+    kind = "VIEW"
+    def __init__(self, group: str, id: int, sender: str, postDate: datetime, subject: str, content: str) -> None:
+        self.group = group
+        self.id = id
+        self.sender = sender
+        self.postDate = postDate
+        self.subject = subject
+        self.content = content
+    def encode(self) -> str:
+        postDate = self.postDate.isoformat().replace("+00:00", "Z")
+        return encode(self.kind, self.group, self.id, self.sender, postDate, self.subject, self.content)
+
+class PushedMsg(ViewMsg):
+    # MESSAGE|group|id|sender|postDate|subject|contents, a new post with its body inline once push is subscribed
+    __slots__ = ()
+    kind = "MESSAGE"
+
+class SubscribeMsg(Notification):
+    # SUBSCRIBE|mode|maxLength, the mode and push limit the server settled on
+    __slots__ = ("mode", "maxLength")
+    kind = "SUBSCRIBE"
+    def __init__(self, mode: str, maxLength: int) -> None:
+        self.mode = mode
+        self.maxLength = maxLength
+
+class HistoryMsg(Notification):
+    # HISTORY|group|before|id1|id2|... ids oldest first, no ids when nothing older exists
+    __slots__ = ("group", "before", "ids")
+    kind = "HISTORY"
+    def __init__(self, group: str, before: int, ids: list[int]) -> None:
+        self.group = group
+        self.before = before
+        self.ids = ids
+    def fields(self) -> list:
+        return [self.group, self.before, *self.ids]
+
+class PingMsg(Notification):
+    # PING
+    __slots__ = ()
+    kind = "PING"
+
+# field decoders take the already split and unescaped line, parts[0] is the kind
+def _groupsMsg(parts: list[str]) -> GroupsMsg:
+    return GroupsMsg(*parts[1:])
+def _joinMsg(parts: list[str]) -> JoinMsg:
+    return JoinMsg(parts[1], parts[2])
+def _leaveMsg(parts: list[str]) -> LeaveMsg:
+    return LeaveMsg(parts[1], parts[2])
+def _messageMsg(parts: list[str]) -> MessageMsg | PushedMsg:
+    if len(parts) > 3:
+        return PushedMsg(parts[1], int(parts[2]), parts[3], datetime.fromisoformat(parts[4]), parts[5], parts[6])
+    return MessageMsg(parts[1], int(parts[2]))
+def _viewMsg(parts: list[str]) -> ViewMsg:
+    return ViewMsg(parts[1], int(parts[2]), parts[3], datetime.fromisoformat(parts[4]), parts[5], parts[6])
+def _historyMsg(parts: list[str]) -> HistoryMsg:
+    return HistoryMsg(parts[1], int(parts[2]), [int(id) for id in parts[3:] if id])
+def _subscribeMsg(parts: list[str]) -> SubscribeMsg:
+    return SubscribeMsg(parts[1], int(parts[2]))
+def _pingMsg(parts: list[str]) -> PingMsg:
+    return PingMsg()
+
+# kind -> decoder, a single dict lookup replaces a chain of prefix checks
+_decoders = {
+    "GROUPS": _groupsMsg,
+    "JOIN": _joinMsg,
+    "LEAVE": _leaveMsg,
+    "MESSAGE": _messageMsg,
+    "VIEW": _viewMsg,
+    "HISTORY": _historyMsg,
+    "SUBSCRIBE": _subscribeMsg,
+    "PING": _pingMsg,
+}
+
+def splitLine(line: str) -> list[str]:
+    """Splits a line into unescaped fields"""
+    parts = line.split("|")
+    if "\\" in line:
+        parts = [unescape(p) for p in parts]
+    return parts
+
+def decode(line: str) -> Notification | None:
+    """Decodes a line into a typed notification, None if the line is unknown or malformed"""
+    parts = splitLine(line)
+    decoder = _decoders.get(parts[0])
+    if decoder is None:
+        return None
+    try:
+        return decoder(parts)
+    except (IndexError, ValueError):
+        return None
@@ -0,0 +1,94 @@
+import time
+from collections import deque
+from typing import Callable
+from client.protocol import createViewQuery
+
+# decides which VIEW requests go out: explicit selections first, then background prefetch
+class FetchScheduler:
+    def __init__(self, send: Callable[[str], None], window: int = 4, timeout: float = 10.0,
+                 isCached: Callable[[str, int], bool] | None = None) -> None:
+        self._send = send
+        self.window = window # prefetch VIEWs allowed in flight at once
+        self.timeout = timeout # seconds before an unanswered VIEW may be sent again
+        self._isCached = isCached or (lambda group, id: False)
+        self._inFlight: dict[tuple[str, int], float] = {} # (group, id) -> time the VIEW was sent
+        self._urgent: deque[tuple[str, int]] = deque() # explicit selections
+        self._background: deque[tuple[str, int]] = deque() # prefetch candidates
+        self._queued: set[tuple[str, int]] = set() # everything in either deque
+        self.sent = 0
+        self.deduplicated = 0 # requests dropped because the same VIEW was in flight or queued
+        self.expired = 0 # VIEWs that timed out without a reply
+
+    def request(self, group: str, id: int) -> None:
+        """The user wants this message now, send it ahead of any prefetch"""
+        key = (group, id)
+        if key in self._inFlight:
+            self.deduplicated += 1
+            return
+        self._urgent.append(key)
+        self._queued.add(key)
+        self.pump()
+
+    def prefetch(self, group: str, ids) -> None:
+        """Queues messages the user is likely to open soon"""
+        for id in ids:
+            key = (group, id)
+            if key in self._inFlight or key in self._queued:
+                self.deduplicated += 1
+                continue
+            self._background.append(key)
+            self._queued.add(key)
+        self.pump()
+
+    def complete(self, group: str, id: int) -> None:
+        """A VIEW reply arrived"""
+        key = (group, id)
+        self._inFlight.pop(key, None)
+        self._queued.discard(key)
+        self.pump()
+
+    def cancelGroup(self, group: str) -> None:
+        """Forgets everything pending for a group we left"""
+        self._urgent = deque(k for k in self._urgent if k[0] != group)
+        self._background = deque(k for k in self._background if k[0] != group)
+        self._queued = {k for k in self._queued if k[0] != group}
+        self._inFlight = {k: v for k, v in self._inFlight.items() if k[0] != group}
+
+    def forgetInFlight(self) -> None:
+        """Forgets unanswered VIEWs whose replies were lost with the connection, so they can be requested again"""
+        self._inFlight.clear()
+
+    def pending(self) -> int:
+        return len(self._inFlight) + len(self._queued)
+
+    def pump(self) -> None:
+        """Sends whatever the window allows, call periodically to retire timed out VIEWs"""
+        now = time.monotonic()
+        for key, sentAt in list(self._inFlight.items()):
+            if now - sentAt > self.timeout:
+                del self._inFlight[key]
+                self.expired += 1
+        # explicit selections are never held back by the prefetch window
+        while self._urgent:
+            self._dispatch(self._urgent.popleft(), now)
+        while self._background and len(self._inFlight) < self.window:
+            self._dispatch(self._background.popleft(), now)
+
+    def _dispatch(self, key: tuple[str, int], now: float):
+        if key not in self._queued:
+            return # already sent through the other queue
+        self._queued.discard(key)
+        if key in self._inFlight or self._isCached(*key):
+            return
+        self._inFlight[key] = now
+        self.sent += 1
+        self._send(createViewQuery(*key))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "sent": self.sent,
+            "inFlight": len(self._inFlight),
+            "queued": len(self._queued),
+            "deduplicated": self.deduplicated,
+            "expired": self.expired,
+        }
@@ -0,0 +1,76 @@
+from socket import socket
+
+# size of the receive buffer used when none is given
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+# splits a byte stream from the server into newline terminated lines
+class LineFramer:
+    def __init__(self, bufferSize: int = DEFAULT_BUFFER_SIZE, encoding: str = 'utf-8') -> None:
+        if bufferSize <= 0:
+            raise ValueError("bufferSize must be positive")
+        self.encoding = encoding
+        self._buffer = bytearray(bufferSize) # reusable receive buffer
+        self._view = memoryview(self._buffer)
+        self._start = 0 # start of the unconsumed bytes
+        self._end = 0 # end of the received bytes
+        self._scanned = 0 # bytes before this offset are known to hold no newline
+
+    def pending(self) -> int:
+        """Number of received bytes that do not form a complete line yet"""
+        return self._end - self._start
+
+    def feed(self, data: bytes) -> list[str]:
+        """Appends raw bytes and returns the complete lines they finish"""
+        size = len(data)
+        self._reserve(size)
+        self._buffer[self._end:self._end + size] = data
+        self._end += size
+        return self._drain()
+
+    def recvFrom(self, sock: socket) -> list[str] | None:
+        """Receives once from the socket into the buffer, returns None when the peer closed the connection"""
+        self._reserve(1)
+        count = sock.recv_into(self._view[self._end:])
+        if count == 0:
+            return None
+        self._end += count
+        return self._drain()
+
+    def batches(self, sock: socket):
+        """Yields batches of complete lines until the socket is closed"""
+        while True:
+            lines = self.recvFrom(sock)
+            if lines is None:
+                return
+            if lines:
+                yield lines
+
+    def _reserve(self, size: int):
+        # make room for at least size more bytes at the end of the buffer
+        if self._start == self._end:
+            # nothing pending, rewind to the front for free
+            self._start = self._end = self._scanned = 0
+        if len(self._buffer) - self._end >= size:
+            return
+        pending = self._end - self._start
+        if self._start > 0:
+            # move the partial line to the front of the buffer
+            self._buffer[0:pending] = bytes(self._view[self._start:self._end])
+            self._scanned -= self._start
+            self._start = 0
+            self._end = pending
+        if len(self._buffer) - self._end < size:
+            # a single line is larger than the buffer, grow it
+            self._view.release()
+            self._buffer.extend(bytes(max(size, len(self._buffer))))
+            self._view = memoryview(self._buffer)
+
+    def _drain(self) -> list[str]:
+        # decode every complete line between start and end in one pass
+        last = self._buffer.rfind(b'\n', self._scanned, self._end)
+        self._scanned = self._end
+        if last < 0:
+            return []
+        text = str(self._view[self._start:last], self.encoding, 'replace')
+        self._start = last + 1
+        return text.split('\n')
@@ -0,0 +1,734 @@
+import importlib
+import os
+from collections import deque
+from threading import Thread
+from tkinter import *
+from tkinter import ttk
+from typing import Callable
+from datetime import datetime
+from client import trace
+from client.cache import MessageCache, SqliteStore
+from client.codec import Notification, PushedMsg, decode
+from client.fetch import FetchScheduler
+from client.outbound import FAIL, OutboundFull
+from client.protocol import (createExitQuery, createGroupsQuery, createHistoryQuery, createJoinQuery,
+                             createLeaveQuery, createPostQuery, createSubscribeQuery)
+from client.search import SearchHit, SearchIndex
+from client.updates import UpdateQueue
+from client.userlist import UserIndex
+
+UPDATE_INTERVAL_MS = 16 # how often queued server updates are applied to the ui
+UPDATE_BATCH_SIZE = 500 # most server lines applied in a single ui frame
+CACHE_ENTRIES = 5000 # message bodies kept in memory across all groups
+PREFETCH_WINDOW = 4 # background VIEW requests allowed in flight at once
+PREFETCH_NEIGHBOURS = 2 # messages either side of the selection fetched ahead of time
+HISTORY_PAGE = 50 # older message ids requested each time the list is scrolled to the top
+PUSH_MAX_LENGTH = int(os.environ.get("BOARD_PUSH", 16 * 1024)) # new posts up to this long arrive with their body, 0 for ids only
+CACHE_PATH = os.environ.get("BOARD_CACHE_PATH") # sqlite file keeping bodies across restarts, disabled if unset
+RECORD_PATH = os.environ.get("BOARD_RECORD") # recording every received line is appended to, see client/record.py
+REPLAY_PATH = os.environ.get("BOARD_REPLAY") # play this recording back instead of connecting to a server
+REPLAY_SPEED = float(os.environ.get("BOARD_REPLAY_SPEED", 1)) # 1 keeps the recorded pacing, 0 is as fast as possible
+SEARCH_RESULTS = 50 # most search results listed
+SEND_RETRY_MS = 50 # how soon commands refused by a full outbound queue are tried again
+
+# connectionframe manages connection input and setup GUI
+class ConnectionFrame(Frame):
+    def __init__(self, parent, onConnected: Callable[[], None]) -> None:
+        Frame.__init__(self, parent)
+        # input fields 
+        self._onConnected = onConnected
+        self._userNameVar = StringVar()
+        self._userNameLabel = Label(self, text="User Name")
+        self._userNameEntry = Entry(self, textvariable=self._userNameVar)
+        self._hostVar = StringVar()
+        self._hostLabel = Label(self, text="Host")
+        self._hostEntry = Entry(self, textvariable=self._hostVar)
+        self._portVar = StringVar()
+        self._portLabel = Label(self, text="Port")
+        self._portEntry = Entry(self, textvariable=self._portVar)
+        self._connectButton = Button(self, text="Connect", command=self._handleConnect)
+        self._placeFrames()
+    # arrange components in grid 
+    def _placeFrames(self):
+        self._userNameLabel.grid(row=0, column=0)
+        self._userNameEntry.grid(row=0, column=1)
+        self._hostLabel.grid(row=1, column=0)
+        self._hostEntry.grid(row=1, column=1)
+        self._portLabel.grid(row=2, column=0)
+        self._portEntry.grid(row=2, column=1)
+        self._connectButton.grid(row=3, column=0, columnspan=2)
+    def _handleConnect(self):
+        host = self._hostVar.get()
+        portStr = self._portVar.get()
+        if self._hostVar.get() == "" or self._portVar.get() == "":
+            return # do nothing if host or port is empty 
+        startClient()
+        server.connect(host, int(portStr))
+        if (server.connected):
+            if CACHE_PATH:
+                cache.store = SqliteStore(CACHE_PATH, f"{host}:{portStr}") # warm bodies from earlier runs against this server
+                search.addMany(cache.store.bodies()) # and make them searchable
+            self._onConnected() # callback if connected 
+    def getUserName(self) -> str: return self._userNameVar.get()
+
+# represents the main frame of the application
+class MainFrame(Frame):
+    def __init__(self, parent: Tk, userName: str) -> None:
+        Frame.__init__(self, parent)
+        self.userName = userName
+        self._joinFrame = JoinFrame(self, [], userName) # Create join frame
+        self._sep = ttk.Separator(self, orient='horizontal') # Create separator
+        self._groups = GroupsFrame(self, self._handleLeaveClicked) # Create groups frame
+        self._msgFrame = MessagingFrame(self, self._handlePostClicked) # Create msg frame
+        self._search = SearchFrame(self, self._handleSearch, self._handleResultClicked) # Create search frame
+        self._placeFrames() # arrange the components of the main frame
+        self.subscribe() # ask for bodies with new posts before joining anything
+        send(createGroupsQuery()) # Send a query for groups to begin
+        parent.title(userName) # set the username
+    def _placeFrames(self):
+        self._joinFrame.grid(row=0, column=0) # Place join frame
+        self._sep.grid(row=1, column=0) # Place separator
+        self._groups.grid(row=2, column=0) # Place groups frame
+        self._msgFrame.grid(row=3, column=0) # Place msg frame
+        self._search.grid(row=4, column=0) # Place search frame
+    def _handlePostClicked(self, subject: str, content: str): # handles a post button click event from the messaging frame
+        send(createPostQuery(self._groups.current()[0], subject, content)) # sends a post query to the server
+    def _handleLeaveClicked(self, group: str): # handles a leave button click event from the details frame
+        send(createLeaveQuery(group)) # send a leave query to the server
+    def _handleSearch(self, query: str) -> list[SearchHit]: # searches the bodies seen so far in the groups we are in
+        return search.search(query, self._groups.groups.keys(), SEARCH_RESULTS)
+    def _handleResultClicked(self, group: str, id: int): # shows a search result in its group
+        frame = self._groups.select(group)
+        if frame is not None:
+            frame.show(id)
+    def handleGroups(self, groups: list[str]): # handles a response from a groups query
+        for g in groups:
+            self._joinFrame.add(g) # Add the group to the joinable groups
+        if "Public" in groups:
+            send(createJoinQuery("Public", self.userName)) # automatically send a query to join the Public group
+    def handleJoin(self, group: str, name: str):
+        """Handles a join event"""
+        if name == self.userName: # we have successfully joined the group
+            self._joinFrame.remove(group) # remove joined group from joinable group selector
+            f = self._groups.add(group) # create new group frame
+            if f is None: # rejoined after a reconnect
+                f = self._groups.groups[group]
+                f.refetch_missing()
+            f.add_user(name) # add current user to the frame
+        else: # someone else joined a group we are in
+            frame = self._groups.groups.get(group) # get the frame of the associated group
+            if frame is not None:
+                frame.add_user(name) # add the user to users of the group's frame
+    def handleLeave(self, group: str, name: str):
+        """Handles a leave event"""
+        if name == self.userName: # we have successfully left a group
+            self._joinFrame.add(group) # add the group back to the list of joinable groups
+            fetcher.cancelGroup(group) # stop fetching bodies for the group
+            self._groups.remove(group) # remove the current group from the active groups
+        else: # someone else has left a group we are in
+            frame = self._groups.groups.get(group) # get the associated frame
+            if frame is not None:
+                frame.remove_user(name) # remove the user from the group's frame
+    def handleMessage(self, group: str, msgId: int, body: PushedMsg | None = None):
+        """Handles a message notification, with the body inline when the server pushed it"""
+        frame = self._groups.groups.get(group) # get the associated group's frame
+        if frame is None:
+            return
+        if body is not None:
+            frame.add_msg_contents(msgId, body.sender, body.postDate, body.subject, body.content) # cached, so never fetched
+        frame.add_msg(msgId) # add the msg to the group
+    def handleMessages(self, group: str, msgIds: list[int], bodies: list[PushedMsg] = ()):
+        """Handles several message notifications for one group at once"""
+        frame = self._groups.groups.get(group) # get the associated group's frame
+        if frame is None:
+            return
+        for body in bodies:
+            frame.add_msg_contents(body.id, body.sender, body.postDate, body.subject, body.content)
+        frame.add_msgs(msgIds) # add all msgs to the group in one go
+    def handleHistory(self, group: str, before: int, msgIds: list[int]):
+        """Handles a page of older message ids"""
+        frame = self._groups.groups.get(group) # get the associated group's frame
+        if frame is None:
+            return
+        frame.add_history(before, msgIds)
+    def handleView(self, group: str, id: int, sender: str, post_date: datetime, subject: str, content: str):
+        """Handles a view response for a msg"""
+        fetcher.complete(group, id) # frees a slot for the next fetch
+        frame = self._groups.groups.get(group) # get the associated group's frame
+        if frame is None:
+            return
+        frame.add_msg_contents(id, sender, post_date, subject, content) # populate the details 
+    def resync(self):
+        """Restores server side state after a reconnect, only what we do not already have is fetched again"""
+        self.winfo_toplevel().title(self.userName)
+        self.subscribe() # push mode is per connection
+        for group, frame in self._groups.groups.items():
+            frame.clear_users() # the server announces everyone again when we rejoin
+            send(createJoinQuery(group, self.userName))
+        fetcher.forgetInFlight() # replies to VIEWs sent on the old connection never arrive
+        deferred.clear() # they were meant for the old connection
+    def subscribe(self):
+        """Asks the server to send new posts with their bodies, servers that do not know SUBSCRIBE keep sending ids"""
+        if PUSH_MAX_LENGTH > 0:
+            send(createSubscribeQuery("push", PUSH_MAX_LENGTH))
+    def exit(self):
+        """Sends an exit request to the server to close the connection"""
+        send(createExitQuery())
+
+# represents the selector and button of groups that can be joined
+class JoinFrame(Frame):
+    def __init__(self, parent, groups: list[str], userName: str) -> None:
+        Frame.__init__(self, parent)
+        self._groups = groups
+        self._userName = userName
+        self._currentGroup = StringVar()
+        self._groupBox = ttk.Combobox(self, textvariable=self._currentGroup, values=self._groups)
+        self._joinButton = Button(self, text="Join", command=self._handleJoinClicked)
+        self._placeFrames() # arrange frames
+    def _placeFrames(self):
+        # define arrangement of controls
+        self._groupBox.grid(row=0, column=0)
+        self._joinButton.grid(row=0, column=1)
+    def _handleJoinClicked(self) -> None: # handles the join button being clicked
+        group = self._currentGroup.get()
+        if group != "":
+            q = createJoinQuery(group, self._userName) # create a join query
+            send(q) # send the join query
+    def add(self, group: str):
+        """adds a group to the list"""
+        if group in self._groups:
+            return
+        self._groups.append(group)
+        self._groupBox['values'] = self._groups
+    def remove(self, group: str):
+        """removes a group from the list"""
+        if group not in self._groups:
+            return
+        self._groups.remove(group)
+        self._groupBox['values'] = self._groups
+        if group == self._currentGroup.get():
+            self._currentGroup.set("")
+
+# represents a collection of active groups the user is in
+class GroupsFrame(Frame):
+    def __init__(self, parent, onLeave: Callable[[str], None]):
+        Frame.__init__(self, parent)
+        self._onLeave = onLeave
+        self._nb = ttk.Notebook(self) # tabs control
+        self._nb.grid(row=0, column=0)
+        self.groups: dict[str, GroupFrame] = {} # internal mapping from groupname to the associated child frames
+    def current(self):
+        """Gets the currently selected group name and group frame"""
+        name = self._nb.tab(self._nb.select(), 'text')
+        return name, self.groups[name]
+    def add(self, groupName: str):
+        """Adds a new active group by name"""
+        if groupName in self.groups:
+            return
+        frame = GroupFrame(self._nb, groupName, lambda: self._onLeave(groupName))
+        self._nb.add(frame, text=groupName)
+        self.groups[groupName] = frame
+        return frame
+    def select(self, groupName: str):
+        """Brings an active group's tab to the front and returns its frame"""
+        frame = self.groups.get(groupName)
+        if frame is not None:
+            self._nb.select(frame)
+        return frame
+    def remove(self, groupName: str):
+        """Removes an active group by name"""
+        if groupName not in self.groups:
+            return
+        frame = self.groups[groupName]
+        self._nb.forget(frame)
+        del self.groups[groupName]
+
+# represents a single active group pane
+class GroupFrame(Frame):
+    def __init__(self, parent, name: str, onLeave: Callable[[], None]):
+        Frame.__init__(self, parent)
+        self.name = name
+        self._messages: set[int] = set() # ids of the messages announced in this group, bodies live in the shared cache
+        self._oldest: int | None = None # lowest id listed, server ids only grow
+        self._newest: int | None = None # highest id listed
+        self._historyPending = False # a HISTORY query is waiting for its reply
+        self._historyDone = False # the server has nothing older than _oldest
+        self._users = UsersFrame(self)
+        self._messagesFrame = MessagesFrame(self, self._handleMsgSelectionChanged, self._requestOlder)
+        self._details = DetailFrame(self, onLeave)
+        self._placeFrames() # arrange the controls
+    def _placeFrames(self):
+        # define how controls are arranged
+        self._users.grid(row=0, column=0)
+        self._messagesFrame.grid(row=0, column=1)
+        self._details.grid(row=0, column=2)
+    def _handleMsgSelectionChanged(self, msgId: int | None): # handle a change of what message the user is currently selecting
+        if msgId is None:
+            self._details.clear() # clear details if no msg is selected
+            return
+        msgTuple = cache.get(self.name, msgId) # try to find stored message
+        if msgTuple is None: # if msgid is found but no details
+            self._details.clear() # clear details
+            fetcher.request(self.name, msgId) # request details ahead of any prefetch, once
+        else:
+            # otherwise, populate details
+            self._details.setSender(msgTuple[0])
+            self._details.setFromDate(msgTuple[1])
+            self._details.setSubject(msgTuple[2])
+            self._details.setContent(msgTuple[3])
+        fetcher.prefetch(self.name, self._messagesFrame.around(PREFETCH_NEIGHBOURS)) # warm up the neighbours
+    def show(self, id: int):
+        """Selects a message and shows its details, even one older than the ids listed so far"""
+        self._messagesFrame.select(id)
+        self._handleMsgSelectionChanged(id)
+    def add_user(self, user: str):
+        """Adds a visible user to the group"""
+        self._users.add(user)
+    def remove_user(self, user: str):
+        """Removes a visible user from the group"""
+        self._users.remove(user)
+    def refetch_missing(self):
+        """Fetches bodies of known messages that are not cached, e.g. ones lost in flight during a reconnect,
+        and the newest page of ids to pick up messages posted while we were away"""
+        selected = self._messagesFrame.current()
+        if selected is not None and not cache.contains(self.name, selected):
+            fetcher.request(self.name, selected)
+        fetcher.prefetch(self.name, [id for id in self._messages if not cache.contains(self.name, id)])
+        self._historyPending = True
+        send(createHistoryQuery(self.name, 0, HISTORY_PAGE))
+    def _requestOlder(self):
+        # the top of the list is visible, page in older ids unless a page is on its way or there are none
+        if self._historyPending or self._historyDone:
+            return
+        self._historyPending = True
+        send(createHistoryQuery(self.name, self._oldest or 0, HISTORY_PAGE))
+    def add_history(self, before: int, ids: list[int]):
+        """Adds a page of ids from a HISTORY reply, older ones above the list and newer ones below"""
+        self._historyPending = False
+        if len(ids) < HISTORY_PAGE:
+            self._historyDone = True # reached the first message of the board
+        older = [id for id in ids if id not in self._messages and (self._oldest is None or id < self._oldest)]
+        newer = [id for id in ids if id not in self._messages and self._newest is not None and id > self._newest]
+        if older:
+            self._messages.update(older)
+            self._oldest = older[0]
+            if self._newest is None:
+                self._newest = older[-1]
+            self._messagesFrame.prependMany(older) # bodies are fetched when selected, not ahead of time
+        if newer:
+            self.add_msgs(newer)
+    def clear_users(self):
+        """Removes every visible user from the group"""
+        self._users.clear()
+    def _track(self, first: int, last: int):
+        # keep the bounds used to page history
+        if self._oldest is None or first < self._oldest:
+            self._oldest = first
+        if self._newest is None or last > self._newest:
+            self._newest = last
+    def add_msg(self, id: int):
+        """Adds a message of a specific id to the messages pane"""
+        if id in self._messages:
+            return # re-announced after a reconnect, already listed
+        self._messages.add(id)
+        self._track(id, id)
+        self._messagesFrame.add(id)
+        fetcher.prefetch(self.name, [id]) # fetch the body before it is clicked
+    def add_msgs(self, ids: list[int]):
+        """Adds several message ids to the messages pane with a single insert"""
+        ids = [id for id in ids if id not in self._messages] # skip ids re-announced after a reconnect
+        if not ids:
+            return
+        self._messages.update(ids)
+        self._track(min(ids), max(ids))
+        self._messagesFrame.addMany(ids)
+        fetcher.prefetch(self.name, ids) # fetch the bodies before they are clicked
+    def add_msg_contents(self, id: int, sender: str, post_date: datetime, subject: str, content: str):
+        """Adds view response contents to the associated message"""
+        cache.put(self.name, id, (sender, post_date, subject, content)) # add details to the shared cache
+        search.add(self.name, id, sender, post_date, subject, content) # and to the search index
+        curr = self._messagesFrame.current()
+        if id == curr: # check if the message is currently selected
+            # populate fields if the message is currently selected
+            self._details.setSender(sender)
+            self._details.setFromDate(post_date)
+            self._details.setSubject(subject)
+            self._details.setContent(content)
+    
+# represents the list of active users in a group
+class UsersFrame(LabelFrame):
+    ROWS = 10 # number of rows materialized in the listbox
+    def __init__(self, parent):
+        LabelFrame.__init__(self, parent, text="Users")
+        self._users = UserIndex() # every user in the group, only the visible rows live in the listbox
+        self._top = 0 # index of the first visible user
+        self._renderPending = False
+        self._usersBox = Listbox(self, height=self.ROWS)
+        self._scroll = Scrollbar(self)
+        # configure scrolling, the scrollbar drives our own window over the index
+        self._scroll.config(command=self._handleScroll)
+        self._usersBox.bind("<MouseWheel>", lambda e: self._scrollBy(-1 if e.delta > 0 else 1))
+        self._usersBox.bind("<Button-4>", lambda e: self._scrollBy(-1))
+        self._usersBox.bind("<Button-5>", lambda e: self._scrollBy(1))
+        self._placeFrames()
+    def _placeFrames(self):
+        self._usersBox.pack(side='left', fill='both', expand=True)
+        self._scroll.pack(side='right', fill='y')
+    def add(self, userName: str):
+        """Add a user to the active users in the group"""
+        if self._users.add(userName):
+            self._scheduleRender()
+    def remove(self, userName: str):
+        """Removes a user from the list of active users in the group"""
+        if self._users.remove(userName):
+            self._scheduleRender()
+    def clear(self):
+        """Removes every user"""
+        self._users = UserIndex()
+        self._scheduleRender()
+    def _handleScroll(self, action: str, amount: str, unit: str | None = None):
+        # handles scrollbar commands: ('moveto', fraction) or ('scroll', n, 'units'|'pages')
+        if action == 'moveto':
+            self._scrollTo(round(float(amount) * len(self._users)))
+        elif action == 'scroll':
+            self._scrollBy(int(amount) * (self.ROWS if unit == 'pages' else 1))
+    def _scrollBy(self, rows: int):
+        self._scrollTo(self._top + rows)
+    def _scrollTo(self, top: int):
+        self._top = top
+        self._scheduleRender()
+    def _scheduleRender(self):
+        # render at most once per idle period no matter how many users changed
+        if not self._renderPending:
+            self._renderPending = True
+            self.after_idle(self._render)
+    def _render(self):
+        self._renderPending = False
+        total = len(self._users)
+        self._top = max(0, min(self._top, total - self.ROWS))
+        self._usersBox.delete(0, END)
+        rows = self._users.rows(self._top, self._top + self.ROWS)
+        if rows:
+            self._usersBox.insert(END, *rows)
+        if total == 0:
+            self._scroll.set(0, 1)
+        else:
+            self._scroll.set(self._top / total, min(1, (self._top + self.ROWS) / total))
+
+# represents the list of messages received for a specific group
+class MessagesFrame(LabelFrame):
+    def __init__(self, parent, onMessageSelectionChanged: Callable[[int | None], None], onNeedOlder: Callable[[], None]):
+        LabelFrame.__init__(self, parent, text="Messages")
+        self._onMessageSelectionChanged = onMessageSelectionChanged
+        self._onNeedOlder = onNeedOlder # called whenever the first row is visible
+        # create components
+        self._messagesBox = Listbox(self, selectmode='single')
+        self._scroll = Scrollbar(self)
+        self._messagesBox.bind("<<ListboxSelect>>", self._onListboxSelect) # bind selection event
+        # configure scrolling
+        self._messagesBox.config(yscrollcommand=self._onYScroll)
+        self._scroll.config(command=self._messagesBox.yview)
+        self._placeFrames() # place frames
+    def _placeFrames(self):
+        self._messagesBox.pack(side='left', fill='both', expand=True)
+        self._scroll.pack(side='right', fill='y')
+    def current(self):
+        """Get the currently selected message id, if selected"""
+        indices = self._messagesBox.curselection()
+        if len(indices) <= 0:
+            return None
+        index = indices[0]
+        item: str = self._messagesBox.get(index)
+        return int(item)
+    def around(self, radius: int) -> list[int]:
+        """Get the message ids within radius rows of the selection"""
+        indices = self._messagesBox.curselection()
+        if len(indices) <= 0:
+            return []
+        index = indices[0]
+        items = self._messagesBox.get(max(0, index - radius), index + radius)
+        return [int(item) for item in items]
+    def _onYScroll(self, first: str, last: str):
+        self._scroll.set(first, last)
+        if float(first) <= 0.0:
+            self._onNeedOlder() # scrolled to the top, or everything fits
+    def select(self, messageId: int) -> bool:
+        """Selects a listed message id and scrolls to it, False if it is not listed"""
+        try:
+            index = self._messagesBox.get(0, END).index(str(messageId))
+        except ValueError:
+            return False
+        self._messagesBox.selection_clear(0, END)
+        self._messagesBox.selection_set(index)
+        self._messagesBox.see(index)
+        return True
+    def _onListboxSelect(self, _):
+        """Handle a selection event from the listbox"""
+        self._onMessageSelectionChanged(self.current())
+    def add(self, messageId: str):
+        """Add a new message id to the list"""
+        self._messagesBox.insert(END, str(messageId))
+    def addMany(self, messageIds: list[int]):
+        """Add several message ids to the list"""
+        self._messagesBox.insert(END, *map(str, messageIds))
+    def prependMany(self, messageIds: list[int]):
+        """Add several older message ids above the list, keeping the visible rows in place"""
+        top = self._messagesBox.nearest(0)
+        self._messagesBox.insert(0, *map(str, messageIds))
+        self._messagesBox.yview(top + len(messageIds))
+
+# represents the details of a selected message
+class DetailFrame(Frame):
+    def __init__(self, parent, onLeave: Callable[[], None]):
+        Frame.__init__(self, parent)
+        self._senderVar = StringVar()
+        self._senderLabel = Label(self, text="From: ")
+        self._senderEntry = Entry(self, textvariable=self._senderVar, state=['readonly'])
+
+        self._dateVar = StringVar()
+        self._dateLabel = Label(self, text="Date: ")
+        self._dateEntry = Entry(self, textvariable=self._dateVar, state=['readonly'], width=20)
+
+        self._subjectVar = StringVar()
+        self._subjectLabel = Label(self, text="Subject: ")
+        self._subjectEntry = Entry(self, textvariable=self._subjectVar, state=['readonly'])
+
+        self._content = Text(self, width=20, height=5)
+        self._leaveButton = Button(self, text="Leave", command=onLeave)
+
+        self._placeFrames() # arrange frames
+    def _placeFrames(self):
+        # define how frames are arranged
+        self._senderLabel.grid(row=0, column=0)
+        self._senderEntry.grid(row=0, column=1)
+
+        self._dateLabel.grid(row=1, column=0)
+        self._dateEntry.grid(row=1, column=1)
+
+        self._subjectLabel.grid(row=2, column=0)
+        self._subjectEntry.grid(row=2, column=1)
+
+        self._content.grid(row=3, column=0, columnspan=2)
+        self._leaveButton.grid(row=4, column=0, columnspan=2)
+    def setSender(self, val: str = ""):
+        self._senderVar.set(val)
+    def setFromDate(self, val: datetime | None = None):
+        self._dateVar.set(val.astimezone().strftime("%I:%M:%S %p, %b %d, %Y") if val is not None else "") # localize and format post date nicely
+    def setSubject(self, val: str = ""):
+        self._subjectVar.set(val)
+    def setContent(self, val: str = ""):
+        self._content.delete("1.0", END) # Clear
+        self._content.insert(END, val) # Set new
+    def clear(self):
+        """clear all the entries"""
+        self.setSender()
+        self.setFromDate()
+        self.setSubject()
+        self.setContent()
+
+# represents the search box and the messages matching it across joined groups
+class SearchFrame(LabelFrame):
+    def __init__(self, parent, onSearch: Callable[[str], list[SearchHit]], onResultClicked: Callable[[str, int], None]):
+        LabelFrame.__init__(self, parent, text="Search")
+        self._onSearch = onSearch
+        self._onResultClicked = onResultClicked
+        self._hits: list[SearchHit] = [] # results in the order listed
+        self._searchPending = False
+        self._queryVar = StringVar()
+        self._queryEntry = Entry(self, textvariable=self._queryVar, width=40)
+        self._resultsBox = Listbox(self, height=5, width=60, exportselection=False) # keep the message list's selection
+        self._queryEntry.bind("<KeyRelease>", lambda e: self._scheduleSearch()) # search as you type
+        self._resultsBox.bind("<<ListboxSelect>>", self._onListboxSelect)
+        self._placeFrames()
+    def _placeFrames(self):
+        self._queryEntry.grid(row=0, column=0, sticky='we')
+        self._resultsBox.grid(row=1, column=0)
+    def _scheduleSearch(self):
+        # search at most once per idle period however fast keys are typed
+        if not self._searchPending:
+            self._searchPending = True
+            self.after_idle(self._search)
+    def _search(self):
+        self._searchPending = False
+        self._hits = self._onSearch(self._queryVar.get())
+        self._resultsBox.delete(0, END)
+        rows = [f"{h.group}  {h.postDate.astimezone():%b %d %H:%M}  {h.sender}: {h.subject}" for h in self._hits]
+        if rows:
+            self._resultsBox.insert(END, *rows)
+    def _onListboxSelect(self, _):
+        indices = self._resultsBox.curselection()
+        if indices:
+            hit = self._hits[indices[0]]
+            self._onResultClicked(hit.group, hit.id)
+
+# represents the control used to create a new post for the currently selected active group
+class MessagingFrame(Frame):
+    def __init__(self, parent, onPostClicked: Callable[[str, str], None]):
+        Frame.__init__(self, parent)
+        self._onPostClicked = onPostClicked
+        self._subjectVar = StringVar()
+        self._subjectLabel = Label(self, text="Subject")
+        self._subjectEntry = Entry(self, textvariable=self._subjectVar)
+        self._contentVar = StringVar()
+        self._contentLabel = Label(self, text="Content")
+        self._contentEntry = Entry(self, textvariable=self._contentVar)
+        self._postButton = Button(self, text="Post", command=self._handlePostClicked)
+        self._placeFrames()
+    def _placeFrames(self):
+        self._subjectLabel.grid(row=0, column=0)
+        self._subjectEntry.grid(row=0, column=1)
+        self._contentLabel.grid(row=0, column=2)
+        self._contentEntry.grid(row=0, column=3)
+        self._postButton.grid(row=0, column=4)
+    def _handlePostClicked(self):
+        subject = self._subjectVar.get()
+        content = self._contentVar.get()
+        if subject == "" or content == "": # validation check
+            return
+        self._onPostClicked(subject, content) # callback when the post button is clicked
+        self._clearEntries() # clear entries once posted
+    def _clearEntries(self):
+        self._subjectEntry.delete(0, END)
+        self._contentEntry.delete(0, END)
+
+# applies a single decoded server notification to the main frame
+def handleUpdate(main: MainFrame, msg: Notification):
+    handler = _updateHandlers.get(msg.kind)
+    if handler is not None:
+        handler(main, msg)
+
+# notification kind -> how it is applied to the main frame
+_updateHandlers: dict[str, Callable[[MainFrame, Notification], None]] = {
+    "GROUPS": lambda main, msg: main.handleGroups(msg.groups),
+    "JOIN": lambda main, msg: main.handleJoin(msg.group, msg.name),
+    "LEAVE": lambda main, msg: main.handleLeave(msg.group, msg.name),
+    "MESSAGE": lambda main, msg: main.handleMessage(msg.group, msg.id, msg if isinstance(msg, PushedMsg) else None),
+    "MESSAGES": lambda main, msg: main.handleMessages(msg.group, msg.ids, msg.bodies), # several coalesced MESSAGE notifications
+    "HISTORY": lambda main, msg: main.handleHistory(msg.group, msg.before, msg.ids),
+    "VIEW": lambda main, msg: main.handleView(msg.group, msg.id, msg.sender, msg.postDate, msg.subject, msg.content),
+}
+
+# a handler for receiving raw text notifications from the server
+def onResponseReceived(main: MainFrame, response: str):
+    msg = decode(response) # parse
+    if msg is not None:
+        handleUpdate(main, msg) # handle in main
+
+# applies queued server updates on the tk thread, a bounded batch per frame
+def pumpUpdates(main: MainFrame, generation: int = 0):
+    if supervisor is not None and supervisor.generation != generation:
+        generation = supervisor.generation
+        main.resync() # reconnected since the last frame
+    elif not server.connected and supervisor is not None and not supervisor.gaveUp:
+        main.winfo_toplevel().title(f"{main.userName} (reconnecting...)")
+    for msg in updates.drain(UPDATE_BATCH_SIZE):
+        handleUpdate(main, msg)
+    if server.connected:
+        fetcher.pump() # retire timed out fetches so prefetch keeps moving
+    root.after(UPDATE_INTERVAL_MS, pumpUpdates, main, generation)
+
+# Define a method to handle the ui connecting
+def onConnected():
+    userName = conn.getUserName() # fetch the user name from the connection frame
+    global mainFrame
+    mainFrame = MainFrame(root, userName) # Create the main frame
+    updates.userName = userName
+    # queue server messages, the listener thread never touches widgets
+    global supervisor
+    if REPLAY_PATH:
+        server.listen(updates.push)
+    else:
+        from client.reconnect import ReconnectSupervisor
+        supervisor = ReconnectSupervisor(server, updates.push) # rejoin and resync if the connection drops
+        supervisor.start()
+    pumpUpdates(mainFrame) # start applying queued messages on the tk thread
+    conn.destroy() # Remove the connection frame
+    mainFrame.grid(row=0, column=0) # Place the main frame
+
+# Define a close function when exiting
+def onClosing():
+    if trace.tracer.level >= trace.INFO: # before disconnecting so a trace dump on close includes them
+        trace.tracer.record(trace.INFO, "ui updates", str(updates.stats()))
+        trace.tracer.record(trace.INFO, "message cache", str(cache.stats()))
+    if supervisor is not None:
+        supervisor.stop() # the disconnect below is intentional
+    if server is not None and server.connected:
+        if mainFrame is not None:
+            mainFrame.exit() # call on main to notify server of leaving
+        server.disconnect() # close the socket
+    cache.close() # flush bodies to the persistent store
+    root.destroy() # close the ui window
+
+# sends a command without ever blocking the tk thread, when the outbound queue is full it is
+# kept with the commands after it and retried from the tk loop, in order
+def send(line: str):
+    if deferred:
+        deferred.append(line)
+        return
+    try:
+        server.send(line)
+    except OutboundFull:
+        deferred.append(line)
+        root.after(SEND_RETRY_MS, sendDeferred)
+
+def sendDeferred():
+    while deferred:
+        try:
+            server.send(deferred[0])
+        except OutboundFull:
+            root.after(SEND_RETRY_MS, sendDeferred)
+            return
+        except RuntimeError:
+            deferred.clear() # disconnected, a reconnect resyncs instead
+            return
+        deferred.popleft()
+
+# creates the connection side once connect is clicked, its modules load in the background from main()
+def startClient():
+    global server, fetcher
+    if server is not None:
+        return
+    loading.join()
+    # lines sent and received are traced per BOARD_TRACE, see client/trace.py
+    if REPLAY_PATH:
+        from client.record import ReplayServer
+        server = ReplayServer(REPLAY_PATH, REPLAY_SPEED)
+    else:
+        from client.server import Server
+        server = Server(policy=FAIL, recordPath=RECORD_PATH) # a full queue raises instead of blocking the ui
+    fetcher = FetchScheduler(send, PREFETCH_WINDOW, isCached=cache.contains) # deduplicates and prioritizes VIEW requests
+
+# set up by main(), the frames above use them as globals
+root = None
+conn = None # connection frame, until connected
+mainFrame = None # main frame, once connected
+server = None # Server, or ReplayServer when replaying
+supervisor = None # reconnects the server after drops once we are connected
+updates = None # server messages waiting to be applied to the ui
+cache = None # message bodies shared by every group frame
+search = None # every body seen, searchable from the search box
+fetcher = None # deduplicates and prioritizes VIEW requests
+deferred: deque[str] = deque() # commands waiting for room in the outbound queue, see send
+loading = None # imports the connection side while the user fills in the connection form
+
+def main():
+    """Runs the GUI client until its window is closed"""
+    global root, conn, updates, cache, search, loading
+    # importing asyncio dominates startup, so the window does not wait for it
+    loading = Thread(target=importlib.import_module, args=("client.record" if REPLAY_PATH else "client.reconnect",), daemon=True)
+    loading.start()
+    updates = UpdateQueue()
+    cache = MessageCache(CACHE_ENTRIES)
+    search = SearchIndex()
+
+    root = Tk() # Initialize the GUI
+    root.title("Client") # set the title
+    conn = ConnectionFrame(root, onConnected) # create connection frame, with onConnected success handler
+    conn.grid(row=0, column=0) # place the connection frame in root
+
+    root.protocol("WM_DELETE_WINDOW", onClosing) # Register the function handler
+    root.bind_all("<Control-t>", lambda e: trace.tracer.dump()) # print the recent protocol trace on demand
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
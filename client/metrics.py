@@ -0,0 +1,170 @@
+import asyncio
+import time
+from collections import deque
+from threading import Lock
+from client.outbound import OutboundFull
+
+# log-linear buckets: values below 32us are exact, above that each power of two is split into
+# 16 buckets, so any reported value is within ~6% of the truth
+_SUB_BUCKETS = 16
+# values up to 2^34us (~4.8 hours) get their own bucket, longer ones share the last bucket,
+# which reports the largest sample seen
+_BUCKETS = 31 * _SUB_BUCKETS
+
+def _bucketOf(micros: int) -> int:
+    shift = max(0, micros.bit_length() - 5)
+    return min(shift * _SUB_BUCKETS + (micros >> shift), _BUCKETS - 1)
+
+def _bucketHigh(index: int) -> int:
+    # largest value (in microseconds) that falls into the bucket
+    shift = max(0, index // _SUB_BUCKETS - 1)
+    return ((index - shift * _SUB_BUCKETS + 1) << shift) - 1
+
+# fixed-memory latency histogram, recording is O(1) and never allocates
+class Histogram:
+    def __init__(self) -> None:
+        self._counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0 # seconds
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self._counts[_bucketOf(int(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """Approximate latency in seconds below which p percent of samples fall"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, round(self.count * p / 100))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                if index == _BUCKETS - 1:
+                    return self.max # clamped samples, the bucket bound says nothing about them
+                return min(_bucketHigh(index) / 1_000_000, self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """count plus mean, p50, p95, p99 and max in milliseconds"""
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count * 1000, 3),
+            "p50": round(self.percentile(50) * 1000, 3),
+            "p95": round(self.percentile(95) * 1000, 3),
+            "p99": round(self.percentile(99) * 1000, 3),
+            "max": round(self.max * 1000, 3),
+        }
+
+# commands whose reply can be told apart, and how many leading fields identify the pair
+_correlated = {"PING": 1, "GROUPS": 1, "JOIN": 3, "VIEW": 3, "HISTORY": 3, "SUBSCRIBE": 1}
+
+def replyKey(line: str) -> tuple[str, ...] | None:
+    """Key shared by a command and the reply answering it, None if the reply cannot be matched.
+    Fields stay escaped, the server echoes them back escaped the same way."""
+    parts = line.split("|", 3)
+    fields = _correlated.get(parts[0])
+    if fields is None or len(parts) < fields:
+        return None
+    return tuple(parts[:fields])
+
+# matches commands with their replies and records how long each round trip took
+class LatencyTracker:
+    def __init__(self, timeout: float = 30.0, maxPending: int = 10_000) -> None:
+        self.timeout = timeout # seconds after which an unanswered command is forgotten
+        self.maxPending = maxPending # most unanswered commands remembered at once
+        self.histograms: dict[str, Histogram] = {kind: Histogram() for kind in _correlated}
+        self._pending: dict[tuple[str, ...], deque[float]] = {} # reply key -> send times, oldest first
+        self._pendingCount = 0
+        self._lock = Lock() # commands may be sent from any thread
+        self.unanswered = 0 # commands dropped because of timeout or the pending limit
+
+    def onSend(self, line: str) -> None:
+        """Notes the send time of a command"""
+        key = replyKey(line)
+        if key is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if self._pendingCount >= self.maxPending:
+                self._expire(now, force=True)
+            self._pending.setdefault(key, deque()).append(now)
+            self._pendingCount += 1
+
+    def onReceive(self, line: str) -> None:
+        """Records a round trip if the line answers a pending command"""
+        if not self._pendingCount:
+            return
+        key = replyKey(line)
+        if key is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            sent = self._pending.get(key)
+            if not sent:
+                return
+            start = sent.popleft()
+            if not sent:
+                del self._pending[key]
+            self._pendingCount -= 1
+        self.histograms[key[0]].record(now - start)
+
+    def expire(self) -> None:
+        """Forgets commands that were never answered, e.g. VIEWs the server ignored"""
+        with self._lock:
+            self._expire(time.perf_counter())
+
+    def _expire(self, now: float, force: bool = False):
+        # caller holds the lock; force drops the oldest command when nothing has timed out
+        oldestKey = None
+        for key, sent in list(self._pending.items()):
+            while sent and now - sent[0] > self.timeout:
+                sent.popleft()
+                self._pendingCount -= 1
+                self.unanswered += 1
+            if not sent:
+                del self._pending[key]
+            elif oldestKey is None or sent[0] < self._pending[oldestKey][0]:
+                oldestKey = key
+        if force and self._pendingCount >= self.maxPending and oldestKey is not None:
+            sent = self._pending[oldestKey]
+            sent.popleft()
+            if not sent:
+                del self._pending[oldestKey]
+            self._pendingCount -= 1
+            self.unanswered += 1
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Latency summary per command, PING is the network round trip"""
+        return {kind: h.summary() for kind, h in self.histograms.items()}
+
+def formatStats(stats: dict[str, dict[str, float]]) -> str:
+    """Renders LatencyTracker.stats() as a small table"""
+    lines = [f"{'command':<8} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for kind, s in stats.items():
+        if s["count"]:
+            lines.append(f"{kind:<8} {s['count']:>7} {s['p50']:>9} {s['p95']:>9} {s['p99']:>9} {s['max']:>9}")
+        else:
+            lines.append(f"{kind:<8} {0:>7}")
+    return "\n".join(lines)
+
+async def pingLoop(client, interval: float) -> None:
+    """Sends a PING every interval seconds while the client is connected"""
+    while client.connected:
+        try:
+            await client.send("PING")
+        except OutboundFull:
+            pass # the queue is backed up, try again next time
+        except RuntimeError:
+            return # disconnected
+        client.latency.expire()
+        await asyncio.sleep(interval)
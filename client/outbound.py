@@ -0,0 +1,109 @@
+from collections import deque
+from threading import Condition
+from typing import Callable
+
+# what happens when a command is sent while the outbound queue is full
+BLOCK = "block" # wait for the writer to make room
+FAIL = "fail" # raise OutboundFull straight away
+
+# raised when the outbound queue is full and the policy is FAIL
+class OutboundFull(RuntimeError):
+    pass
+
+# bounded queue of encoded command lines, filled from any thread and drained by one writer
+class OutboundQueue:
+    def __init__(self, maxPending: int = 4096, policy: str = BLOCK, flushDelay: float = 0.0,
+                 flushBytes: int = 64 * 1024) -> None:
+        if policy not in (BLOCK, FAIL):
+            raise ValueError(f"unknown policy {policy!r}")
+        self.maxPending = maxPending # lines held before the policy applies
+        self.policy = policy
+        self.flushDelay = flushDelay # seconds the writer waits for more lines before a write
+        self.flushBytes = flushBytes # write as soon as this many bytes are pending, and at most this many per write
+        self._lines: deque[bytes] = deque()
+        self._bytes = 0
+        self._cond = Condition()
+        self.closed = False
+        self.onReady: Callable[[], None] | None = None # called when lines arrive in an empty queue
+        self.onSpace: Callable[[], None] | None = None # called after the writer took lines
+        self.queued = 0 # lines accepted
+        self.rejected = 0 # lines refused under the FAIL policy
+        self.writes = 0 # batches handed to the socket
+        self.maxDepth = 0 # most lines waiting at once
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def pendingBytes(self) -> int:
+        return self._bytes
+
+    def tryPut(self, line: str) -> bool:
+        """Queues a line if there is room, never blocks"""
+        data = f"{line}\n".encode('utf-8')
+        with self._cond:
+            if self.closed:
+                raise RuntimeError("Socket not connected")
+            if len(self._lines) >= self.maxPending:
+                return False
+            self._append(data)
+        return True
+
+    def put(self, line: str, timeout: float | None = None) -> None:
+        """Queues a line, applying the policy when the queue is full, safe to call from any thread"""
+        data = f"{line}\n".encode('utf-8')
+        with self._cond:
+            while len(self._lines) >= self.maxPending and not self.closed:
+                if self.policy == FAIL:
+                    self.rejected += 1
+                    raise OutboundFull(f"{len(self._lines)} commands already waiting to be sent")
+                if not self._cond.wait(timeout):
+                    raise OutboundFull("timed out waiting for the writer")
+            if self.closed:
+                raise RuntimeError("Socket not connected")
+            self._append(data)
+
+    def _append(self, data: bytes):
+        # caller holds the lock
+        wasEmpty = not self._lines
+        self._lines.append(data)
+        self._bytes += len(data)
+        self.queued += 1
+        if len(self._lines) > self.maxDepth:
+            self.maxDepth = len(self._lines)
+        if wasEmpty and self.onReady is not None:
+            self.onReady()
+
+    def take(self) -> bytes:
+        """Removes up to flushBytes worth of lines (at least one) joined into a single write"""
+        with self._cond:
+            batch = []
+            size = 0
+            while self._lines and (not batch or size + len(self._lines[0]) <= self.flushBytes):
+                data = self._lines.popleft()
+                batch.append(data)
+                size += len(data)
+            self._bytes -= size
+            if batch:
+                self.writes += 1
+            self._cond.notify_all()
+        if self.onSpace is not None:
+            self.onSpace()
+        return b"".join(batch)
+
+    def close(self) -> None:
+        """Drops whatever is queued and wakes every blocked sender"""
+        with self._cond:
+            self.closed = True
+            self._lines.clear()
+            self._bytes = 0
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self.queued,
+            "pending": len(self._lines),
+            "writes": self.writes,
+            "rejected": self.rejected,
+            "maxDepth": self.maxDepth,
+        }
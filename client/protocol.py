@@ -0,0 +1,56 @@
+from client.codec import decode, encode
+
+# functions to create queries for the server, fields are escaped by the codec
+def createGroupsQuery() -> str:
+    return "GROUPS"
+def createJoinQuery(group: str, name: str) -> str:
+    return encode("JOIN", group, name)
+def createLeaveQuery(group: str) -> str:
+    return encode("LEAVE", group)
+def createPostQuery(group: str, subject: str, content: str) -> str:
+    return encode("POST", group, subject, content)
+def createViewQuery(group: str, id: int) -> str:
+    return encode("VIEW", group, id)
+def createHistoryQuery(group: str, before: int = 0, limit: int = 50) -> str:
+    # up to limit ids older than before, 0 for the newest
+    return encode("HISTORY", group, before, limit)
+def createSubscribeQuery(mode: str = "push", maxLength: int = 16 * 1024) -> str:
+    # "push" gets new posts inline with MESSAGE when the line fits in maxLength characters, "ids" turns it off
+    return encode("SUBSCRIBE", mode, maxLength)
+def createExitQuery():
+    return 'EXIT'
+
+# functions to parse server responses, the grammar lives in client.codec
+def _fields(msg: str, kind: str) -> list | None:
+    note = decode(msg)
+    if note is None or note.kind != kind:
+        return None
+    return note.fields()
+def parseGroupsMsg(msg: str) -> list[str] | None:
+    # GROUPS|g1|g2|g3|...
+    return _fields(msg, "GROUPS")
+def parseJoinMsg(msg: str) -> list | None:
+    # JOIN|group|name
+    return _fields(msg, "JOIN")
+def parseLeaveMsg(msg: str) -> list | None:
+    # LEAVE|group|name
+    return _fields(msg, "LEAVE")
+def parseMessageMsg(msg: str) -> list | None:
+    # MESSAGE|group|id, or MESSAGE|group|id|sender|postDate|subject|contents when pushed
+    return _fields(msg, "MESSAGE")
+def parseViewMsg(msg: str) -> list | None:
+    # VIEW|group|id|sender|postDate|subject|contents
+    return _fields(msg, "VIEW")
+def parseHistoryMsg(msg: str) -> list | None:
+    # HISTORY|group|before|id1|id2|...
+    return _fields(msg, "HISTORY")
+def parseSubscribeMsg(msg: str) -> list | None:
+    # SUBSCRIBE|mode|maxLength
+    return _fields(msg, "SUBSCRIBE")
+
+def parseNotification(msg: str) -> tuple[str, list] | None:
+    """Parses any server line into its kind and fields, None if it is unknown or malformed"""
+    note = decode(msg)
+    if note is None:
+        return None
+    return note.kind, note.fields()
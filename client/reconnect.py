@@ -0,0 +1,68 @@
+import random
+from threading import Event, Thread
+from typing import Callable, Iterator
+from client.server import Listener, Server
+
+def backoffDelays(baseDelay: float, maxDelay: float, rng: random.Random) -> Iterator[float]:
+    """Exponential backoff with full jitter: attempt n waits uniformly between 0 and
+    min(maxDelay, baseDelay * 2**n), so clients dropped together do not come back together"""
+    ceiling = baseDelay
+    while True:
+        yield rng.uniform(0, ceiling)
+        ceiling = min(maxDelay, ceiling * 2)
+
+# watches a Server's connection and reconnects it when it drops, until stopped
+class ReconnectSupervisor:
+    def __init__(self, server: Server, handle: Callable[[str], None], baseDelay: float = 0.5, maxDelay: float = 30.0,
+                 maxAttempts: int = 0, onDisconnected: Callable[[], None] | None = None,
+                 onReconnected: Callable[[], None] | None = None, rng: random.Random | None = None) -> None:
+        self.server = server
+        self.handle = handle # receives every line, on every connection
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+        self.maxAttempts = maxAttempts # consecutive failed attempts before giving up, 0 to keep trying
+        self.onDisconnected = onDisconnected # called on the supervisor thread when the connection drops
+        self.onReconnected = onReconnected # called on the supervisor thread once listening again
+        self._rng = rng or random.Random()
+        self._stopped = Event()
+        self._listener: Listener | None = None
+        self._thread: Thread | None = None
+        self.generation = 0 # bumped after every successful reconnect, cheap to poll from a ui loop
+        self.attempts = 0 # reconnect attempts made
+        self.gaveUp = False
+
+    def start(self) -> None:
+        """Starts listening on the connected server and supervising it"""
+        self._listener = self.server.listen(self.handle)
+        self._thread = Thread(target=self._run, name="reconnect", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops reconnecting, call before an intentional disconnect"""
+        self._stopped.set()
+
+    def _run(self):
+        while True:
+            self._listener.join()
+            if self._stopped.is_set():
+                return
+            if self.onDisconnected is not None:
+                self.onDisconnected()
+            if not self._reconnect():
+                return
+            self._listener = self.server.listen(self.handle)
+            self.generation += 1
+            if self.onReconnected is not None:
+                self.onReconnected()
+
+    def _reconnect(self) -> bool:
+        for failures, delay in enumerate(backoffDelays(self.baseDelay, self.maxDelay, self._rng)):
+            if self.maxAttempts and failures >= self.maxAttempts:
+                self.gaveUp = True
+                return False
+            if self._stopped.wait(delay):
+                return False
+            self.attempts += 1
+            self.server.reconnect()
+            if self.server.connected:
+                return True
@@ -0,0 +1,134 @@
+"""Records the raw lines a client receives and replays them later without a server.
+
+Usage: python -m client.record PATH [--speed X]   (replays PATH through the gui update path, headless)
+
+A recording is a text file, gzip compressed when the name ends in .gz. Each connection starts
+with a header line "#board-recording 1 <unix start time>", then every received line is written
+as "<microseconds since the previous line>\t<line>".
+"""
+import argparse
+import gzip
+import time
+from threading import Event, Thread
+from typing import Callable, Iterator, TextIO
+from client.codec import decode
+from client.updates import UpdateQueue
+
+_HEADER = "#board-recording 1"
+
+def _open(path: str, mode: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding='utf-8', newline="\n")
+    return open(path, mode, encoding='utf-8', newline="\n")
+
+# appends received lines to a recording, called on the client loop thread
+class Recorder:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._out = _open(path, "a")
+        self._last = time.time()
+        self._out.write(f"{_HEADER} {self._last:.6f}\n")
+        self.lines = 0
+
+    def record(self, line: str) -> None:
+        now = time.time()
+        self._out.write(f"{round((now - self._last) * 1_000_000)}\t{line}\n")
+        self._last = now
+        self.lines += 1
+
+    def close(self) -> None:
+        if not self._out.closed:
+            self._out.close()
+
+def readRecording(path: str) -> Iterator[tuple[float, str]]:
+    """Yields (seconds since the recording started, line) for every recorded line"""
+    start = None
+    clock = 0.0 # absolute time of the previous line
+    with _open(path, "r") as stream:
+        for raw in stream:
+            raw = raw.rstrip("\n")
+            if raw.startswith(_HEADER):
+                clock = float(raw.rsplit(" ", 1)[1]) # a new connection, reset the clock
+                if start is None:
+                    start = clock
+                continue
+            if start is None:
+                raise ValueError(f"{path} is not a board recording")
+            delta, _, line = raw.partition("\t")
+            clock += int(delta) / 1_000_000
+            yield clock - start, line
+
+def replay(path: str, handle: Callable[[str], None], speed: float = 0.0,
+           stop: Event | None = None) -> tuple[int, float]:
+    """Feeds a recording into handle, at the recorded pace scaled by speed or, with speed 0,
+    as fast as possible. Returns the number of lines and the seconds taken."""
+    count = 0
+    began = time.perf_counter()
+    for offset, line in readRecording(path):
+        if stop is not None and stop.is_set():
+            break
+        if speed > 0:
+            delay = began + offset / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        handle(line)
+        count += 1
+    return count, time.perf_counter() - began
+
+# stands in for client.server.Server, playing back a recording instead of talking to a server
+class ReplayServer:
+    def __init__(self, path: str, speed: float = 1.0) -> None:
+        self.path = path
+        self.speed = speed # 1 keeps the recorded pacing, 0 replays as fast as possible
+        self.connected = False
+        self.sent: list[str] = [] # commands the client tried to send, for inspection
+        self.result: tuple[int, float] | None = None # replay() result once playback has finished
+        self._stop = Event()
+
+    def connect(self, host: str, port: int):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+        self._stop.set()
+
+    def send(self, msg: str) -> None:
+        if not self.connected:
+            raise RuntimeError("Socket not connected")
+        self.sent.append(msg)
+
+    def listen(self, handle: Callable[[str], None]):
+        from client.server import Listener # client.server imports this module
+        if not self.connected:
+            raise RuntimeError("Socket not connected")
+        listener = Listener()
+        def play():
+            self.result = replay(self.path, handle, self.speed, self._stop)
+            listener._done.set()
+        Thread(target=play, name="replay", daemon=True).start()
+        return listener
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 for the recorded pace, 0 (default) for as fast as possible")
+    parser.add_argument("--batch", type=int, default=500, help="lines drained from the update queue at a time")
+    args = parser.parse_args()
+
+    # the gui path minus the widgets: queue on the listener thread, coalesce and drain in batches
+    updates = UpdateQueue()
+    applied = 0
+    def handle(line: str):
+        nonlocal applied
+        updates.push(line)
+        if len(updates) >= args.batch:
+            applied += len(updates.drain(args.batch))
+    count, elapsed = replay(args.path, handle, args.speed)
+    while len(updates):
+        applied += len(updates.drain(args.batch))
+    parsed = sum(1 for _, line in readRecording(args.path) if decode(line) is not None)
+    print(f"{count:,} lines in {elapsed:.3f}s, {count / elapsed if elapsed else 0:,.0f} lines/sec")
+    print(f"{parsed:,} parsed, {applied:,} ui updates after coalescing, {updates.stats()}")
+
+if __name__ == "__main__":
+    main()
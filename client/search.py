@@ -0,0 +1,129 @@
+import bisect
+import re
+from datetime import datetime
+
+_words = re.compile(r"\w+")
+_date = re.compile(r"\d{4}(-\d{1,2}){0,2}\*?$") # date terms keep their dashes, e.g. 2024-11 or 2024-11-02
+
+# a message matching a search, newest first
+class SearchHit:
+    __slots__ = ("group", "id", "sender", "postDate", "subject")
+    def __init__(self, group: str, id: int, sender: str, postDate: datetime, subject: str) -> None:
+        self.group = group
+        self.id = id
+        self.sender = sender
+        self.postDate = postDate
+        self.subject = subject
+    def __repr__(self) -> str:
+        return f"SearchHit({self.group!r}, {self.id!r}, {self.sender!r}, {self.subject!r})"
+
+def terms(text: str) -> list[str]:
+    """Lower case words of a subject or content"""
+    return _words.findall(text.lower())
+
+# inverted index over message bodies, updated one body at a time as VIEW replies and pushed posts arrive.
+# Every word of the subject and content is a term, the sender is indexed as its words and as from:sender,
+# and the post date as its UTC day, e.g. 2024-11-02. A query matches messages containing every term;
+# a term ending in * matches any term starting with it.
+class SearchIndex:
+    def __init__(self) -> None:
+        self._postings: dict[str, set[int]] = {} # term -> numbers of the messages containing it
+        self._sorted: list[str] = [] # every term in order, for prefix lookups
+        self._numbers: dict[tuple[str, int], int] = {} # (group, id) -> message number
+        self._hits: list[SearchHit] = [] # message number -> what a result shows
+        self._times: list[float] = [] # message number -> post time, for ordering results
+        self.searches = 0
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def add(self, group: str, id: int, sender: str, postDate: datetime, subject: str, content: str) -> None:
+        """Indexes a message body, bodies never change so one already indexed is skipped"""
+        key = (group, id)
+        if key in self._numbers:
+            return
+        number = self._numbers[key] = len(self._hits)
+        self._hits.append(SearchHit(group, id, sender, postDate, subject))
+        self._times.append(postDate.timestamp())
+        words = set(terms(subject))
+        words.update(terms(content))
+        words.update(terms(sender))
+        words.add(f"from:{sender.lower()}")
+        words.add(postDate.date().isoformat())
+        postings = self._postings
+        for word in words:
+            docs = postings.get(word)
+            if docs is None:
+                docs = postings[word] = set()
+                bisect.insort(self._sorted, word)
+            docs.add(number)
+
+    def addMany(self, bodies) -> None:
+        """Indexes (group, id, (sender, postDate, subject, content)) tuples, e.g. a persistent cache"""
+        for group, id, body in bodies:
+            self.add(group, id, *body)
+
+    def search(self, query: str, groups=None, limit: int = 50) -> list[SearchHit]:
+        """Messages matching every term of the query, newest first, only from groups when given"""
+        self.searches += 1
+        matches: list[set[int]] = []
+        for term in self._parse(query):
+            docs = self._match(term)
+            if not docs:
+                return [] # nothing can match every term
+            matches.append(docs)
+        if not matches:
+            return []
+        matches.sort(key=len) # intersect starting from the rarest term
+        found = set(matches[0])
+        for docs in matches[1:]:
+            found &= docs
+            if not found:
+                return []
+        # numbers mostly arrive in post order, so this sort is close to linear even for broad matches
+        hits = self._hits
+        ordered = sorted(found, key=self._times.__getitem__, reverse=True)
+        if groups is None:
+            return [hits[n] for n in ordered[:limit]]
+        groups = set(groups)
+        result = []
+        for n in ordered:
+            hit = hits[n]
+            if hit.group in groups:
+                result.append(hit)
+                if len(result) == limit:
+                    break
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {"messages": len(self._hits), "terms": len(self._sorted), "searches": self.searches}
+
+    def _parse(self, query: str) -> list[str]:
+        # from:name and dates are kept whole, other words are split like indexed text
+        result = []
+        for word in query.lower().split():
+            prefix = word.endswith("*")
+            if word.startswith("from:"):
+                result.append(word)
+                continue
+            if _date.match(word):
+                if not prefix and word.count("-") < 2:
+                    word += "*" # a year or month matches every day in it
+                result.append(word)
+                continue
+            parts = terms(word)
+            if prefix and parts:
+                parts[-1] += "*"
+            result.extend(parts)
+        return result
+
+    def _match(self, term: str) -> set[int]:
+        if not term.endswith("*"):
+            return self._postings.get(term, set())
+        prefix = term[:-1]
+        start = bisect.bisect_left(self._sorted, prefix)
+        end = bisect.bisect_left(self._sorted, prefix + "\U0010ffff")
+        if end - start == 1:
+            return self._postings[self._sorted[start]]
+        postings = self._postings
+        return set().union(*[postings[word] for word in self._sorted[start:end]])
@@ -0,0 +1,111 @@
+import asyncio
+from threading import Event, Lock, Thread
+from typing import Callable
+from client import trace
+from client.aio import AsyncClient
+from client.framing import DEFAULT_BUFFER_SIZE
+from client.metrics import LatencyTracker
+from client.outbound import BLOCK, OutboundQueue
+from client.record import Recorder
+
+# one background event loop shared by every blocking Server in the process
+_loop: asyncio.AbstractEventLoop | None = None
+_loopLock = Lock()
+
+def sharedLoop() -> asyncio.AbstractEventLoop:
+    """Returns the background event loop, starting its thread on first use"""
+    global _loop
+    with _loopLock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            Thread(target=_loop.run_forever, name="client-loop", daemon=True).start()
+        return _loop
+
+# handle returned by Server.listen, finishes once the connection is closed
+class Listener:
+    def __init__(self) -> None:
+        self._done = Event()
+    def is_alive(self) -> bool:
+        return not self._done.is_set()
+    def join(self, timeout: float | None = None) -> None:
+        self._done.wait(timeout)
+
+# blocking facade over AsyncClient for callers that are not coroutines
+class Server:
+    def __init__(self, bufferSize: int = DEFAULT_BUFFER_SIZE, maxPending: int = 4096,
+                 policy: str = BLOCK, flushDelay: float = 0.0, flushBytes: int = 64 * 1024, noDelay: bool = True,
+                 pingInterval: float = 0.0, tracer: trace.Tracer | None = None, recordPath: str | None = None) -> None:
+        self.bufferSize = bufferSize # size of the receive buffer used by the listener
+        self.tracer = tracer if tracer is not None else trace.tracer # records lines sent and received, see client.trace
+        # outbound queue settings, see OutboundQueue
+        self.maxPending = maxPending
+        self.policy = policy
+        self.flushDelay = flushDelay
+        self.flushBytes = flushBytes
+        self.noDelay = noDelay
+        self.pingInterval = pingInterval # seconds between PINGs measuring the round trip, 0 to disable
+        self.latency = LatencyTracker() # kept across reconnects
+        self.recordPath = recordPath # append every received line to this recording, see client.record
+        self.client: AsyncClient | None = None
+        self.address: tuple[str, int] | None = None # host and port of the last connect, used by reconnect
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None and self.client.connected
+
+    def _run(self, coro):
+        # run a coroutine on the shared loop and wait for its result
+        return asyncio.run_coroutine_threadsafe(coro, sharedLoop()).result()
+
+    def connect(self, host: str, port: int):
+        self.address = (host, port)
+        outbound = OutboundQueue(self.maxPending, self.policy, self.flushDelay, self.flushBytes)
+        self.client = AsyncClient(self.bufferSize, outbound, self.noDelay, self.latency, self.tracer)
+        if self.recordPath:
+            self.client.recorder = Recorder(self.recordPath)
+        self._run(self.client.connect(host, port))
+        if not self.client.connected and self.client.recorder is not None:
+            self.client.recorder.close()
+        if self.client.connected and self.pingInterval > 0:
+            sharedLoop().call_soon_threadsafe(self.client.startPing, self.pingInterval)
+
+    def reconnect(self):
+        """Opens a fresh connection to the last address, any previous connection must be closed"""
+        if self.address is None:
+            raise RuntimeError("Never connected")
+        self.connect(*self.address)
+
+    def disconnect(self):
+        if self.client is not None:
+            self._run(self._flushAndClose(self.client))
+
+    async def _flushAndClose(self, client: AsyncClient):
+        try:
+            await asyncio.wait_for(client.flush(), 1) # let queued commands such as EXIT go out first
+        except asyncio.TimeoutError:
+            pass
+        await client.close()
+
+    def latencyStats(self) -> dict[str, dict[str, float]]:
+        """p50/p95/p99 latency per command in milliseconds, see LatencyTracker.stats"""
+        return self.latency.stats()
+
+    # queue a message for the server, the caller only waits if the outbound queue is full
+    # and the policy is BLOCK; under FAIL, or from a listen handler, a full queue raises OutboundFull
+    def send(self, msg: str) -> None:
+        if not self.connected:
+            raise RuntimeError("Socket not connected")
+        self.client.sendNowait(msg)
+
+    # listen for incoming messages, handle is called on the client loop thread and may send replies
+    def listen(self, handle: Callable[[str], None]) -> Listener:
+        if not self.connected:
+            raise RuntimeError("Socket not connected")
+        listener = Listener()
+        client = self.client
+        async def watch():
+            client.addHandler(handle)
+            await client.closed.wait()
+            listener._done.set()
+        asyncio.run_coroutine_threadsafe(watch(), sharedLoop())
+        return listener
@@ -0,0 +1,252 @@
+import selectors
+import socket
+import time
+from collections import deque
+from threading import Lock
+from typing import Callable
+from client.codec import Notification, decode
+from client.framing import LineFramer
+from client.protocol import (createExitQuery, createGroupsQuery, createHistoryQuery, createJoinQuery,
+                             createLeaveQuery, createPostQuery, createViewQuery)
+
+# receive buffer per session, small because a pool holds many sessions
+SESSION_BUFFER_SIZE = 16 * 1024
+
+# one user connected through a SessionPool, only touch it from the pool thread
+class Session:
+    def __init__(self, pool: "SessionPool", sock: socket.socket, name: str,
+                 onNotification: Callable[["Session", Notification], None] | None) -> None:
+        self.pool = pool
+        self.sock = sock
+        self.name = name # user name this session joins groups with
+        self.onNotification = onNotification # called on the pool thread for every decoded notification
+        self.groups: set[str] = set() # groups the server confirmed we joined
+        self.connected = True
+        self._framer = LineFramer(pool.bufferSize)
+        self._out = bytearray() # encoded commands not yet written
+        self._writing = False # registered for EVENT_WRITE because the socket buffer was full
+        self.linesIn = 0
+        self.linesOut = 0
+        self.bytesOut = 0
+        self.malformed = 0 # lines that did not decode
+        self.openedAt = time.perf_counter()
+
+    def send(self, msg: str) -> None:
+        """Queues a command, written once the pool finishes the current round of events"""
+        if not self.connected:
+            raise RuntimeError("Socket not connected")
+        if not self._out:
+            self.pool._dirty.append(self)
+        self._out += f"{msg}\n".encode('utf-8')
+        self.linesOut += 1
+
+    def requestGroups(self) -> None:
+        self.send(createGroupsQuery())
+
+    def join(self, group: str) -> None:
+        self.send(createJoinQuery(group, self.name))
+
+    def leave(self, group: str) -> None:
+        self.send(createLeaveQuery(group))
+
+    def post(self, group: str, subject: str, content: str) -> None:
+        self.send(createPostQuery(group, subject, content))
+
+    def view(self, group: str, id: int) -> None:
+        self.send(createViewQuery(group, id))
+
+    def history(self, group: str, before: int = 0, limit: int = 50) -> None:
+        self.send(createHistoryQuery(group, before, limit))
+
+    def exit(self) -> None:
+        """Sends EXIT and closes once it has been written"""
+        if self.connected:
+            self.send(createExitQuery())
+            self.pool._closing.add(self)
+
+    def stats(self) -> dict[str, float]:
+        elapsed = time.perf_counter() - self.openedAt
+        return {
+            "name": self.name,
+            "groups": sorted(self.groups),
+            "linesIn": self.linesIn,
+            "linesOut": self.linesOut,
+            "bytesOut": self.bytesOut,
+            "linesInPerSec": round(self.linesIn / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def _onLine(self, line: str):
+        self.linesIn += 1
+        note = decode(line)
+        if note is None:
+            self.malformed += 1
+            return
+        # track our own membership from the server's echoes
+        if note.kind == "JOIN" and note.name == self.name:
+            self.groups.add(note.group)
+        elif note.kind == "LEAVE" and note.name == self.name:
+            self.groups.discard(note.group)
+        if self.onNotification is not None:
+            self.onNotification(self, note)
+
+# many sessions multiplexed over non-blocking sockets and one selector, driven by a single thread
+class SessionPool:
+    def __init__(self, bufferSize: int = SESSION_BUFFER_SIZE) -> None:
+        self.bufferSize = bufferSize
+        self.sessions: dict[int, Session] = {} # socket fd -> session
+        self._selector = selectors.DefaultSelector()
+        self._dirty: list[Session] = [] # sessions with commands to write
+        self._closing: set[Session] = set() # sessions to close once their output is written
+        # other threads hand work to the pool thread through this queue and a wakeup socket
+        self._calls: deque[Callable[[], None]] = deque()
+        self._callsLock = Lock()
+        self._wakeRead, self._wakeWrite = socket.socketpair()
+        self._wakeRead.setblocking(False)
+        self._wakeWrite.setblocking(False)
+        self._selector.register(self._wakeRead, selectors.EVENT_READ, None)
+        self._running = False
+        self.startedAt = time.perf_counter()
+        self.closedSessions = 0
+        self._linesInClosed = 0 # lines received by sessions that are gone, kept for the totals
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def open(self, host: str, port: int, name: str,
+             onNotification: Callable[[Session, Notification], None] | None = None) -> Session:
+        """Connects a new session, the connect itself blocks briefly"""
+        sock = socket.create_connection((host, port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setblocking(False)
+        session = Session(self, sock, name, onNotification)
+        self.sessions[sock.fileno()] = session
+        self._selector.register(sock, selectors.EVENT_READ, session)
+        return session
+
+    def close(self, session: Session) -> None:
+        if not session.connected:
+            return
+        session.connected = False
+        self._linesInClosed += session.linesIn
+        self.closedSessions += 1
+        self.sessions.pop(session.sock.fileno(), None)
+        self._selector.unregister(session.sock)
+        session.sock.close()
+        self._closing.discard(session)
+
+    def closeAll(self) -> None:
+        for session in list(self.sessions.values()):
+            self.close(session)
+        self._selector.close()
+        self._wakeRead.close()
+        self._wakeWrite.close()
+
+    def call(self, fn: Callable[[], None]) -> None:
+        """Runs fn on the pool thread, safe to call from any thread"""
+        with self._callsLock:
+            self._calls.append(fn)
+        try:
+            self._wakeWrite.send(b"\0")
+        except BlockingIOError:
+            pass # a wakeup is already pending
+
+    def poll(self, timeout: float | None = None) -> int:
+        """Handles one round of socket events then writes queued commands, returns the number of events"""
+        self._flush() # commands queued outside of a poll, e.g. right after open
+        events = self._selector.select(timeout)
+        for key, mask in events:
+            session = key.data
+            if session is None:
+                self._runCalls()
+                continue
+            if mask & selectors.EVENT_READ:
+                self._read(session)
+            if mask & selectors.EVENT_WRITE and session.connected:
+                self._write(session)
+        self._flush()
+        return len(events)
+
+    def run(self, duration: float | None = None) -> None:
+        """Polls until stop() is called or duration seconds have passed"""
+        self._running = True
+        stop = None if duration is None else time.perf_counter() + duration
+        while self._running:
+            timeout = None
+            if stop is not None:
+                timeout = stop - time.perf_counter()
+                if timeout <= 0:
+                    break
+            self.poll(timeout)
+
+    def stop(self) -> None:
+        self._running = False
+        self.call(lambda: None) # wake the selector
+
+    def stats(self, perSession: bool = False) -> dict:
+        """Aggregate throughput, and every session's counters when perSession is set"""
+        elapsed = time.perf_counter() - self.startedAt
+        linesIn = self._linesInClosed + sum(s.linesIn for s in self.sessions.values())
+        result = {
+            "sessions": len(self.sessions),
+            "closed": self.closedSessions,
+            "linesIn": linesIn,
+            "linesOut": sum(s.linesOut for s in self.sessions.values()),
+            "linesInPerSec": round(linesIn / elapsed, 1) if elapsed else 0.0,
+            "malformed": sum(s.malformed for s in self.sessions.values()),
+        }
+        if perSession:
+            result["perSession"] = [s.stats() for s in self.sessions.values()]
+        return result
+
+    def _read(self, session: Session):
+        try:
+            lines = session._framer.recvFrom(session.sock)
+        except BlockingIOError:
+            return
+        except OSError:
+            lines = None
+        if lines is None:
+            self.close(session) # closed by the server
+            return
+        for line in lines:
+            session._onLine(line)
+            if not session.connected:
+                return # a callback closed it
+
+    def _write(self, session: Session):
+        try:
+            sent = session.sock.send(session._out)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self.close(session)
+            return
+        session.bytesOut += sent
+        del session._out[:sent]
+        if session._out and not session._writing:
+            session._writing = True
+            self._selector.modify(session.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, session)
+        elif not session._out:
+            if session._writing:
+                session._writing = False
+                self._selector.modify(session.sock, selectors.EVENT_READ, session)
+            if session in self._closing:
+                self.close(session)
+
+    def _flush(self):
+        # one send per session per round, however many commands callbacks queued
+        dirty, self._dirty = self._dirty, []
+        for session in dirty:
+            if session.connected and session._out and not session._writing:
+                self._write(session)
+
+    def _runCalls(self):
+        try:
+            while self._wakeRead.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        with self._callsLock:
+            calls, self._calls = self._calls, deque()
+        for fn in calls:
+            fn()
@@ -0,0 +1,277 @@
+"""In-process stand-in for Server.java speaking the same line protocol, for tests and benchmarks.
+
+Usage: python -m client.standin [--port 0] [--latency SECONDS] [--chunk BYTES]
+"""
+import argparse
+import asyncio
+import bisect
+import time
+from datetime import datetime, timezone
+from threading import Thread
+from client.codec import encode, unescape
+
+# boards created by Server.java
+DEFAULT_GROUPS = ("Public", "Group1", "Group2", "Group3", "Group4", "Group5")
+MAX_HISTORY = 500 # most ids returned by one HISTORY, like Board.MAX_HISTORY
+MAX_PUSH = 1 << 20 # largest push limit a client may ask for, like Board.MAX_PUSH
+
+def formatInstant(when: datetime) -> str:
+    # DateTimeFormatter.ISO_INSTANT style, e.g. 2024-11-02T18:04:11.123456Z
+    return when.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+# message class represents a single message in a board
+class StandInMessage:
+    __slots__ = ("sender", "postDate", "subject", "content")
+    def __init__(self, sender: str, postDate: datetime, subject: str, content: str) -> None:
+        self.sender = sender
+        self.postDate = postDate
+        self.subject = subject
+        self.content = content
+
+# board class mirrors Board in Server.java
+class StandInBoard:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.messages: dict[int, StandInMessage] = {}
+        self.order: list[int] = [] # ids oldest first, ids only grow so this stays sorted
+        self._nextId = int(time.time()) # monotonic like Board.nextId, starts high so ids of a restarted server do not repeat
+        self.clients: dict["StandInConnection", str] = {} # connection -> name in this board
+
+    def join(self, conn: "StandInConnection", name: str):
+        for other in self.clients:
+            other.send(encode("JOIN", self.name, name)) # notify all existing board clients of a join
+        self.clients[conn] = name
+
+    def leave(self, conn: "StandInConnection"):
+        name = self.clients.get(conn)
+        if name is None:
+            return
+        for other in self.clients:
+            other.send(encode("LEAVE", self.name, name)) # the leaver is notified too
+        del self.clients[conn]
+
+    def post(self, conn: "StandInConnection", subject: str, content: str):
+        if conn not in self.clients:
+            return
+        id = self._nextId
+        self._nextId += 1
+        msg = self.messages[id] = StandInMessage(self.clients[conn], datetime.now(timezone.utc), subject, content)
+        self.order.append(id)
+        line = encode("MESSAGE", self.name, id)
+        pushed = None # MESSAGE with the VIEW fields appended, built once for every subscriber
+        for other in self.clients:
+            if other.pushLimit:
+                if pushed is None:
+                    pushed = encode("MESSAGE", self.name, id, msg.sender, formatInstant(msg.postDate), subject, content)
+                if len(pushed) <= other.pushLimit:
+                    other.send(pushed)
+                    continue
+            other.send(line) # ids only, or too big to push
+
+    def lastTwoMessageIds(self) -> list[int]:
+        return self.order[-2:]
+
+    def history(self, before: int, limit: int) -> list[int]:
+        """Up to limit ids older than before, 0 for the newest, oldest first"""
+        end = len(self.order) if before == 0 else bisect.bisect_left(self.order, before)
+        return self.order[max(0, end - min(limit, MAX_HISTORY)):end]
+
+# one accepted client, replies go through an ordered queue drained by a writer task
+class StandInConnection:
+    def __init__(self, server: "StandInServer", reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.name: str | None = None # last name used to join, identifies slow consumers
+        self.boards: set[StandInBoard] = set()
+        self.pushLimit = 0 # longest MESSAGE line sent with the post inline, 0 for ids only
+        self._outbox: asyncio.Queue[tuple[float, str] | None] = asyncio.Queue() # (when it may be written, line)
+        self.sent = 0
+
+    def send(self, message: str):
+        # latency is a fixed delay from queueing, lines queued together go out together
+        self._outbox.put_nowait((time.monotonic() + self.server.latency if self.server.latency else 0.0, message))
+
+    def finish(self):
+        self._outbox.put_nowait(None)
+
+    async def writeLoop(self):
+        server = self.server
+        try:
+            while True:
+                item = await self._outbox.get()
+                if item is None:
+                    return
+                due, message = item
+                if due:
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                slow = server.slowConsumers.get(self.name) if self.name is not None else None
+                if slow:
+                    await asyncio.sleep(slow) # per line, so a slow consumer also has limited throughput
+                data = f"{message}\n".encode('utf-8')
+                if server.chunkSize:
+                    # fragment the line so clients have to reassemble it
+                    for i in range(0, len(data), server.chunkSize):
+                        self.writer.write(data[i:i + server.chunkSize])
+                        await self.writer.drain()
+                        if server.chunkDelay:
+                            await asyncio.sleep(server.chunkDelay)
+                else:
+                    self.writer.write(data)
+                    await self.writer.drain()
+                self.sent += 1
+        except (ConnectionError, OSError):
+            pass
+
+    async def readLoop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                msg = line.decode('utf-8', 'replace').rstrip("\n")
+                if msg == "EXIT":
+                    break
+                self.server.handle(self, msg)
+        except (ConnectionError, OSError):
+            pass
+        for board in list(self.boards): # leave all boards
+            board.leave(self)
+        self.boards.clear()
+
+# asyncio stand-in for Server.java, bind to port 0 for an ephemeral loopback port
+class StandInServer:
+    def __init__(self, groups=DEFAULT_GROUPS, latency: float = 0.0, chunkSize: int = 0, chunkDelay: float = 0.0,
+                 slowConsumers: dict[str, float] | None = None) -> None:
+        self.groups = {name: StandInBoard(name) for name in groups}
+        self.latency = latency # seconds between a line being queued and written, like a network delay
+        self.chunkSize = chunkSize # split written lines into pieces of at most this many bytes, 0 to disable
+        self.chunkDelay = chunkDelay # seconds between pieces of a fragmented line
+        self.slowConsumers = slowConsumers or {} # user name -> seconds waited before each line written to them, one after another
+        self.connections: set[StandInConnection] = set()
+        self.port: int | None = None
+        self._server: asyncio.base_events.Server | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Starts listening and returns the bound port"""
+        self._server = await asyncio.start_server(self._accept, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for conn in list(self.connections):
+            conn.writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    def startThread(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Runs the server on its own event loop thread, for blocking callers"""
+        self._loop = asyncio.new_event_loop()
+        Thread(target=self._loop.run_forever, name="standin-server", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(self.start(host, port), self._loop).result()
+
+    def stopThread(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = StandInConnection(self, reader, writer)
+        self.connections.add(conn)
+        writerTask = asyncio.create_task(conn.writeLoop())
+        await conn.readLoop()
+        conn.finish() # flush what is queued then stop
+        await writerTask
+        self.connections.discard(conn)
+        writer.close()
+
+    def handle(self, conn: StandInConnection, text: str):
+        """Executes one command, mirroring Command.run in Server.java"""
+        parts = [unescape(p) for p in text.split("|")]
+        try:
+            match parts[0]:
+                case "GROUPS":
+                    conn.send(encode("GROUPS", *self.groups))
+                case "JOIN":
+                    self._join(conn, parts[1], parts[2])
+                case "POST":
+                    board = self.groups.get(parts[1])
+                    if board is not None:
+                        board.post(conn, parts[2], parts[3])
+                case "LEAVE":
+                    board = self.groups.get(parts[1])
+                    if board is not None and board in conn.boards:
+                        board.leave(conn)
+                        conn.boards.discard(board)
+                case "VIEW":
+                    self._view(conn, parts[1], int(parts[2]))
+                case "HISTORY":
+                    self._history(conn, parts[1], int(parts[2]), int(parts[3]))
+                case "SUBSCRIBE":
+                    self._subscribe(conn, parts[1], int(parts[2]) if len(parts) > 2 else 0)
+                case "PING":
+                    conn.send("PING")
+        except (IndexError, ValueError):
+            pass # malformed commands are ignored, the java command thread would just die
+
+    def _join(self, conn: StandInConnection, group: str, name: str):
+        board = self.groups.get(group)
+        if board is None or board in conn.boards:
+            return
+        board.join(conn, name)
+        conn.boards.add(board)
+        conn.name = name
+        conn.send(encode("JOIN", group, name)) # notify caller they've joined the group
+        for id in board.lastTwoMessageIds():
+            conn.send(encode("MESSAGE", group, id))
+        for user in board.clients.values():
+            if user != name:
+                conn.send(encode("JOIN", group, user))
+
+    def _subscribe(self, conn: StandInConnection, mode: str, maxLength: int):
+        conn.pushLimit = max(0, min(maxLength, MAX_PUSH)) if mode == "push" else 0
+        conn.send(encode("SUBSCRIBE", "push" if conn.pushLimit else "ids", conn.pushLimit))
+
+    def _view(self, conn: StandInConnection, group: str, id: int):
+        board = self.groups.get(group)
+        if board is None or board not in conn.boards:
+            return
+        msg = board.messages.get(id)
+        if msg is None:
+            return
+        conn.send(encode("VIEW", group, id, msg.sender, formatInstant(msg.postDate), msg.subject, msg.content))
+
+    def _history(self, conn: StandInConnection, group: str, before: int, limit: int):
+        board = self.groups.get(group)
+        if board is None or board not in conn.boards or limit <= 0:
+            return
+        conn.send(encode("HISTORY", group, before, *board.history(before, limit)))
+
+async def serve(args):
+    server = StandInServer(latency=args.latency, chunkSize=args.chunk)
+    port = await server.start(args.host, args.port)
+    print(f"Waiting for connections on port {port}")
+    await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every line is delayed by, not a per-line cost")
+    parser.add_argument("--chunk", type=int, default=0, help="fragment written lines into pieces of this many bytes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, TextIO
+
+# trace levels, a record is kept when its level is at most the tracer's
+OFF = 0
+ERROR = 1 # connection failures
+INFO = 2 # connects and disconnects
+DEBUG = 3 # every protocol line sent and received
+
+LEVELS = {"off": OFF, "error": ERROR, "info": INFO, "debug": DEBUG}
+_levelNames = {level: name.upper() for name, level in LEVELS.items()}
+
+TraceEntry = tuple[float, int, str, str] # wall clock time, level, event, text
+
+def formatEntry(entry: TraceEntry) -> str:
+    when, level, event, text = entry
+    stamp = datetime.fromtimestamp(when).isoformat(timespec='milliseconds')
+    return f"{stamp} {_levelNames[level]:<5} {event} {text}"
+
+# in-memory protocol trace; hot paths test `tracer.level >= DEBUG` before building any
+# text, so a disabled tracer costs one attribute load and compare per line
+class Tracer:
+    def __init__(self, level: int = OFF, sample: int = 1, ringSize: int = 4096,
+                 echo: Callable[[str], None] | None = None, dumpOnClose: str | None = None) -> None:
+        self.level = level
+        self.sample = max(1, sample) # keep one DEBUG record in this many, other levels are always kept
+        self.echo = echo # also handed every kept record, formatted, e.g. print
+        self.dumpOnClose = dumpOnClose # file the ring is appended to when a connection closes, "-" for stderr
+        self._ring: deque[TraceEntry] = deque(maxlen=ringSize) # most recent records only
+        self._skipped = 0
+        self.recorded = 0 # records kept
+        self.sampledOut = 0 # DEBUG records dropped by sampling
+
+    def enabled(self, level: int) -> bool:
+        return self.level >= level
+
+    def record(self, level: int, event: str, text: str = "") -> None:
+        """Keeps a record in the ring buffer, subject to the level and sampling"""
+        if level > self.level:
+            return
+        if level == DEBUG and self.sample > 1:
+            self._skipped += 1
+            if self._skipped < self.sample:
+                self.sampledOut += 1
+                return
+            self._skipped = 0
+        entry = (time.time(), level, event, text)
+        self._ring.append(entry)
+        self.recorded += 1
+        if self.echo is not None:
+            self.echo(formatEntry(entry))
+
+    def snapshot(self) -> list[TraceEntry]:
+        """Records currently in the ring buffer, oldest first"""
+        return list(self._ring)
+
+    def dump(self, out: TextIO | None = None) -> int:
+        """Writes the ring buffer out, returns the number of records written"""
+        out = out if out is not None else sys.stderr
+        entries = self.snapshot()
+        out.writelines(formatEntry(entry) + "\n" for entry in entries)
+        out.flush()
+        return len(entries)
+
+    def clear(self) -> None:
+        self._ring.clear()
+
+    def onClose(self) -> None:
+        """Called when a connection closes, dumps the ring if dumpOnClose is set"""
+        if not self.dumpOnClose or not self._ring:
+            return
+        if self.dumpOnClose == "-":
+            self.dump()
+        else:
+            with open(self.dumpOnClose, "a", encoding='utf-8') as out:
+                self.dump(out)
+
+    @classmethod
+    def fromEnv(cls, environ=os.environ) -> "Tracer":
+        """Builds a tracer from BOARD_TRACE (off, error, info or debug), BOARD_TRACE_SAMPLE,
+        BOARD_TRACE_RING, BOARD_TRACE_ECHO (1 or true) and BOARD_TRACE_DUMP (path or - for stderr).
+        Server.java reads the same variables with the same meaning"""
+        level = LEVELS.get(environ.get("BOARD_TRACE", "off").lower(), OFF)
+        echo = print if environ.get("BOARD_TRACE_ECHO", "").lower() in ("1", "true") else None
+        return cls(level, int(environ.get("BOARD_TRACE_SAMPLE", 1)), int(environ.get("BOARD_TRACE_RING", 4096)),
+                   echo, environ.get("BOARD_TRACE_DUMP"))
+
+# process-wide tracer used by clients that are not given their own
+tracer = Tracer.fromEnv()
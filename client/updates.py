@@ -0,0 +1,93 @@
+from collections import deque
+from threading import Lock
+from client.codec import Notification, PushedMsg, decode
+
+# several MESSAGE notifications for one group merged into a single update, with the bodies of pushed ones
+class MessageBatchMsg(Notification):
+    __slots__ = ("group", "ids", "bodies")
+    kind = "MESSAGES"
+    def __init__(self, group: str, ids: list[int], bodies: list[PushedMsg] | None = None) -> None:
+        self.group = group
+        self.ids = ids
+        self.bodies = bodies if bodies is not None else []
+
+# collects server lines from the listener thread so the UI thread can apply them in batches
+class UpdateQueue:
+    def __init__(self, userName: str = "", maxSize: int = 0) -> None:
+        self.userName = userName # our own name, our JOIN/LEAVE events are never merged
+        self.maxSize = maxSize # lines held before new ones are dropped, 0 for unbounded
+        self._lines: deque[str] = deque()
+        self._lock = Lock() # guards the counters
+        self.received = 0 # lines pushed
+        self.delivered = 0 # events handed to the UI
+        self.coalesced = 0 # lines merged into another event or cancelled out
+        self.dropped = 0 # lines discarded because the queue was full or malformed
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def push(self, line: str) -> None:
+        """Queues a raw server line, safe to call from any thread"""
+        with self._lock:
+            self.received += 1
+            if self.maxSize and len(self._lines) >= self.maxSize:
+                self.dropped += 1
+                return
+        self._lines.append(line)
+
+    def drain(self, maxLines: int) -> list[Notification]:
+        """Takes up to maxLines queued lines and returns them as coalesced notifications"""
+        events: list[Notification | None] = []
+        joins: dict[tuple[str, str], int] = {} # (group, name) -> index of a JOIN still in this batch
+        messages: dict[str, MessageBatchMsg] = {} # group -> batch still open in this batch
+        coalesced = dropped = 0
+        popleft = self._lines.popleft
+        for _ in range(min(maxLines, len(self._lines))):
+            note = decode(popleft())
+            if note is None:
+                dropped += 1
+                continue
+            kind = note.kind
+            if kind == "MESSAGE":
+                batch = messages.get(note.group)
+                if batch is not None:
+                    batch.ids.append(note.id) # join the pending insert for this group
+                    coalesced += 1
+                else:
+                    batch = messages[note.group] = MessageBatchMsg(note.group, [note.id])
+                    events.append(batch)
+                if type(note) is PushedMsg:
+                    batch.bodies.append(note) # applied before the ids so they are never fetched
+                continue
+            if kind == "JOIN" or kind == "LEAVE":
+                group = note.group
+                if note.name == self.userName:
+                    # our own membership changed, nothing before it may be merged with what follows
+                    messages.pop(group, None)
+                    joins = {k: v for k, v in joins.items() if k[0] != group}
+                elif kind == "JOIN":
+                    joins[(group, note.name)] = len(events)
+                else:
+                    index = joins.pop((group, note.name), None)
+                    if index is not None:
+                        events[index] = None # joined and left within the batch, cancel both
+                        coalesced += 2
+                        continue
+            events.append(note)
+        with self._lock:
+            self.coalesced += coalesced
+            self.dropped += dropped
+            delivered = [e for e in events if e is not None]
+            self.delivered += len(delivered)
+        return delivered
+
+    def stats(self) -> dict[str, int]:
+        """Counters describing how much work the queue saved"""
+        with self._lock:
+            return {
+                "received": self.received,
+                "delivered": self.delivered,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "pending": len(self._lines),
+            }
@@ -0,0 +1,53 @@
+# ordered set of user names in join order with O(1) add, remove and lookup. A removal leaves a
+# hole that is squeezed out the next time rows are read, so a batch of LEAVEs costs one pass
+class UserIndex:
+    def __init__(self) -> None:
+        self._names: list[str | None] = [] # join order, None where a user left
+        self._positions: dict[str, int] = {} # name -> index into _names
+        self._holes = 0 # None entries in _names
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def __iter__(self):
+        self._compact()
+        return iter(self._names)
+
+    def position(self, name: str) -> int | None:
+        """Row the user is displayed at, None if absent"""
+        self._compact()
+        return self._positions.get(name)
+
+    def add(self, name: str) -> bool:
+        """Appends a user, returns False if they were already present"""
+        if name in self._positions:
+            return False
+        self._positions[name] = len(self._names)
+        self._names.append(name)
+        return True
+
+    def remove(self, name: str) -> bool:
+        """Removes a user keeping everyone else in join order, returns False if absent"""
+        index = self._positions.pop(name, None)
+        if index is None:
+            return False
+        self._names[index] = None
+        self._holes += 1
+        if self._holes > len(self._positions):
+            self._compact() # mostly holes, do not let them pile up while nobody reads
+        return True
+
+    def rows(self, start: int, stop: int) -> list[str]:
+        """Names displayed between two rows"""
+        self._compact()
+        return self._names[start:stop]
+
+    def _compact(self):
+        if not self._holes:
+            return
+        self._names = [name for name in self._names if name is not None]
+        self._positions = {name: index for index, name in enumerate(self._names)}
+        self._holes = 0